@@ -1,11 +1,17 @@
 import math
+import os
+import threading
 from utils import get_numeric_input, display_error
+from script import Script, read_table, write_table
+from operations import Menu, Parameter
 
 class BasicCalculator:
     def __init__(self, history_manager):
         """Initialize the calculator with history manager and memory"""
         self.history_manager = history_manager
         self.memory = 0  # Memory starts at 0
+        self.memory_lock = threading.Lock()
+        self.last_answer = 0  # `ans` carried between script runs
 
     # ------------------------------
     # Basic Operations
@@ -47,13 +53,15 @@ class BasicCalculator:
     # ------------------------------
     def memory_add(self, value):
         """Add value to memory"""
-        self.memory += value
-        return self.memory
+        with self.memory_lock:
+            self.memory += value
+            return self.memory
 
     def memory_subtract(self, value):
         """Subtract value from memory"""
-        self.memory -= value
-        return self.memory
+        with self.memory_lock:
+            self.memory -= value
+            return self.memory
 
     def memory_recall(self):
         """Recall memory value"""
@@ -61,8 +69,9 @@ class BasicCalculator:
 
     def memory_clear(self):
         """Clear memory"""
-        self.memory = 0
-        return self.memory
+        with self.memory_lock:
+            self.memory = 0
+            return self.memory
 
     # ------------------------------
     # Expression Evaluation
@@ -95,41 +104,35 @@ class BasicCalculator:
     # ------------------------------
     def run(self):
         """Run calculator menu"""
-        while True:
-            print("\n" + "="*40)
-            print("        BASIC CALCULATOR")
-            print("="*40)
-            print("1. Simple Calculation")
-            print("2. Square")
-            print("3. Square Root")
-            print("4. Percentage")
-            print("5. Memory Functions")
-            print("6. Back to Main Menu")
-            print("="*40)
-
-            try:
-                choice = input("Select an option (1-6): ").strip()
-
-                if choice == "1":
-                    self.simple_calculation()
-                elif choice == "2":
-                    self.calculate_square()
-                elif choice == "3":
-                    self.calculate_square_root()
-                elif choice == "4":
-                    self.calculate_percentage()
-                elif choice == "5":
-                    self.memory_functions()
-                elif choice == "6":
-                    break
-                else:
-                    print("Invalid choice. Please try again.")
-
-            except KeyboardInterrupt:
-                print("\nOperation cancelled.")
-                break
-            except Exception as e:
-                display_error(str(e))
+        Menu("BASIC CALCULATOR", [
+            ("Simple Calculation", self.simple_calculation),
+            ("Square", self.calculate_square),
+            ("Square Root", self.calculate_square_root),
+            ("Percentage", self.calculate_percentage),
+            ("Memory Functions", self.memory_functions),
+            ("Script Mode", self.script_mode),
+            ("Back to Main Menu", None),
+        ], width=40).run()
+
+    def register_operations(self, registry):
+        """Add the basic operations to an OperationRegistry"""
+        two_numbers = [Parameter("a", description="first number"), Parameter("b", description="second number")]
+        registry.register("basic.add", self.add, two_numbers, "a + b")
+        registry.register("basic.subtract", self.subtract, two_numbers, "a - b")
+        registry.register("basic.multiply", self.multiply, two_numbers, "a * b")
+        registry.register("basic.divide", self.divide, two_numbers, "a / b")
+        registry.register("basic.square", self.square, [Parameter("x", description="number")], "x squared")
+        registry.register("basic.square_root", self.square_root, [Parameter("x", description="number")],
+                          "Square root of x")
+        registry.register("basic.percentage", self.percentage,
+                          [Parameter("value"), Parameter("percent")], "percent % of value")
+        registry.register("basic.memory_add", self.memory_add, [Parameter("value")], "Add to memory")
+        registry.register("basic.memory_subtract", self.memory_subtract, [Parameter("value")],
+                          "Subtract from memory")
+        registry.register("basic.memory_recall", self.memory_recall, [], "Memory value")
+        registry.register("basic.memory_clear", self.memory_clear, [], "Reset memory to 0")
+        registry.register("basic.evaluate", self.evaluate_expression,
+                          [Parameter("expression", str)], "Evaluate an arithmetic expression")
 
     # ------------------------------
     # Operations with User Input
@@ -200,6 +203,47 @@ class BasicCalculator:
         except ValueError as e:
             display_error(str(e))
 
+    def script_mode(self):
+        """Run a multi-statement script with variables, functions and ans"""
+        print("\n--- Script Mode ---")
+        print("Enter one statement per line, then a blank line to run:")
+        print("  x = 5        assign a variable")
+        print("  f(a) = a*a   define a function")
+        print("  f(x) + 1     an expression; its value becomes ans")
+
+        lines = []
+        while True:
+            line = input("... ").strip()
+            if not line:
+                break
+            lines.append(line)
+        if not lines:
+            return
+
+        try:
+            script = Script("\n".join(lines))
+
+            if script.inputs:
+                print(f"Script inputs: {', '.join(script.inputs)}")
+                table_file = input("CSV file of inputs to run over (Enter to type values): ").strip()
+                if table_file:
+                    results = script.run_table(read_table(table_file), ans=self.last_answer)
+                    output_file = write_table(f"{os.path.splitext(table_file)[0]}_results.csv", results)
+                    print(f"Ran {len(results['ans'])} rows; results saved to {output_file}")
+                    return
+
+            values = {name: get_numeric_input(f"Enter {name}: ") for name in script.inputs}
+            results = script.run(values, ans=self.last_answer)
+
+            for name, value in results.items():
+                print(f"{name} = {value}")
+
+            self.last_answer = results["ans"]
+            self.history_manager.add_to_history(f"Script: {'; '.join(lines)}", self.last_answer)
+
+        except (ValueError, ArithmeticError, IOError) as e:
+            display_error(str(e))
+
     def memory_functions(self):
         """Menu for memory operations"""
         while True:
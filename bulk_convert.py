@@ -0,0 +1,199 @@
+import os
+import time
+from itertools import islice
+import numpy as np
+
+# Rows held in memory at a time
+CHUNK_ROWS = 100000
+
+
+def parse_mapping(specs):
+    """Parse ["temp=celsius:fahrenheit", "dist=mile:km"] into {column: (from_unit, to_unit)}"""
+    mapping = {}
+    for spec in specs:
+        column, _, units = spec.partition("=")
+        from_unit, _, to_unit = units.partition(":")
+        if not column.strip() or not from_unit.strip() or not to_unit.strip():
+            raise ValueError(f"Invalid column mapping '{spec}'. Use column=from_unit:to_unit")
+        mapping[column.strip()] = (from_unit.strip(), to_unit.strip())
+    if not mapping:
+        raise ValueError("No columns to convert")
+    return mapping
+
+
+def _to_floats(cells):
+    """Column of CSV cells as floats; blank or non-numeric cells become NaN"""
+    try:
+        return np.array(cells, dtype=float)
+    except ValueError:
+        values = np.full(len(cells), np.nan)
+        for i, cell in enumerate(cells):
+            try:
+                values[i] = float(cell)
+            except ValueError:
+                pass
+        return values
+
+
+def _format(values):
+    """Column of floats as CSV cells; NaN is written as a blank cell"""
+    cells = [f"{value:.10g}" for value in values.tolist()]
+    for i in np.flatnonzero(np.isnan(values)):
+        cells[i] = ""
+    return cells
+
+
+# ------------------------------
+# Readers: yield chunks as a list of columns
+# ------------------------------
+def _read_csv(path, chunk_rows):
+    """Header names and a generator of column chunks (lists of cell strings)"""
+    with open(path, 'r', newline='') as f:
+        names = [name.strip() for name in f.readline().rstrip("\r\n").split(",")]
+
+    def chunks():
+        with open(path, 'r', newline='') as f:
+            f.readline()
+            while True:
+                lines = list(islice(f, chunk_rows))
+                if not lines:
+                    return
+                lines = [line.rstrip("\r\n") for line in lines if line.strip()]
+                if any(line.count(",") != len(names) - 1 for line in lines):
+                    raise ValueError(f"Every row must have {len(names)} values")
+                if lines:
+                    # One split for the whole chunk, then every n-th cell is a column
+                    cells = ",".join(lines).split(",")
+                    yield [cells[i::len(names)] for i in range(len(names))]
+
+    return names, chunks()
+
+
+def _read_npy(path, chunk_rows):
+    """Column names and a generator of column chunks from a memory-mapped .npy"""
+    data = np.load(path, mmap_mode="r")
+    if data.ndim == 1:
+        data = data.reshape(-1, 1)
+    if data.ndim != 2:
+        raise ValueError("Only 1-D and 2-D .npy files are supported")
+
+    def chunks():
+        for start in range(0, len(data), chunk_rows):
+            block = np.asarray(data[start:start + chunk_rows], dtype=float)
+            yield [block[:, i] for i in range(block.shape[1])]
+
+    return [f"column{i + 1}" for i in range(data.shape[1])], chunks(), len(data)
+
+
+def _count_rows(path):
+    """Data rows of a CSV file (without the header)"""
+    with open(path, 'rb') as f:
+        f.readline()
+        return sum(1 for line in f if line.strip())
+
+
+# ------------------------------
+# Pipeline
+# ------------------------------
+def convert_file(converter, input_path, output_path, mapping, chunk_rows=CHUNK_ROWS):
+    """
+    Convert columns of a CSV or .npy file to other units, streaming chunk by chunk
+
+    Each mapped column goes through the converter as one NumPy array per
+    chunk; other columns are copied unchanged (CSV text is kept as is,
+    though it becomes NaN in a .npy output). Memory use is bounded by
+    chunk_rows whatever the file size.
+
+    Args:
+        converter (UnitConverter): Provides the (cached) unit conversions
+        input_path (str): .csv with a header row, or .npy
+        output_path (str): .csv or .npy
+        mapping (dict): Column name -> (from_unit, to_unit); .npy columns
+            are named column1, column2, ...
+        chunk_rows (int): Rows converted at a time
+
+    Returns:
+        tuple: (output_path, stats dict with rows, seconds and rows_per_second)
+    """
+    if not os.path.exists(input_path):
+        raise ValueError(f"File not found: {input_path}")
+    if os.path.abspath(input_path) == os.path.abspath(output_path):
+        raise ValueError("Output file must differ from the input file")
+    for path in (input_path, output_path):
+        if not path.lower().endswith((".csv", ".npy")):
+            raise ValueError(f"Only .csv and .npy files are supported: {path}")
+
+    start = time.perf_counter()
+    if input_path.lower().endswith(".npy"):
+        names, chunks, rows = _read_npy(input_path, chunk_rows)
+    else:
+        names, chunks = _read_csv(input_path, chunk_rows)
+        rows = None
+
+    unknown = [column for column in mapping if column not in names]
+    if unknown:
+        raise ValueError(f"Unknown column: {unknown[0]}. Columns are: {', '.join(names)}")
+    # Resolve every conversion before reading any data, so bad units fail fast
+    conversions = []
+    for column, (from_unit, to_unit) in mapping.items():
+        try:
+            converter.quick_convert(0.0, from_unit, to_unit)
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"Cannot convert column {column}: {e}")
+        conversions.append((names.index(column), from_unit, to_unit))
+
+    converted = 0
+    if output_path.lower().endswith(".npy"):
+        if rows is None:
+            rows = _count_rows(input_path)
+        output = np.lib.format.open_memmap(output_path, mode="w+", dtype=float, shape=(rows, len(names)))
+        for columns in chunks:
+            for index, from_unit, to_unit in conversions:
+                columns[index] = converter.quick_convert(_to_floats(columns[index]), from_unit, to_unit)
+            block = np.column_stack([_to_floats(column) for column in columns])
+            output[converted:converted + len(block)] = block
+            converted += len(block)
+        output.flush()
+        del output
+    else:
+        with open(output_path, 'w') as f:
+            f.write(",".join(names) + "\n")
+            for columns in chunks:
+                for index, from_unit, to_unit in conversions:
+                    columns[index] = converter.quick_convert(_to_floats(columns[index]), from_unit, to_unit)
+                for index, column in enumerate(columns):
+                    if isinstance(column, np.ndarray):
+                        columns[index] = _format(column)
+                f.write("\n".join(map(",".join, zip(*columns))) + "\n")
+                converted += len(columns[0])
+
+    elapsed = time.perf_counter() - start
+    stats = {"rows": converted, "columns": len(conversions), "seconds": elapsed,
+             "rows_per_second": converted / elapsed if elapsed else 0.0}
+    return output_path, stats
+
+
+def main(argv=None):
+    """Headless entry point: python bulk_convert.py input output column=from:to ..."""
+    import argparse
+    from converter import UnitConverter
+
+    parser = argparse.ArgumentParser(description="Convert columns of a CSV or .npy file to other units")
+    parser.add_argument("input", help="input .csv (with header row) or .npy file")
+    parser.add_argument("output", help="output .csv or .npy file")
+    parser.add_argument("mapping", nargs="+", help="column=from_unit:to_unit, e.g. temp=celsius:fahrenheit")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows held in memory at a time")
+    args = parser.parse_args(argv)
+
+    try:
+        output_path, stats = convert_file(UnitConverter(None), args.input, args.output,
+                                          parse_mapping(args.mapping), args.chunk_rows)
+    except ValueError as e:
+        parser.exit(1, f"Error: {e}\n")
+    print(f"Converted {stats['rows']} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:,.0f} rows/sec) -> {output_path}")
+    return stats
+
+
+if __name__ == "__main__":
+    main()
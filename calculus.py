@@ -0,0 +1,393 @@
+import math
+import numpy as np
+
+from expression_plan import compile_plan
+from sweep import vector_namespaces
+
+# 15-point Kronrod nodes on [-1, 1]; every odd node is also a 7-point Gauss node
+_KRONROD_POSITIVE = [0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                     0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                     0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                     0.207784955007898467600689403773245]
+_KRONROD_WEIGHTS_POSITIVE = [0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                             0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                             0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                             0.204432940075298892414161999234649]
+_KRONROD_CENTER_WEIGHT = 0.209482141084727828012999174891714
+_GAUSS_WEIGHTS_POSITIVE = [0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                           0.381830050505118944950369775488975]
+_GAUSS_CENTER_WEIGHT = 0.417959183673469387755102040816327
+
+KRONROD_NODES = np.array([-x for x in _KRONROD_POSITIVE] + [0.0] + _KRONROD_POSITIVE[::-1])
+KRONROD_WEIGHTS = np.array(_KRONROD_WEIGHTS_POSITIVE + [_KRONROD_CENTER_WEIGHT] + _KRONROD_WEIGHTS_POSITIVE[::-1])
+# Gauss weights laid over the Kronrod nodes (zero where a node is Kronrod-only)
+GAUSS_WEIGHTS = np.zeros(15)
+GAUSS_WEIGHTS[1:7:2] = _GAUSS_WEIGHTS_POSITIVE
+GAUSS_WEIGHTS[7] = _GAUSS_CENTER_WEIGHT
+GAUSS_WEIGHTS[9:15:2] = _GAUSS_WEIGHTS_POSITIVE[::-1]
+
+# Dormand-Prince 5(4) tableau
+_DP_C = [0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1]
+_DP_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+_DP_B5 = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0])
+_DP_B4 = np.array([5179 / 57600, 0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40])
+
+
+class ExpressionFunction:
+    """
+    A user expression compiled once and evaluated on whole NumPy arrays
+
+    Every call evaluates a batch of points; evaluations counts the points.
+    """
+
+    def __init__(self, expression, variables=("x",), **constants):
+        self.plan = compile_plan(expression)
+        if self.plan.call is not None:
+            raise ValueError("Expected an expression such as 'x**2 - 2'")
+
+        unknown = [name for name in self.plan.parameters if name not in variables and name not in constants]
+        if unknown:
+            raise ValueError(f"Unknown variable: {unknown[0]} (expected {', '.join(variables)})")
+
+        self.expression = expression
+        self.variables = tuple(variables)
+        self.constants = constants
+        self.namespaces = vector_namespaces()
+        self.evaluations = 0
+
+    def __call__(self, *args):
+        args = [np.asarray(arg, dtype=float) for arg in args]
+        values = dict(self.constants)
+        values.update(zip(self.variables, args))
+
+        shape = np.broadcast_shapes(*(arg.shape for arg in args))
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            result = np.asarray(self.plan.evaluate(self.namespaces, values), dtype=float)
+
+        self.evaluations += math.prod(shape) if shape else 1
+        return np.broadcast_to(result, shape)
+
+
+def _as_function(f, variables=("x",)):
+    """Accept an expression string or an already vectorized callable"""
+    return ExpressionFunction(f, variables) if isinstance(f, str) else f
+
+
+def _evaluations(f):
+    return getattr(f, "evaluations", None)
+
+
+# ------------------------------
+# Differentiation
+# ------------------------------
+def derivative(f, x, order=1, step=None, levels=6):
+    """
+    Numerical derivative by central differences with Richardson extrapolation
+
+    All stencil points for every step size are evaluated in one batch.
+
+    Returns:
+        tuple: (derivative, stats dict with "evaluations" and "error")
+    """
+    if order not in (1, 2):
+        raise ValueError("Only first and second derivatives are supported")
+
+    f = _as_function(f)
+    x = np.asarray(x, dtype=float)
+    # Steps shrink near zero so they stay inside the domain (e.g. ln(x) at 0.001)
+    step = step or 0.1 * np.where(x != 0, np.minimum(np.abs(x), 1.0), 1.0)
+    steps = np.asarray(step)[..., np.newaxis] / 2.0 ** np.arange(levels)
+
+    before = _evaluations(f)
+    xs = x[..., np.newaxis]
+    if order == 1:
+        points = np.stack([xs + steps, xs - steps])
+        values = f(points)
+        estimates = (values[0] - values[1]) / (2 * steps)
+    else:
+        points = np.stack([xs + steps, np.broadcast_to(xs, steps.shape), xs - steps])
+        values = f(points)
+        estimates = (values[0] - 2 * values[1] + values[2]) / steps ** 2
+
+    # Richardson table: each column removes the next even power of the step
+    table = [estimates[..., i] for i in range(levels)]
+    error = np.full(x.shape, np.inf)
+    best = table[0]
+    for k in range(1, levels):
+        factor = 4.0 ** k
+        table = [(factor * table[i + 1] - table[i]) / (factor - 1) for i in range(len(table) - 1)]
+        change = np.abs(table[-1] - best)
+        improved = change < error
+        best = np.where(improved, table[-1], best)
+        error = np.where(improved, change, error)
+
+    stats = {"evaluations": points.size if before is None else _evaluations(f) - before,
+             "error": float(error) if error.ndim == 0 else error}
+    return (float(best) if np.ndim(best) == 0 else best), stats
+
+
+# ------------------------------
+# Integration
+# ------------------------------
+def _gauss_kronrod(f, left, right):
+    """G7-K15 estimates and error for many intervals in one batch"""
+    center = (left + right) / 2
+    half = (right - left) / 2
+    values = f(center[:, np.newaxis] + half[:, np.newaxis] * KRONROD_NODES)
+    kronrod = half * (values @ KRONROD_WEIGHTS)
+    gauss = half * (values @ GAUSS_WEIGHTS)
+    return kronrod, np.abs(kronrod - gauss), values.size
+
+
+def _simpson(f, left, right):
+    """Simpson on each interval and on its halves, for many intervals in one batch"""
+    offsets = np.linspace(0, 1, 5)
+    width = right - left
+    values = f(left[:, np.newaxis] + width[:, np.newaxis] * offsets)
+    whole = width / 6 * (values[:, 0] + 4 * values[:, 2] + values[:, 4])
+    halves = width / 12 * (values[:, 0] + 4 * values[:, 1] + 2 * values[:, 2] + 4 * values[:, 3] + values[:, 4])
+    # Richardson correction of the halved rule; error of order (halves - whole) / 15
+    return halves + (halves - whole) / 15, np.abs(halves - whole) / 15, values.size
+
+
+INTEGRATION_METHODS = {"gauss_kronrod": _gauss_kronrod, "simpson": _simpson}
+
+
+def integrate(f, a, b, tolerance=1e-10, relative_tolerance=1e-10, method="gauss_kronrod", max_intervals=100000):
+    """
+    Adaptive integration of f over [a, b]
+
+    Each round evaluates every unfinished interval in one vectorized batch,
+    accepts those within their share of the tolerance and bisects the rest.
+
+    Returns:
+        tuple: (integral, stats dict with "evaluations", "error",
+                "intervals", "rounds" and "converged")
+    """
+    if method not in INTEGRATION_METHODS:
+        raise ValueError(f"Integration method must be one of {', '.join(INTEGRATION_METHODS)}")
+    if not (math.isfinite(a) and math.isfinite(b)):
+        raise ValueError("Integration limits must be finite")
+
+    f = _as_function(f)
+    rule = INTEGRATION_METHODS[method]
+    sign = 1.0
+    if b < a:
+        a, b, sign = b, a, -1.0
+
+    left, right = np.array([a], dtype=float), np.array([b], dtype=float)
+    accepted_total = accepted_error = 0.0
+    evaluations = intervals = rounds = 0
+    converged = True
+
+    while len(left):
+        rounds += 1
+        estimate, error, count = rule(f, left, right)
+        evaluations += count
+
+        total = accepted_total + estimate.sum()
+        allowed = max(tolerance, relative_tolerance * abs(total)) * (right - left) / max(b - a, np.finfo(float).tiny)
+        done = (error <= allowed) | (right - left <= np.finfo(float).eps * max(abs(a), abs(b), 1.0))
+        if not np.isfinite(estimate).all():
+            raise ValueError("Integrand is not finite on the interval")
+
+        accepted_total += estimate[done].sum()
+        accepted_error += error[done].sum()
+        intervals += int(done.sum())
+
+        left, right = left[~done], right[~done]
+        if len(left) and intervals + 2 * len(left) > max_intervals:
+            # Out of budget: keep the current estimates and report it
+            accepted_total += estimate[~done].sum()
+            accepted_error += error[~done].sum()
+            intervals += len(left)
+            converged = False
+            break
+
+        middle = (left + right) / 2
+        left, right = np.concatenate([left, middle]), np.concatenate([middle, right])
+
+    stats = {"evaluations": evaluations, "error": float(accepted_error), "intervals": intervals,
+             "rounds": rounds, "converged": converged}
+    return sign * float(accepted_total), stats
+
+
+# ------------------------------
+# Root finding
+# ------------------------------
+def brent(f, a, b, tolerance=1e-12, max_iterations=100):
+    """
+    Root of f in [a, b] by Brent's method (f(a) and f(b) must differ in sign)
+
+    Returns:
+        tuple: (root, stats dict with "evaluations", "iterations", "error" and "converged")
+    """
+    f = _as_function(f)
+    fa, fb = float(f(a)), float(f(b))
+    evaluations = 2
+    if fa * fb > 0:
+        raise ValueError("The function must change sign between the two bounds")
+
+    if abs(fa) < abs(fb):
+        a, b, fa, fb = b, a, fb, fa
+    c, fc = a, fa
+    d = e = b - a
+    iterations = 0
+
+    while iterations < max_iterations:
+        if fb == 0:
+            break
+        if (fb > 0) == (fc > 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol = 2 * np.finfo(float).eps * abs(b) + tolerance / 2
+        m = (c - b) / 2
+        if abs(m) <= tol:
+            break
+        iterations += 1
+
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            # Inverse quadratic interpolation (secant when only two points differ)
+            s = fb / fa
+            if a == c:
+                p, q = 2 * m * s, 1 - s
+            else:
+                q, r = fa / fc, fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+
+        a, fa = b, fb
+        b += d if abs(d) > tol else (tol if m > 0 else -tol)
+        fb = float(f(b))
+        evaluations += 1
+
+    converged = fb == 0 or abs(c - b) <= 2 * tolerance + 4 * np.finfo(float).eps * abs(b)
+    stats = {"evaluations": evaluations, "iterations": iterations,
+             "error": float(abs(c - b)), "converged": bool(converged)}
+    return float(b), stats
+
+
+def find_roots(f, a, b, samples=1000, tolerance=1e-12):
+    """
+    All roots of f in [a, b] that show up as sign changes on a sample grid
+
+    The grid is evaluated in one batch; each bracket is then refined with Brent.
+
+    Returns:
+        tuple: (sorted roots, stats dict with "evaluations" and "brackets")
+    """
+    f = _as_function(f)
+    xs = np.linspace(a, b, samples + 1)
+    values = f(xs)
+    evaluations = xs.size
+
+    roots = [float(x) for x in xs[values == 0]]
+    brackets = np.flatnonzero((values[:-1] * values[1:] < 0) & np.isfinite(values[:-1]) & np.isfinite(values[1:]))
+    for i in brackets:
+        root, info = brent(f, xs[i], xs[i + 1], tolerance)
+        evaluations += info["evaluations"]
+        # Sign changes across poles (e.g. tan) are not roots
+        if info["converged"] and abs(float(f(root))) <= 1e-6 * max(1.0, np.nanmax(np.abs(values[i:i + 2]))):
+            roots.append(root)
+
+    return sorted(roots), {"evaluations": evaluations, "brackets": len(brackets)}
+
+
+# ------------------------------
+# Ordinary differential equations
+# ------------------------------
+def solve_ode(f, t0, y0, t1, tolerance=1e-8, max_steps=100000, first_step=None):
+    """
+    Integrate dy/dt = f(t, y) from t0 to t1 with adaptive Dormand-Prince 5(4) steps
+
+    y0 may be an array of initial values: the whole batch is stepped together,
+    with one vectorized evaluation per stage.
+
+    Returns:
+        tuple: (times array, values array with one row per time; stats dict
+                with "evaluations", "steps", "rejected", "error" and "converged")
+    """
+    f = _as_function(f, ("t", "y"))
+    y = np.asarray(y0, dtype=float)
+    t = float(t0)
+    direction = 1.0 if t1 >= t0 else -1.0
+    h = first_step or abs(t1 - t0) / 100 or 1.0
+
+    times, values = [t], [y.copy()]
+    evaluations = steps = rejected = 0
+    max_error = 0.0
+    k = [None] * 7
+    k[0] = f(t, y)
+    evaluations += 1
+
+    while direction * (t1 - t) > 1e-12 * max(1.0, abs(t1)):
+        if steps + rejected >= max_steps:
+            break
+        h = min(h, abs(t1 - t))
+        step = direction * h
+
+        for stage in range(1, 7):
+            increment = sum(a * k[j] for j, a in enumerate(_DP_A[stage]) if a)
+            k[stage] = f(t + _DP_C[stage] * step, y + step * increment)
+        evaluations += 6
+
+        y_new = y + step * sum(b * k[j] for j, b in enumerate(_DP_B5) if b)
+        error = step * sum((b5 - b4) * k[j] for j, (b5, b4) in enumerate(zip(_DP_B5, _DP_B4)) if b5 != b4)
+        scale = tolerance + tolerance * np.maximum(np.abs(y), np.abs(y_new))
+        error_norm = float(np.max(np.abs(error) / scale)) if np.size(error) else 0.0
+
+        if error_norm <= 1.0 or h <= 1e-14 * max(1.0, abs(t)):
+            t += step
+            y = y_new
+            k[0] = k[6]  # first-same-as-last: the last stage is f at the new point
+            times.append(t)
+            values.append(y.copy())
+            steps += 1
+            max_error = max(max_error, error_norm * float(np.max(scale)))
+        else:
+            rejected += 1
+
+        h *= min(5.0, max(0.2, 0.9 * (error_norm or 1e-10) ** -0.2))
+
+    stats = {"evaluations": evaluations, "steps": steps, "rejected": rejected, "error": max_error,
+             "converged": direction * (t1 - t) <= 1e-12 * max(1.0, abs(t1))}
+    return np.array(times), np.array(values), stats
+
+
+if __name__ == "__main__":
+    value, info = derivative("sin(x)", 1.0)
+    print(f"d/dx sin(x) at 1: {value:.12f} (cos 1 = {math.cos(1):.12f}), {info}")
+
+    value, info = integrate("exp(-x**2)", -3, 3)
+    print(f"Integral of exp(-x^2) over [-3, 3]: {value:.12f}, {info}")
+    value, info = integrate("sqrt(x)", 0, 1, method="simpson")
+    print(f"Integral of sqrt(x) over [0, 1] (Simpson): {value:.10f}, {info}")
+
+    root, info = brent("x**3 - 2*x - 5", 2, 3)
+    print(f"Root of x^3 - 2x - 5: {root:.12f}, {info}")
+    roots, info = find_roots("sin(x)", -10, 10)
+    print(f"Roots of sin(x) in [-10, 10]: {np.round(roots, 10)}, {info}")
+
+    times, values, info = solve_ode("-2 * y", 0, [1.0, 2.0, 3.0], 1)
+    print(f"y' = -2y at t=1: {values[-1]} (exact {np.exp(-2) * np.array([1, 2, 3])}), {info}")
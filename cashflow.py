@@ -0,0 +1,220 @@
+import numpy as np
+
+# Search range for the bisection fallback (as decimal rates), just above -100%
+BISECTION_LOW = -1.0 + 1e-9
+BISECTION_HIGH = 100.0
+
+
+def pad_cashflows(cashflows):
+    """Stack cash-flow vectors of different lengths into a zero-padded 2-D array"""
+    rows = [np.asarray(row, dtype=float).ravel() for row in cashflows]
+    width = max((len(row) for row in rows), default=0)
+    padded = np.zeros((len(rows), width))
+
+    for i, row in enumerate(rows):
+        padded[i, :len(row)] = row
+
+    return padded
+
+
+def _as_batch(cashflows):
+    """Return a 2-D float array and whether the input was a single vector"""
+    if isinstance(cashflows, np.ndarray):
+        array = cashflows.astype(float, copy=False)
+    elif cashflows and np.ndim(cashflows[0]) == 0:
+        array = np.asarray(cashflows, dtype=float)
+    else:
+        array = pad_cashflows(cashflows)
+
+    if array.ndim == 1:
+        return array[np.newaxis, :], True
+    if array.ndim != 2:
+        raise ValueError("Cash flows must be a vector or a 2-D batch of vectors")
+    return array, False
+
+
+def _unwrap(values, single):
+    """Return a float for single-vector input, the array otherwise"""
+    return float(values[0]) if single else values
+
+
+def _present_value(rates, cashflows, times):
+    """NPV and its derivative with respect to the rate, row by row"""
+    growth = 1.0 + rates[:, np.newaxis]
+    discount = growth ** -times
+    value = (cashflows * discount).sum(axis=1)
+    derivative = -(times * cashflows * discount / growth).sum(axis=1)
+    return value, derivative
+
+
+def solve_rate(cashflows, times, guess=0.1, tolerance=1e-10, max_iterations=50):
+    """
+    Find r with sum(c * (1 + r)^-t) = 0 for every row at once
+
+    Newton–Raphson runs on all rows together; rows that fail to converge
+    (flat derivative, overshooting past -100%) fall back to bisection.
+
+    Returns:
+        tuple: (decimal rates with NaN where no root exists, Newton iterations used)
+    """
+    rates = np.full(cashflows.shape[0], float(guess))
+    active = np.ones(cashflows.shape[0], dtype=bool)
+    iterations = 0
+
+    while active.any() and iterations < max_iterations:
+        iterations += 1
+        value, derivative = _present_value(rates[active], cashflows[active], times[active])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = value / derivative
+        updated = rates[active] - step
+
+        # Stop tracking rows that converged or left the valid domain
+        done = np.abs(step) < tolerance * np.maximum(1.0, np.abs(updated))
+        invalid = ~np.isfinite(updated) | (updated <= -1.0)
+        updated[invalid] = np.nan
+
+        rates[active] = updated
+        indices = np.flatnonzero(active)
+        active[indices[done | invalid]] = False
+
+    # Anything Newton left unfinished goes to bisection
+    failed = active | np.isnan(rates)
+    if failed.any():
+        rates[failed] = _bisect(cashflows[failed], times[failed], tolerance)
+
+    return rates, iterations
+
+
+def _bisect(cashflows, times, tolerance, max_iterations=200):
+    """Vectorized bisection over rows whose NPV changes sign in the search range"""
+    low = np.full(cashflows.shape[0], BISECTION_LOW)
+    high = np.full(cashflows.shape[0], BISECTION_HIGH)
+    with np.errstate(over="ignore", invalid="ignore"):
+        f_low, _ = _present_value(low, cashflows, times)
+    f_high, _ = _present_value(high, cashflows, times)
+
+    # Near -100% the last nonzero cash flow dominates; its sign stands in where the NPV overflows
+    last = cashflows.shape[1] - 1 - np.argmax(cashflows[:, ::-1] != 0, axis=1)
+    limit = np.sign(cashflows[np.arange(cashflows.shape[0]), last])
+    f_low = np.where(np.isfinite(f_low), f_low, limit)
+
+    bracketed = np.sign(f_low) * np.sign(f_high) <= 0
+    for _ in range(max_iterations):
+        mid = (low + high) / 2
+        with np.errstate(over="ignore", invalid="ignore"):
+            f_mid, _ = _present_value(mid, cashflows, times)
+        left = np.sign(f_mid) == np.sign(f_low)
+        low = np.where(left, mid, low)
+        f_low = np.where(left, f_mid, f_low)
+        high = np.where(left, high, mid)
+        if np.all(high - low < tolerance):
+            break
+
+    return np.where(bracketed, (low + high) / 2, np.nan)
+
+
+def npv(rate, cashflows):
+    """
+    Net present value of cash flows, the first one at period 0
+
+    Args:
+        rate (float or array): Discount rate per period (%)
+        cashflows: A vector, a list of vectors or a padded 2-D array
+
+    Returns:
+        float or ndarray: NPV per cash-flow vector
+    """
+    batch, single = _as_batch(cashflows)
+    rates = np.broadcast_to(np.asarray(rate, dtype=float) / 100, batch.shape[:1])
+    times = np.arange(batch.shape[1], dtype=float)
+
+    discount = (1.0 + rates[:, np.newaxis]) ** -times
+    return _unwrap((batch * discount).sum(axis=1), single)
+
+
+def irr(cashflows, guess=10.0, tolerance=1e-10):
+    """
+    Internal rate of return per period (%) for one or many cash-flow vectors
+
+    Padding with trailing zeros does not change the result, so batches of
+    different lengths can be solved together; rows without a root are NaN.
+    """
+    batch, single = _as_batch(cashflows)
+    times = np.broadcast_to(np.arange(batch.shape[1], dtype=float), batch.shape)
+    rates, _ = solve_rate(batch, times, guess / 100, tolerance)
+    return _unwrap(rates * 100, single)
+
+
+def xirr(cashflows, dates, guess=10.0, tolerance=1e-10):
+    """
+    Annualised IRR (%) for cash flows on irregular dates (Actual/365)
+
+    Args:
+        cashflows: A vector or a batch of vectors (padded with zeros)
+        dates: Matching dates (strings, datetimes or datetime64), same shape
+    """
+    batch, single = _as_batch(cashflows)
+    if single:
+        dates = [dates]
+
+    # Padded cash flows are zero, so their (zero) times don't matter
+    date_rows = [np.asarray(row, dtype="datetime64[D]") for row in dates]
+    if len(date_rows) != batch.shape[0]:
+        raise ValueError("Each cash-flow vector needs a matching list of dates")
+
+    days = np.zeros(batch.shape)
+    for i, row in enumerate(date_rows):
+        if len(row) > batch.shape[1] or np.any(batch[i, len(row):]):
+            raise ValueError("Each cash flow needs exactly one date")
+        days[i, :len(row)] = (row - row.min()).astype(float)
+
+    rates, _ = solve_rate(batch, days / 365.0, guess / 100, tolerance)
+    return _unwrap(rates * 100, single)
+
+
+def payback_period(cashflows, rate=None):
+    """
+    Periods until cumulative cash flow turns non-negative (interpolated)
+
+    Args:
+        cashflows: A vector or a batch of vectors
+        rate (float): Optional discount rate (%) for the discounted payback period
+
+    Returns:
+        float or ndarray: Payback period, NaN if never paid back
+    """
+    batch, single = _as_batch(cashflows)
+    if rate is not None:
+        batch = batch * (1.0 + rate / 100) ** -np.arange(batch.shape[1], dtype=float)
+
+    cumulative = np.cumsum(batch, axis=1)
+    recovered = cumulative >= 0
+    first = recovered.argmax(axis=1)
+    never = ~recovered.any(axis=1)
+
+    # Interpolate within the period in which the balance crosses zero
+    rows = np.arange(batch.shape[0])
+    previous = cumulative[rows, np.maximum(first - 1, 0)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(first > 0, -previous / batch[rows, first], 0.0)
+    periods = np.where(first > 0, first - 1 + fraction, 0.0)
+    periods[never] = np.nan
+
+    return _unwrap(periods, single)
+
+
+if __name__ == "__main__":
+    import time
+
+    flows = [-1000, 300, 400, 500, 200]
+    print(f"NPV @ 8%: {npv(8, flows):.2f}")
+    print(f"IRR: {irr(flows):.4f}%")
+    print(f"Payback: {payback_period(flows):.2f} periods")
+    print(f"XIRR: {xirr([-1000, 600, 600], ['2024-01-01', '2024-07-01', '2025-01-01']):.4f}%")
+
+    rng = np.random.default_rng(0)
+    proposals = np.hstack([-rng.uniform(500, 2000, (100000, 1)), rng.uniform(0, 400, (100000, 19))])
+    start = time.perf_counter()
+    rates = irr(proposals)
+    print(f"IRR for {len(rates)} proposals in {time.perf_counter() - start:.2f}s")
@@ -1,9 +1,14 @@
+import functools
 
 from utils import get_numeric_input, display_error, get_menu_choice
+from units import UnitRegistry
+from bulk_convert import convert_file, parse_mapping
+from operations import Menu, Parameter
 
 class UnitConverter:
     def __init__(self, history_manager):
         self.history_manager = history_manager
+        self.registry = UnitRegistry()
 
         # Conversion factors (base unit is the first one in each category)
         self.conversion_factors = {
@@ -121,59 +126,50 @@ class UnitConverter:
 
     def convert_units(self, category, value, from_unit, to_unit):
         """Generic unit conversion method"""
-        if category == "temperature":
-            return self.convert_temperature(value, from_unit, to_unit)
-        elif category == "length":
-            return self.convert_length(value, from_unit, to_unit)
-        elif category == "weight":
-            return self.convert_weight(value, from_unit, to_unit)
-        elif category == "time":
-            return self.convert_time(value, from_unit, to_unit)
-        elif category == "volume":
-            return self.convert_volume(value, from_unit, to_unit)
-        elif category == "area":
-            return self.convert_area(value, from_unit, to_unit)
-        else:
+        if category not in self.conversion_factors:
             raise ValueError("Invalid conversion category")
 
+        units = self.conversion_factors[category]
+        if from_unit not in units or to_unit not in units:
+            raise ValueError(f"Invalid {category} unit")
+
+        # Factors (and temperature offsets) are cached by the registry
+        return self.registry.convert(value, from_unit, to_unit)
+
+    def convert(self, value, from_expr, to_expr):
+        """Convert between any compatible unit expressions (e.g. "km/h" to "m/s")"""
+        return self.registry.convert(value, from_expr, to_expr)
+
     def run(self):
         """Run the unit converter interface"""
-        while True:
-            print("\n" + "="*50)
-            print("          UNIT CONVERTER")
-            print("="*50)
-            print("1. Length Converter")
-            print("2. Weight Converter")
-            print("3. Temperature Converter")
-            print("4. Time Converter")
-            print("5. Volume Converter")
-            print("6. Area Converter")
-            print("7. Back to Main Menu")
-            print("="*50)
-
-            try:
-                choice = get_menu_choice(7)
-
-                if choice == 1:
-                    self.convert_interface("length")
-                elif choice == 2:
-                    self.convert_interface("weight")
-                elif choice == 3:
-                    self.convert_interface("temperature")
-                elif choice == 4:
-                    self.convert_interface("time")
-                elif choice == 5:
-                    self.convert_interface("volume")
-                elif choice == 6:
-                    self.convert_interface("area")
-                elif choice == 7:
-                    break
-
-            except KeyboardInterrupt:
-                print("\nOperation cancelled.")
-                break
-            except Exception as e:
-                display_error(str(e))
+        Menu("UNIT CONVERTER", [
+            ("Length Converter", lambda: self.convert_interface("length")),
+            ("Weight Converter", lambda: self.convert_interface("weight")),
+            ("Temperature Converter", lambda: self.convert_interface("temperature")),
+            ("Time Converter", lambda: self.convert_interface("time")),
+            ("Volume Converter", lambda: self.convert_interface("volume")),
+            ("Area Converter", lambda: self.convert_interface("area")),
+            ("Custom Units (e.g. km/h, N·m, kg/m³)", self.custom_convert_interface),
+            ("Bulk Convert File Columns (.csv or .npy)", self.bulk_convert_interface),
+            ("Back to Main Menu", None),
+        ]).run()
+
+    def register_operations(self, registry):
+        """Add a conversion operation per category (plus free-form and file conversions)"""
+        for category, units in self.conversion_factors.items():
+            registry.register(f"convert.{category}", functools.partial(self.convert_units, category),
+                              [Parameter("value"), Parameter("from_unit", str), Parameter("to_unit", str)],
+                              f"Convert {category} ({', '.join(units)})")
+
+        registry.register("convert.units", self.convert,
+                          [Parameter("value"), Parameter("from_unit", str, description="unit expression, e.g. km/h"),
+                           Parameter("to_unit", str, description="unit expression, e.g. m/s")],
+                          "Convert between any compatible unit expressions")
+        registry.register("convert.file", lambda input_path, output_path, mapping: convert_file(
+                              self, input_path, output_path, parse_mapping(mapping.split(",")))[1],
+                          [Parameter("input_path", str), Parameter("output_path", str),
+                           Parameter("mapping", str, description="column=from:to, comma separated")],
+                          "Convert columns of a CSV or .npy file; returns rows/sec stats")
 
     def convert_interface(self, category):
         """Generic interface for unit conversion"""
@@ -214,6 +210,50 @@ class UnitConverter:
         except ValueError as e:
             display_error(str(e))
 
+    def custom_convert_interface(self):
+        """Interface for converting between free-form unit expressions"""
+        print("\n--- CUSTOM UNIT CONVERTER ---")
+        print("Use SI prefixes and compound units, e.g. km/h, kW*h, g/cm^3")
+
+        from_expr = input("Enter source unit: ").strip()
+        to_expr = input("Enter target unit: ").strip()
+        value = get_numeric_input(f"Enter value in {from_expr}: ")
+
+        try:
+            result = self.convert(value, from_expr, to_expr)
+
+            print(f"\nResult:")
+            print(f"{value} {from_expr} = {result:.6f} {to_expr}")
+
+            expression = f"Convert: {value} {from_expr} to {to_expr}"
+            self.history_manager.add_to_history(expression, result)
+
+        except ValueError as e:
+            display_error(str(e))
+
+    def bulk_convert_interface(self):
+        """Interface for converting whole columns of a data file"""
+        print("\n--- BULK FILE CONVERTER ---")
+        print("Map columns as column=from_unit:to_unit, e.g. temp=celsius:fahrenheit, dist=mile:km")
+
+        input_path = input("Input file (.csv or .npy): ").strip()
+        output_path = input("Output file (.csv or .npy): ").strip()
+        specs = input("Column mappings (comma separated): ").split(",")
+
+        try:
+            output_path, stats = convert_file(self, input_path, output_path,
+                                              parse_mapping([spec for spec in specs if spec.strip()]))
+
+            print(f"\nConverted {stats['rows']} rows in {stats['seconds']:.2f}s "
+                  f"({stats['rows_per_second']:,.0f} rows/sec)")
+            print(f"Saved to {output_path}")
+
+            expression = f"Bulk convert: {input_path} ({', '.join(s.strip() for s in specs if s.strip())})"
+            self.history_manager.add_to_history(expression, f"{stats['rows']} rows -> {output_path}")
+
+        except ValueError as e:
+            display_error(str(e))
+
     def quick_convert(self, value, from_unit, to_unit, category=None):
         """Quick conversion without user interface"""
         # Auto-detect category if not provided
@@ -223,7 +263,8 @@ class UnitConverter:
                     category = cat
                     break
             else:
-                raise ValueError(f"Cannot find conversion from {from_unit} to {to_unit}")
+                # Fall back to the registry for prefixed and compound units
+                return self.convert(value, from_unit, to_unit)
 
         return self.convert_units(category, value, from_unit, to_unit)
 
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import pickle
+import platform
+import sqlite3
+import threading
+import time
+import numpy as np
+
+from memoize import MISSING
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Results computed by another Python/NumPy may differ in the last bits, so
+# they are kept apart
+BACKEND = f"python-{platform.python_version()}/numpy-{np.__version__}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO usage VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+    BEGIN UPDATE usage SET bytes = bytes + new.size; END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries
+    BEGIN UPDATE usage SET bytes = bytes + new.size - old.size; END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+    BEGIN UPDATE usage SET bytes = bytes - old.size; END;
+"""
+
+
+def make_key(engine, *parts):
+    """
+    Stable key for a result: the engine (e.g. a function name) plus whatever
+    it depends on (arguments, angle mode, ...), tagged with the backend
+
+    Parts are identified by their repr, which is the same in every process
+    for numbers, strings, tuples and types.
+    """
+    text = repr((engine, BACKEND) + parts)
+    return f"{engine}:{hashlib.blake2b(text.encode(), digest_size=16).hexdigest()}"
+
+
+class DiskCache:
+    """
+    Result cache in a SQLite file, shared by every process that opens it
+
+    The database runs in WAL mode so readers never block each other or a
+    writer. Entries are evicted least recently used first once the total
+    size passes max_bytes. Access times are refreshed at most once per
+    touch_interval seconds so that hits stay read-only.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, touch_interval=60.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        """This thread's connection (SQLite connections can't cross threads or forks)"""
+        connection = getattr(self.local, "connection", None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+        return connection
+
+    def key(self, engine, *parts):
+        return make_key(engine, *parts)
+
+    def _count(self, counter, amount=1):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key):
+        """Look up a result by key (from make_key); MISSING if absent"""
+        connection = self._connection()
+        row = connection.execute("SELECT value, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            return MISSING
+
+        now = time.time()
+        if now - row[1] > self.touch_interval:
+            try:
+                connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            except sqlite3.OperationalError:
+                pass  # Busy: the entry just looks a little older for eviction
+        self._count("hits")
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        """Store a result, evicting least recently used entries past max_bytes"""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "accessed = excluded.accessed", (key, blob, len(blob), time.time()))
+            evicted = self._evict(connection)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._count("writes")
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _evict(self, connection):
+        """Drop the oldest entries until the cache is back under 90% of max_bytes"""
+        used = connection.execute("SELECT bytes FROM usage").fetchone()[0]
+        if used <= self.max_bytes:
+            return 0
+
+        target = self.max_bytes * 0.9
+        doomed = []
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if used <= target:
+                break
+            doomed.append((key,))
+            used -= size
+        connection.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        return len(doomed)
+
+    def clear(self):
+        """Delete every entry (for all processes) and reset the counters"""
+        self._connection().execute("DELETE FROM entries")
+        with self.lock:
+            self.hits = self.misses = self.writes = self.evictions = 0
+
+    def stats(self):
+        """Hit rate of this process, plus the size of the shared cache"""
+        entries, used = self._connection().execute(
+            "SELECT (SELECT COUNT(*) FROM entries), (SELECT bytes FROM usage)").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "size": entries,
+            "bytes": used,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self):
+        """Close this thread's connection"""
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
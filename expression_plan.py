@@ -0,0 +1,325 @@
+import ast
+import math
+import re
+
+# Names each engine understands; anything else in an expression is a parameter
+BASIC_NAMES = {"sqrt", "sin", "cos", "tan", "pi", "e"}
+SCIENTIFIC_NAMES = BASIC_NAMES | {"log", "ln", "exp"}
+FINANCE_NAMES = {"emi", "simple_interest", "compound_interest", "gst", "convert"}
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant, ast.keyword,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+)
+
+NUMBER = r"[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?"
+
+# Entries the calculator screens write to history, as registry operations.
+# "Label: Field=value, ..." entries: label -> (operation, {field: argument},
+# fixed arguments, index of the figure the screen records, if the operation
+# returns several)
+HISTORY_LABELS = {
+    "EMI": ("finance.emi", {"Loan": "principal", "Rate": "rate", "Time": "time"}, {}, 0),
+    "SI": ("finance.simple_interest", {"P": "principal", "R": "rate", "T": "time"}, {}, 1),
+    "CI": ("finance.compound_interest",
+           {"P": "principal", "R": "rate", "T": "time", "N": "compounding_frequency"}, {}, 1),
+    "Loan Amount": ("finance.principal_from_emi", {"EMI": "emi", "Rate": "rate", "Time": "time"}, {}, None),
+    "Loan Tenure": ("finance.tenure_from_emi", {"Loan": "principal", "Rate": "rate", "EMI": "emi"}, {}, None),
+    "Loan Rate": ("finance.rate_from_emi", {"Loan": "principal", "EMI": "emi", "Time": "time"}, {}, 0),
+    "NPV": ("finance.npv", {"Rate": "rate", "Cash flows": "cashflows"}, {}, None),
+    "GST Add": ("finance.gst", {"Amount": "amount", "Rate": "gst_rate"}, {"calculation_type": "add"}, 1),
+    "GST Extract": ("finance.gst", {"Amount": "amount", "Rate": "gst_rate"}, {"calculation_type": "remove"}, 1),
+}
+
+# Entries that record something other than a repeatable calculation: prefix -> why
+UNPLANNED_LABELS = {
+    "Script: ": "a script's variables live in its session",
+    "Plot: ": "a plot is drawn, not calculated",
+    "Matrix: ": "matrices are stored by name in the matrix session",
+    "Bulk convert: ": "a bulk conversion reads and writes files",
+    "Monte Carlo: ": "a simulation draws new random samples each run",
+    "Statistics of ": "the summarized values aren't recorded",
+}
+# "expression with P=1000, r=5" entries of a parameterized favorite
+_WITH_BINDINGS = re.compile(r" with [A-Za-z_]\w*=[^,]+(?:, [A-Za-z_]\w*=[^,]+)*$")
+
+_FIELD = re.compile(r"([A-Za-z][\w ]*?)=(\[[^\]]*\]|[^,]+)")
+# "category.name(key=value, ...)" entries of Run Operation
+_OPERATION_CALL = re.compile(r"^([a-z_]+\.[a-z_]+)\((.*)\)$")
+_BINARY_OPERATIONS = {"+": "basic.add", "-": "basic.subtract", "*": "basic.multiply", "/": "basic.divide"}
+
+
+_INVERSE_TRIG = {"sin": "asin", "cos": "acos", "tan": "atan"}
+_ANGLE_UNITS = {"°": "degrees", " rad": "radians"}
+
+
+def _trig(operation, argument, value, unit):
+    """Trig operation in the angle mode the screen recorded, if it recorded one"""
+    arguments = {argument: value}
+    if unit:
+        arguments["mode"] = _ANGLE_UNITS[unit]
+    return operation, arguments
+
+
+def _conversion(value, from_unit, to_unit):
+    """Older histories log currency conversions as "Convert: 100 USD to EUR" too"""
+    if from_unit.isupper() and to_unit.isupper():
+        return "finance.convert_currency", {"amount": value, "from_currency": from_unit, "to_currency": to_unit}
+    return "convert.units", {"value": value, "from_unit": from_unit, "to_unit": to_unit}
+
+
+# Shorthand entries of the other screens: regex -> builder of (operation,
+# arguments[, index of the recorded figure])
+HISTORY_PATTERNS = [
+    (re.compile(rf"^({NUMBER}) ([-+*/]) ({NUMBER})$"),
+     lambda m: (_BINARY_OPERATIONS[m[2]], {"a": m[1], "b": m[3]})),
+    (re.compile(rf"^({NUMBER})²$"), lambda m: ("basic.square", {"x": m[1]})),
+    (re.compile(rf"^√({NUMBER})$"), lambda m: ("basic.square_root", {"x": m[1]})),
+    (re.compile(rf"^({NUMBER})% of ({NUMBER})$"), lambda m: ("basic.percentage", {"value": m[2], "percent": m[1]})),
+    (re.compile(rf"^(sin|cos|tan)\(({NUMBER})(°| rad)?\)$"),
+     lambda m: _trig(f"scientific.{m[1]}", "angle", m[2], m[3])),
+    (re.compile(rf"^(sin|cos|tan)⁻¹\(({NUMBER})\)(?: = \S+?(°| rad))?$"),
+     lambda m: _trig(f"scientific.{_INVERSE_TRIG[m[1]]}", "value", m[2], m[3])),
+    (re.compile(rf"^(asin|acos|atan)\(({NUMBER})\)$"), lambda m: (f"scientific.{m[1]}", {"value": m[2]})),
+    (re.compile(rf"^ln\(({NUMBER})\)$"), lambda m: ("scientific.ln", {"value": m[1]})),
+    (re.compile(rf"^log({NUMBER})?\(({NUMBER})\)$"),
+     lambda m: ("scientific.log", {"value": m[2], "base": m[1] or 10})),
+    (re.compile(rf"^e\^({NUMBER})$"), lambda m: ("scientific.exp", {"value": m[1]})),
+    (re.compile(rf"^({NUMBER})\^({NUMBER})$"), lambda m: ("scientific.power", {"base": m[1], "exponent": m[2]})),
+    (re.compile(r"^(\d+)!$"), lambda m: ("scientific.factorial", {"n": m[1]})),
+    (re.compile(rf"^\|({NUMBER})\|$"), lambda m: ("scientific.abs", {"value": m[1]})),
+    (re.compile(rf"^(?:Currency: )?({NUMBER}) ([A-Za-z]{{3}}) (?:to|in) ([A-Za-z]{{3}})$"),
+     lambda m: ("finance.convert_currency",
+                {"amount": m[1], "from_currency": m[2].upper(), "to_currency": m[3].upper()})),
+    (re.compile(rf"^Convert: ({NUMBER}) (.+) to (.+)$"), lambda m: _conversion(*m.groups())),
+    (re.compile(rf"^d(²)?/dx²? (.+) at x=({NUMBER})$"),
+     lambda m: ("calculus.derivative", {"f": m[2], "x": m[3], "order": 2 if m[1] else 1})),
+    (re.compile(rf"^∫ (.+) dx from ({NUMBER}) to ({NUMBER})$"),
+     lambda m: ("calculus.integrate", {"f": m[1], "a": m[2], "b": m[3]})),
+    (re.compile(rf"^Roots of (.+) in \[({NUMBER}), ({NUMBER})\]$"),
+     lambda m: ("calculus.roots", {"f": m[1], "a": m[2], "b": m[3]}, 0)),
+    (re.compile(rf"^ODE: y' = (.+), y\(({NUMBER})\) = ({NUMBER}), y\(({NUMBER})\)$"),
+     lambda m: ("calculus.ode", {"f": m[1], "t0": m[2], "y0": m[3], "t1": m[4]})),
+]
+
+
+def history_value(text):
+    """History field text as a number (or list of numbers) where possible"""
+    text = text.strip().removesuffix(" years").rstrip("%")
+    if text.startswith("["):
+        return [float(part) for part in text.strip("[]").replace(",", " ").split()]
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def unplanned_reason(calculation):
+    """Why a history entry can't be replayed as a calculation, or None"""
+    calculation = calculation.strip()
+    for prefix, reason in UNPLANNED_LABELS.items():
+        if calculation.startswith(prefix):
+            return f"\"{prefix.strip(': ')}\" entries can't be replayed: {reason}"
+    if _WITH_BINDINGS.search(calculation):
+        return "Entries of a favorite run with values can't be replayed: run the favorite itself instead"
+    return None
+
+
+def parse_history_label(calculation):
+    """
+    Registry operation for an entry the calculator screens write to history
+
+    Returns:
+        tuple: (operation, arguments, index of the recorded figure or None),
+        or None if the entry isn't in a known format
+    """
+    calculation = calculation.strip()
+    call = _OPERATION_CALL.match(calculation)
+    if call:
+        return call[1], {key.strip(): history_value(value) for key, value in _FIELD.findall(call[2])}, None
+
+    label, separator, fields = calculation.partition(": ")
+    if separator and label in HISTORY_LABELS:
+        operation, names, fixed, figure = HISTORY_LABELS[label]
+        arguments = {names[key.strip()]: history_value(value) for key, value in _FIELD.findall(fields)
+                     if key.strip() in names}
+        if len(arguments) != len(names):
+            return None
+        return operation, dict(arguments, **fixed), figure
+
+    # Some screens append " = result" (and a unit) to what they record
+    expression = calculation.split(" = ")[0]
+    for pattern, build in HISTORY_PATTERNS:
+        match = pattern.match(calculation) or pattern.match(expression)
+        if match:
+            operation, arguments, *figure = build(match)
+            arguments = {key: history_value(str(value)) for key, value in arguments.items()}
+            return operation, arguments, figure[0] if figure else None
+    return None
+
+
+class ExpressionPlan:
+    """
+    A favorite compiled once: target engine, parsed AST and bound parameters
+
+    Either code (a compiled expression, possibly with free parameters) or
+    call plus bound arguments (a registry operation, from a history entry)
+    is set; figure picks the recorded number out of a multi-part result.
+    """
+    __slots__ = ("expression", "engine", "tree", "code", "parameters", "call", "bound", "figure")
+
+    def __init__(self, expression, engine, tree=None, code=None, parameters=(), call=None, bound=(), figure=None):
+        self.expression = expression
+        self.engine = engine
+        self.tree = tree
+        self.code = code
+        self.parameters = tuple(parameters)
+        self.call = call
+        self.bound = tuple(bound)
+        self.figure = figure
+
+    def evaluate(self, namespaces, values=None):
+        """Run the plan in its engine's namespace, with values for any parameters"""
+        namespace = namespaces.get(self.engine)
+        if self.call is not None:
+            if namespace is None:
+                raise ValueError("Running a history entry needs the operation registry")
+            result = namespace.invoke(self.call, **dict(self.bound))
+            return result if self.figure is None else result[self.figure]
+
+        values = values or {}
+        missing = [name for name in self.parameters if name not in values]
+        if missing:
+            raise ValueError(f"Missing values for: {', '.join(missing)}")
+        return eval(self.code, namespace, values)
+
+    def __repr__(self):
+        return f"ExpressionPlan({self.expression!r}, engine={self.engine!r}, parameters={self.parameters!r})"
+
+
+def _labeled_plan(expression):
+    """Plan for an entry the calculator screens write to history, or None"""
+    parsed = parse_history_label(expression)
+    if parsed is None:
+        return None
+    operation, arguments, figure = parsed
+    return ExpressionPlan(expression, "operations", call=operation, bound=arguments.items(), figure=figure)
+
+
+def check_expression(tree):
+    """
+    Check a parsed expression against the allowed syntax
+
+    Returns the called function names and the other names read, the latter
+    in left-to-right order.
+    """
+    functions = []
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name):
+                raise ValueError("Only named functions can be called")
+            functions.append(node.func)
+        elif isinstance(node, ast.Name):
+            names.append(node)
+        elif isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, str)):
+            raise ValueError("Only numbers and currency codes are allowed as constants")
+
+    called = {id(func) for func in functions}
+    names = [node.id for node in sorted(names, key=lambda node: node.col_offset) if id(node) not in called]
+    return [func.id for func in functions], names
+
+
+def compile_plan(expression):
+    """Parse, check and compile an expression into an ExpressionPlan"""
+    expression = expression.strip()
+    reason = unplanned_reason(expression)
+    if reason:
+        raise ValueError(reason)
+
+    # History entries first: "sin(30.0)" is valid Python too, but the screen
+    # recorded it in its angle mode
+    plan = _labeled_plan(expression)
+    if plan is not None:
+        return plan
+
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}")
+    functions, names = check_expression(tree)
+
+    unknown = [name for name in functions if name not in SCIENTIFIC_NAMES | FINANCE_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown function: {unknown[0]}")
+
+    # Pick the engine once, from the names actually used
+    used = set(functions) | set(names)
+    if used & FINANCE_NAMES:
+        engine = "finance"
+    elif used & (SCIENTIFIC_NAMES - {"sqrt", "pi", "e"}):
+        engine = "scientific"
+    else:
+        engine = "basic"
+
+    # Free names are parameters, kept in order of first appearance
+    parameters = []
+    for name in names:
+        if name not in SCIENTIFIC_NAMES and name not in parameters:
+            parameters.append(name)
+
+    code = compile(tree, "<favorite>", "eval")
+    return ExpressionPlan(expression, engine, tree, code, parameters)
+
+
+def build_namespaces(finance_calc=None, operations=None, scientific_calc=None):
+    """
+    Evaluation namespaces per engine, built once and shared by every plan
+
+    History entries run through the operation registry, if one is given;
+    with a scientific calculator, sin/cos/tan follow its angle mode.
+    """
+    basic = {
+        "__builtins__": None,
+        "sqrt": math.sqrt,
+        "sin": math.sin,
+        "cos": math.cos,
+        "tan": math.tan,
+        "pi": math.pi,
+        "e": math.e,
+    }
+    if scientific_calc is not None:
+        basic.update(sin=scientific_calc.sine_array, cos=scientific_calc.cosine_array,
+                     tan=scientific_calc.tangent_array)
+    scientific = dict(basic, log=math.log10, ln=math.log, exp=math.exp)
+    finance = dict(scientific)
+
+    if finance_calc is not None:
+        # Each call gives the headline figure the calculator menus record in history
+        finance.update({
+            "emi": lambda principal, rate, time: finance_calc.emi_calculator(principal, rate, time)[0],
+            "simple_interest": lambda principal, rate, time: finance_calc.simple_interest(principal, rate, time)[1],
+            "compound_interest": lambda principal, rate, time, compounding=1:
+                finance_calc.compound_interest(principal, rate, time, compounding)[1],
+            "gst": lambda amount, rate: finance_calc.gst_calculator(amount, rate, "add")[1],
+            "convert": finance_calc.currency_converter,
+        })
+
+    namespaces = {"basic": basic, "scientific": scientific, "finance": finance}
+    if operations is not None:
+        namespaces["operations"] = operations
+    return namespaces
+
+
+if __name__ == "__main__":
+    namespaces = build_namespaces()
+
+    for expression in ["2 + 3 * 4", "sqrt(16) + log(100)", "P * (1 + r / 100) ** n",
+                       "EMI: Loan=100000.0, Rate=8.5%, Time=20.0 years"]:
+        plan = compile_plan(expression)
+        print(plan)
+
+    plan = compile_plan("P * (1 + r / 100) ** n")
+    print(f"Result: {plan.evaluate(namespaces, {'P': 1000, 'r': 5, 'n': 2})}")
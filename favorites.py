@@ -2,11 +2,14 @@
 import json
 import os
 from datetime import datetime
+from expression_plan import compile_plan
 
 class FavoritesManager:
     def __init__(self, filename="data/favorites.json"):
         self.filename = filename
         self.favorites = []
+        # Favorite name (lowercase) -> compiled ExpressionPlan
+        self.plans = {}
         self.load_favorites()
 
     def load_favorites(self):
@@ -53,15 +56,43 @@ class FavoritesManager:
         }
 
         self.favorites.append(favorite_entry)
+        self._try_compile(favorite_entry)
         self.save_favorites()
         return True, "Favorite added successfully"
 
+    def _compile(self, fav):
+        """Compile and cache a favorite's plan (ValueError if it can't be compiled)"""
+        self.plans.pop(fav["name"].lower(), None)
+        plan = compile_plan(fav["expression"])
+
+        fav["engine"] = plan.engine
+        fav["parameters"] = list(plan.parameters)
+        self.plans[fav["name"].lower()] = plan
+        return plan
+
+    def _try_compile(self, fav):
+        """Compile a plan when saving; free-text favorites are still kept"""
+        try:
+            self._compile(fav)
+        except ValueError:
+            fav.pop("engine", None)
+            fav.pop("parameters", None)
+
+    def get_plan(self, index):
+        """Compiled plan of a favorite, compiling it on first use after loading"""
+        if index < 0 or index >= len(self.favorites):
+            raise ValueError("Invalid favorite index")
+
+        fav = self.favorites[index]
+        return self.plans.get(fav["name"].lower()) or self._compile(fav)
+
     def remove_favorite(self, index):
         """Remove a favorite by index"""
         if index < 0 or index >= len(self.favorites):
             return None
 
         removed = self.favorites.pop(index)
+        self.plans.pop(removed["name"].lower(), None)
         self.save_favorites()
         return removed
 
@@ -109,12 +140,31 @@ class FavoritesManager:
 
         return results
 
+    def search_page(self, search_term="", cursor=0, page_size=10):
+        """One page of (index, favorite) pairs matching search_term and the next page's cursor"""
+        search_term = search_term.lower()
+        page = []
+
+        for index in range(cursor, len(self.favorites)):
+            if len(page) == page_size:
+                return page, index
+            fav = self.favorites[index]
+            if (not search_term or
+                    search_term in fav["name"].lower() or
+                    search_term in fav["expression"].lower() or
+                    search_term in fav["category"].lower()):
+                page.append((index, fav))
+
+        return page, None
+
     def edit_favorite(self, index, new_name=None, new_expression=None, new_category=None):
         """Edit an existing favorite"""
         if index < 0 or index >= len(self.favorites):
             return False, "Invalid favorite index"
 
         fav = self.favorites[index]
+        # The old plan is keyed by the old name and built from the old expression
+        self.plans.pop(fav["name"].lower(), None)
 
         if new_name is not None:
             # Check if new name conflicts with existing favorites
@@ -129,6 +179,7 @@ class FavoritesManager:
         if new_category is not None:
             fav["category"] = new_category
 
+        self._try_compile(fav)
         self.save_favorites()
         return True, "Favorite updated successfully"
 
@@ -139,6 +190,9 @@ class FavoritesManager:
         else:
             self.favorites = [fav for fav in self.favorites if fav["category"].lower() != category.lower()]
 
+        kept = {fav["name"].lower() for fav in self.favorites}
+        self.plans = {name: plan for name, plan in self.plans.items() if name in kept}
+
         return self.save_favorites()
 
     def export_favorites(self, export_format="txt", filename=None):
@@ -2,12 +2,27 @@
 import math
 import json
 import os
+from datetime import datetime
+import numpy as np
 from utils import get_numeric_input, display_error, get_menu_choice
+from rate_history import RateHistory
+from memoize import memoize
+from monte_carlo import simulate_investment
+import cashflow
+import loan_solver
+from operations import Menu, Parameter
 
 class FinancialCalculator:
     def __init__(self, history_manager):
         self.history_manager = history_manager
+        self.currency_data = {}
         self.currency_rates = self.load_currency_rates()
+        self.rebuild_cross_rates()
+
+        # Seed the rate history with the loaded snapshot the first time round
+        self.rate_history = RateHistory()
+        if self.rate_history.is_empty():
+            self.rate_history.record_snapshot(self.currency_rates, self.currency_data.get("last_updated"))
 
     def load_currency_rates(self):
         """Load currency rates from JSON file or use defaults"""
@@ -27,7 +42,13 @@ class FinancialCalculator:
         try:
             if os.path.exists(rates_file):
                 with open(rates_file, 'r') as f:
-                    return json.load(f)
+                    data = json.load(f)
+
+                # currency.json keeps the rates under "rates" next to its metadata
+                if isinstance(data.get("rates"), dict):
+                    self.currency_data = data
+                    return data["rates"]
+                return data
             else:
                 # Create directory if it doesn't exist
                 os.makedirs(os.path.dirname(rates_file), exist_ok=True)
@@ -42,6 +63,11 @@ class FinancialCalculator:
     def save_currency_rates(self, rates):
         """Save currency rates to JSON file"""
         try:
+            if self.currency_data:
+                self.currency_data["rates"] = rates
+                self.currency_data["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                rates = self.currency_data
+
             with open("data/currency.json", 'w') as f:
                 json.dump(rates, f, indent=2)
             return True
@@ -49,12 +75,14 @@ class FinancialCalculator:
             display_error(f"Could not save currency rates: {e}")
             return False
 
+    @memoize()
     def simple_interest(self, principal, rate, time):
         """Calculate simple interest"""
         interest = (principal * rate * time) / 100
         total_amount = principal + interest
         return interest, total_amount
 
+    @memoize()
     def compound_interest(self, principal, rate, time, compounding_frequency=1):
         """Calculate compound interest"""
         # A = P(1 + r/n)^(nt)
@@ -63,6 +91,16 @@ class FinancialCalculator:
         interest = amount - principal
         return interest, amount
 
+    def monte_carlo_projection(self, principal, rate, time, volatility, compounding_frequency=1, **options):
+        """Project compound growth under random returns, next to the deterministic result"""
+        results = simulate_investment(principal, rate, time, volatility, compounding_frequency, **options)
+
+        if not options.get("contribution"):
+            _, results["deterministic_amount"] = self.compound_interest(principal, rate, time, compounding_frequency)
+
+        return results
+
+    @memoize()
     def emi_calculator(self, principal, rate, time):
         """Calculate Equated Monthly Installment (EMI)"""
         # Convert annual rate to monthly and time to months
@@ -81,6 +119,35 @@ class FinancialCalculator:
 
         return emi, total_interest, total_payment
 
+    def principal_from_emi(self, emi, rate, time):
+        """Calculate the affordable loan amount for a given EMI"""
+        return loan_solver.principal_from_emi(emi, rate, time)
+
+    def tenure_from_emi(self, principal, rate, emi):
+        """Calculate the loan tenure (years) needed for a given EMI"""
+        return loan_solver.tenure_from_emi(principal, rate, emi)
+
+    def rate_from_emi(self, principal, emi, time):
+        """Calculate the implied annual interest rate (%) and solver diagnostics"""
+        return loan_solver.rate_from_emi(principal, emi, time)
+
+    def npv(self, rate, cashflows):
+        """Calculate Net Present Value (first cash flow at period 0)"""
+        return cashflow.npv(rate, cashflows)
+
+    def irr(self, cashflows):
+        """Calculate Internal Rate of Return (%) for one or many cash-flow vectors"""
+        return cashflow.irr(cashflows)
+
+    def xirr(self, cashflows, dates):
+        """Calculate annualised IRR (%) for cash flows on irregular dates"""
+        return cashflow.xirr(cashflows, dates)
+
+    def payback_period(self, cashflows, rate=None):
+        """Calculate (optionally discounted) payback period in periods"""
+        return cashflow.payback_period(cashflows, rate)
+
+    @memoize()
     def gst_calculator(self, amount, gst_rate, calculation_type="add"):
         """Calculate GST amount"""
         if calculation_type == "add":
@@ -92,64 +159,118 @@ class FinancialCalculator:
             gst_amount = amount - original_amount
             return gst_amount, original_amount
 
+    def rebuild_cross_rates(self):
+        """Precompute the cross-rate matrix: cross_rates[i, j] converts code i to code j"""
+        self.currency_codes = list(self.currency_rates.keys())
+        self.currency_index = {code: i for i, code in enumerate(self.currency_codes)}
+
+        rates = np.array([self.currency_rates[code] for code in self.currency_codes], dtype=float)
+        self.cross_rates = rates[np.newaxis, :] / rates[:, np.newaxis]
+
+    def currency_indices(self, codes):
+        """Map an array of currency codes to row/column indices of the cross-rate matrix"""
+        codes = np.asarray(codes)
+        if np.issubdtype(codes.dtype, np.integer):
+            if codes.size and (codes.min() < 0 or codes.max() >= len(self.currency_codes)):
+                raise ValueError("Currency index out of range")
+            return codes
+
+        # Look up each distinct code once, then scatter back over the array
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        try:
+            lookup = np.array([self.currency_index[code] for code in unique_codes.tolist()], dtype=np.intp)
+        except KeyError as e:
+            raise ValueError(f"Invalid currency code: {e.args[0]}")
+
+        return lookup[inverse].reshape(codes.shape)
+
     def currency_converter(self, amount, from_currency, to_currency):
         """Convert currency using stored rates"""
-        if from_currency not in self.currency_rates or to_currency not in self.currency_rates:
+        if from_currency not in self.currency_index or to_currency not in self.currency_index:
             raise ValueError("Invalid currency code")
 
-        # Convert to USD first, then to target currency
-        amount_in_usd = amount / self.currency_rates[from_currency]
-        converted_amount = amount_in_usd * self.currency_rates[to_currency]
+        return amount * self.cross_rates.item(self.currency_index[from_currency],
+                                              self.currency_index[to_currency])
 
-        return converted_amount
+    def convert_many(self, amounts, from_currencies, to_currencies):
+        """Convert arrays of amounts between currency codes in one vectorized pass"""
+        amounts = np.asarray(amounts, dtype=float)
+        from_idx = self.currency_indices(from_currencies)
+        to_idx = self.currency_indices(to_currencies)
+
+        return amounts * self.cross_rates[from_idx, to_idx]
 
     def update_currency_rate(self, currency, rate):
         """Update currency exchange rate"""
         if currency not in self.currency_rates:
             raise ValueError("Currency not found")
+        if rate <= 0:
+            raise ValueError("Exchange rate must be positive")
 
         self.currency_rates[currency] = rate
+        self.rebuild_cross_rates()
+        self.rate_history.record(currency, rate)
         self.save_currency_rates(self.currency_rates)
         return True
 
+    def currency_converter_as_of(self, amount, from_currency, to_currency, when):
+        """Convert currency using the rates that were in effect at a given time"""
+        from_rate = self.rate_history.rate_as_of(from_currency, when)
+        to_rate = self.rate_history.rate_as_of(to_currency, when)
+        return amount / from_rate * to_rate
+
+    def convert_ledger(self, dates, amounts, currencies, to_currency="USD"):
+        """Convert (date, amount, currency) ledger rows using historical rates"""
+        return self.rate_history.convert_ledger(dates, amounts, currencies, to_currency)
+
     def run(self):
         """Run the financial calculator interface"""
-        while True:
-            print("\n" + "="*50)
-            print("        FINANCIAL CALCULATOR")
-            print("="*50)
-            print("1. Simple Interest Calculator")
-            print("2. Compound Interest Calculator")
-            print("3. EMI Calculator")
-            print("4. GST Calculator")
-            print("5. Currency Converter")
-            print("6. Manage Currency Rates")
-            print("7. Back to Main Menu")
-            print("="*50)
-
-            try:
-                choice = get_menu_choice(7)
-
-                if choice == 1:
-                    self.simple_interest_calculator()
-                elif choice == 2:
-                    self.compound_interest_calculator()
-                elif choice == 3:
-                    self.emi_calculator_interface()
-                elif choice == 4:
-                    self.gst_calculator_interface()
-                elif choice == 5:
-                    self.currency_converter_interface()
-                elif choice == 6:
-                    self.manage_currency_rates()
-                elif choice == 7:
-                    break
-
-            except KeyboardInterrupt:
-                print("\nOperation cancelled.")
-                break
-            except Exception as e:
-                display_error(str(e))
+        Menu("FINANCIAL CALCULATOR", [
+            ("Simple Interest Calculator", self.simple_interest_calculator),
+            ("Compound Interest Calculator", self.compound_interest_calculator),
+            ("EMI Calculator", self.emi_calculator_interface),
+            ("GST Calculator", self.gst_calculator_interface),
+            ("Currency Converter", self.currency_converter_interface),
+            ("Manage Currency Rates", self.manage_currency_rates),
+            ("Monte Carlo Investment Projection", self.monte_carlo_interface),
+            ("Cash Flow Analysis (NPV/IRR/Payback)", self.cash_flow_interface),
+            ("Loan Solver (Amount/Tenure/Rate from EMI)", self.loan_solver_interface),
+            ("Back to Main Menu", None),
+        ]).run()
+
+    def register_operations(self, registry):
+        """Add the financial operations to an OperationRegistry"""
+        principal = Parameter("principal", description="principal amount")
+        rate = Parameter("rate", description="annual interest rate (%)")
+        time = Parameter("time", description="time period (years)")
+        cashflows = Parameter("cashflows", list, description="cash flows, starting with the investment")
+
+        registry.register("finance.simple_interest", self.simple_interest, [principal, rate, time],
+                          "Interest earned and total amount")
+        registry.register("finance.compound_interest", self.compound_interest,
+                          [principal, rate, time, Parameter("compounding_frequency", default=1)],
+                          "Interest earned and total amount")
+        registry.register("finance.emi", self.emi_calculator, [principal, rate, time],
+                          "EMI, total interest and total payment")
+        registry.register("finance.principal_from_emi", self.principal_from_emi,
+                          [Parameter("emi"), rate, time], "Loan amount an EMI pays off")
+        registry.register("finance.tenure_from_emi", self.tenure_from_emi,
+                          [principal, rate, Parameter("emi")], "Years needed to repay with an EMI")
+        registry.register("finance.rate_from_emi", self.rate_from_emi,
+                          [principal, Parameter("emi"), time], "Annual rate (%) implied by an EMI")
+        registry.register("finance.gst", self.gst_calculator,
+                          [Parameter("amount"), Parameter("gst_rate", description="GST rate (%)"),
+                           Parameter("calculation_type", str, default="add", description="add or remove")],
+                          "GST amount and the total (add) or original amount (remove)")
+        registry.register("finance.convert_currency", self.currency_converter,
+                          [Parameter("amount"), Parameter("from_currency", str), Parameter("to_currency", str)],
+                          "Convert between currencies at the stored rates")
+        registry.register("finance.npv", self.npv, [Parameter("rate", description="discount rate (%)"), cashflows],
+                          "Net present value")
+        registry.register("finance.irr", self.irr, [cashflows], "Internal rate of return per period (%)")
+        registry.register("finance.payback_period", self.payback_period,
+                          [cashflows, Parameter("rate", default=None, description="discount rate (%)")],
+                          "Periods until the investment is recovered")
 
     def simple_interest_calculator(self):
         """Simple interest calculation interface"""
@@ -201,6 +322,81 @@ class FinancialCalculator:
         except ValueError as e:
             display_error(str(e))
 
+    def loan_solver_interface(self):
+        """Inverse EMI interface: solve for amount, tenure or rate"""
+        print("\n--- Loan Solver ---")
+        print("1. Affordable loan amount for an EMI")
+        print("2. Loan tenure for an EMI")
+        print("3. Interest rate implied by an EMI")
+
+        try:
+            choice = get_menu_choice(3)
+
+            if choice == 1:
+                emi = get_numeric_input("Enter monthly EMI: ")
+                rate = get_numeric_input("Enter annual interest rate (%): ")
+                time = get_numeric_input("Enter loan tenure (years): ")
+                result = self.principal_from_emi(emi, rate, time)
+                print(f"\nAffordable Loan Amount: {result:.2f}")
+                expression = f"Loan Amount: EMI={emi}, Rate={rate}%, Time={time} years"
+
+            elif choice == 2:
+                principal = get_numeric_input("Enter loan amount: ")
+                rate = get_numeric_input("Enter annual interest rate (%): ")
+                emi = get_numeric_input("Enter monthly EMI: ")
+                result = self.tenure_from_emi(principal, rate, emi)
+                if math.isnan(result):
+                    raise ValueError("EMI does not cover the monthly interest; the loan is never repaid")
+                print(f"\nLoan Tenure: {result:.2f} years ({result * 12:.1f} months)")
+                expression = f"Loan Tenure: Loan={principal}, Rate={rate}%, EMI={emi}"
+
+            else:
+                principal = get_numeric_input("Enter loan amount: ")
+                emi = get_numeric_input("Enter monthly EMI: ")
+                time = get_numeric_input("Enter loan tenure (years): ")
+                result, _ = self.rate_from_emi(principal, emi, time)
+                if math.isnan(result):
+                    raise ValueError("Total repayment is less than the loan amount")
+                print(f"\nImplied Interest Rate: {result:.4f}% per year")
+                expression = f"Loan Rate: Loan={principal}, EMI={emi}, Time={time} years"
+
+            self.history_manager.add_to_history(expression, result)
+
+        except ValueError as e:
+            display_error(str(e))
+
+    def monte_carlo_interface(self):
+        """Monte Carlo investment projection interface"""
+        print("\n--- Monte Carlo Investment Projection ---")
+        try:
+            principal = get_numeric_input("Enter initial investment: ")
+            rate = get_numeric_input("Enter expected annual return (%): ")
+            volatility = get_numeric_input("Enter annual volatility (%): ", default=15)
+            time = get_numeric_input("Enter time period (years): ")
+            compounding = get_numeric_input("Enter periods per year (12 for monthly): ", default=12)
+            contribution = get_numeric_input("Enter contribution per period (0 for none): ", default=0)
+            paths = int(get_numeric_input("Enter number of simulations: ", default=10000))
+            target = get_numeric_input("Enter target amount (0 to skip): ", default=0)
+
+            results = self.monte_carlo_projection(principal, rate, time, volatility, compounding,
+                                                  contribution=contribution, paths=paths,
+                                                  target=target or None)
+
+            print(f"\nResults ({results['paths']} simulations, {results['periods']} periods):")
+            if "deterministic_amount" in results:
+                print(f"Deterministic Amount: {results['deterministic_amount']:.2f}")
+            print(f"Average Outcome: {results['mean']:.2f}")
+            for p, value in results["percentiles"].items():
+                print(f"{p}th Percentile: {value:.2f}")
+            if target:
+                print(f"Chance of ending at or above {target:.2f}: {results['prob_target']:.1%}")
+
+            expression = f"Monte Carlo: P={principal}, R={rate}%, Vol={volatility}%, T={time} years"
+            self.history_manager.add_to_history(expression, results["percentiles"][50])
+
+        except ValueError as e:
+            display_error(str(e))
+
     def emi_calculator_interface(self):
         """EMI calculation interface"""
         print("\n--- EMI Calculator ---")
@@ -226,6 +422,33 @@ class FinancialCalculator:
         except ValueError as e:
             display_error(str(e))
 
+    def cash_flow_interface(self):
+        """Cash flow analysis interface"""
+        print("\n--- Cash Flow Analysis ---")
+        print("Enter cash flows separated by commas, starting with the investment")
+        print("Example: -10000, 3000, 4000, 5000")
+
+        try:
+            cashflows = [float(value) for value in input("Cash flows: ").split(",") if value.strip()]
+            if len(cashflows) < 2:
+                raise ValueError("Enter at least two cash flows")
+            rate = get_numeric_input("Enter discount rate per period (%): ")
+
+            npv_value = self.npv(rate, cashflows)
+            irr_value = self.irr(cashflows)
+            payback = self.payback_period(cashflows)
+
+            print(f"\nResults:")
+            print(f"NPV @ {rate}%: {npv_value:.2f}")
+            print(f"IRR: {irr_value:.4f}%" if not math.isnan(irr_value) else "IRR: not defined")
+            print(f"Payback Period: {payback:.2f} periods" if not math.isnan(payback) else "Payback Period: never")
+
+            expression = f"NPV: Rate={rate}%, Cash flows={cashflows}"
+            self.history_manager.add_to_history(expression, npv_value)
+
+        except ValueError as e:
+            display_error(str(e))
+
     def gst_calculator_interface(self):
         """GST calculation interface"""
         print("\n--- GST Calculator ---")
@@ -1,14 +1,132 @@
 
 import json
 import os
+import sys
+import threading
+from collections import deque
+from itertools import islice
+from collections.abc import Mapping
 from datetime import datetime
+from history_writer import BackgroundWriter
+from history_log import HistoryLog
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _compact_result(result):
+    """Keep numbers as numbers when str() gives back the same text, else a string"""
+    if isinstance(result, (int, float)) and not isinstance(result, bool):
+        return result
+    text = str(result)
+    for number_type in (int, float):
+        try:
+            number = number_type(text)
+        except ValueError:
+            continue
+        if str(number) == text:
+            return number
+    return sys.intern(text) if len(text) < 32 else text
+
+
+class HistoryRecord(Mapping):
+    """
+    Compact history entry that still reads like the old dict
+
+    Stores an epoch-second timestamp, the raw numeric result and an interned
+    calculation string; "timestamp" and "result" strings are built on access.
+    """
+    __slots__ = ("epoch", "calculation", "value", "extra")
+
+    KEYS = ("timestamp", "calculation", "result")
+
+    def __init__(self, epoch, calculation, value, extra=None):
+        self.epoch = epoch
+        self.calculation = sys.intern(str(calculation))
+        self.value = value
+        self.extra = extra
+
+    @classmethod
+    def create(cls, calculation, result):
+        """Create a record stamped with the current time"""
+        return cls(int(datetime.now().timestamp()), calculation, _compact_result(result))
+
+    @classmethod
+    def from_dict(cls, entry):
+        """Build a record from a stored JSON entry"""
+        extra = {k: v for k, v in entry.items() if k not in cls.KEYS} or None
+        try:
+            epoch = int(datetime.strptime(entry["timestamp"], TIMESTAMP_FORMAT).timestamp())
+        except (KeyError, TypeError, ValueError):
+            # Keep timestamps we can't parse verbatim
+            epoch = None
+            extra = dict(extra or {}, timestamp=entry.get("timestamp"))
+        return cls(epoch, entry.get("calculation", ""), _compact_result(entry.get("result", "")), extra)
+
+    @property
+    def timestamp(self):
+        """Timestamp formatted like the original entries"""
+        if self.epoch is None:
+            return self.extra.get("timestamp") or ""
+        return datetime.fromtimestamp(self.epoch).strftime(TIMESTAMP_FORMAT)
+
+    @property
+    def result(self):
+        """Result as the string stored in the original entries"""
+        return str(self.value)
+
+    def __getitem__(self, key):
+        if key == "timestamp":
+            return self.timestamp
+        if key == "calculation":
+            return self.calculation
+        if key == "result":
+            return self.result
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from self.KEYS
+        if self.extra:
+            yield from (k for k in self.extra if k not in self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS) + len([k for k in (self.extra or ()) if k not in self.KEYS])
+
+    def __repr__(self):
+        return f"HistoryRecord({self.to_dict()!r})"
+
+    def to_dict(self):
+        """Plain dict for JSON files and exports"""
+        return dict(self.items())
+
 
 class HistoryManager:
-    def __init__(self, filename="data/history.json"):
+    def __init__(self, filename="data/history.json", background=False, max_entries=100, log_file=None,
+                 **writer_options):
         self.filename = filename
-        self.history = []
+        self.max_entries = max_entries
+        # Most recent first; the deque drops the oldest entries in O(1)
+        self.history = deque(maxlen=max_entries)
+        # Calculators on different threads share one manager
+        self.lock = threading.RLock()
+        self.save_lock = threading.Lock()
         self.load_history()
 
+        # Optional append-only log keeping every entry for paging and time ranges
+        self.log = None
+        if log_file:
+            self.log = HistoryLog(log_file, HistoryRecord)
+            if not len(self.log):
+                self.log.append_many(list(reversed(self.history)))
+
+        # Optionally persist on a writer thread so calculations never wait on disk
+        self.writer = None
+        if background:
+            if writer_options.get("overflow") == "spill":
+                writer_options.setdefault("spill_file", f"{filename}.spill")
+            self.writer = BackgroundWriter(self._persist, **writer_options)
+
     def load_history(self):
         """Load calculation history from JSON file"""
         try:
@@ -17,64 +135,162 @@ class HistoryManager:
 
             if os.path.exists(self.filename):
                 with open(self.filename, 'r') as f:
-                    self.history = json.load(f)
+                    entries = json.load(f)
+                self.history = deque((HistoryRecord.from_dict(entry) for entry in entries), maxlen=self.max_entries)
             else:
                 # Create empty history file
                 self.save_history()
 
         except (json.JSONDecodeError, IOError) as e:
             print(f"Warning: Could not load history file: {e}")
-            self.history = []
+            self.history = deque(maxlen=self.max_entries)
 
     def save_history(self):
         """Save calculation history to JSON file"""
         try:
-            with open(self.filename, 'w') as f:
-                json.dump(self.history, f, indent=2)
+            # Snapshot under the list lock, write outside it so adds don't wait on disk
+            with self.save_lock:
+                with self.lock:
+                    snapshot = list(self.history)
+                with open(self.filename, 'w') as f:
+                    json.dump([entry.to_dict() for entry in snapshot], f, indent=2)
             return True
         except IOError as e:
             print(f"Error: Could not save history file: {e}")
             return False
 
+    def _persist(self, batch):
+        """Write a batch of new entries to the log and save the JSON file"""
+        if self.log is not None:
+            # Entries read back from a spill file arrive as plain dicts
+            self.log.append_many([entry if isinstance(entry, HistoryRecord) else HistoryRecord.from_dict(entry)
+                                  for entry in batch])
+        return self.save_history()
+
     def add_to_history(self, calculation, result):
         """Add a calculation to history with timestamp"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        history_entry = HistoryRecord.create(calculation, result)
 
-        history_entry = {
-            "timestamp": timestamp,
-            "calculation": str(calculation),
-            "result": str(result)
-        }
+        with self.lock:
+            # Add to beginning (most recent first); past max_entries the oldest
+            # entry falls off the end to keep the file from growing too large
+            self.history.appendleft(history_entry)
 
-        # Add to beginning of list (most recent first)
-        self.history.insert(0, history_entry)
+        # Save to file (the writer thread batches many adds into one save)
+        if self.writer is not None:
+            self.writer.submit(history_entry)
+        else:
+            self._persist([history_entry])
 
-        # Keep only last 100 entries to prevent file from growing too large
-        if len(self.history) > 100:
-            self.history = self.history[:100]
+        return history_entry
 
-        # Save to file
-        self.save_history()
+    def flush(self, timeout=None):
+        """Wait for background writes to reach the disk"""
+        if self.writer is not None:
+            return self.writer.flush(timeout)
+        return True
 
-        return history_entry
+    def close(self):
+        """Flush and stop the background writer, then close the log"""
+        if self.writer is not None:
+            self.writer.close()
+        if self.log is not None:
+            self.log.close()
+
+    def get_writer_metrics(self):
+        """Get queue-depth and batching metrics of the background writer"""
+        return self.writer.metrics() if self.writer is not None else {}
 
     def get_history(self, limit=None):
         """Get calculation history, optionally limited to recent entries"""
-        if limit is None or limit >= len(self.history):
-            return self.history.copy()
-        return self.history[:limit]
+        with self.lock:
+            if limit is None or limit >= len(self.history):
+                return list(self.history)
+            return list(islice(self.history, limit))
+
+    def get_entry_count(self):
+        """Total number of stored entries (all of the log, if there is one)"""
+        return len(self.log) if self.log is not None else len(self.history)
+
+    def get_page(self, page, page_size=20):
+        """One page of history, most recent first, read only from that page's entries"""
+        start = page * page_size
+        if self.log is not None:
+            return self.log.page(start, page_size)
+        with self.lock:
+            return list(islice(self.history, start, start + page_size))
+
+    def get_entry(self, n):
+        """The nth most recent entry (0 is the newest)"""
+        if self.log is not None:
+            return self.log.get(-1 - n)
+        with self.lock:
+            return self.history[n]
+
+    def find_time_range(self, start=None, end=None):
+        """Positions (newest first) [first, last) of entries between two datetimes"""
+        start_epoch = int(start.timestamp()) if start else None
+        end_epoch = int(end.timestamp()) if end else None
+
+        if self.log is not None:
+            first, last = self.log.time_range(start_epoch, end_epoch)
+            count = len(self.log)
+            return count - last, count - first
+
+        with self.lock:
+            positions = [i for i, entry in enumerate(self.history)
+                         if (start_epoch is None or (entry.epoch or 0) >= start_epoch)
+                         and (end_epoch is None or (entry.epoch or 0) <= end_epoch)]
+        return (positions[0], positions[-1] + 1) if positions else (0, 0)
+
+    def iter_entries(self, start=0):
+        """Yield (position, entry) pairs, newest first, starting at a position"""
+        if self.log is not None:
+            for position in range(start, len(self.log)):
+                yield position, self.log.get(-1 - position)
+            return
+
+        # The in-memory window is bounded, so a snapshot is cheap
+        with self.lock:
+            entries = list(islice(self.history, start, None))
+        yield from enumerate(entries, start)
+
+    def search_page(self, search_term="", cursor=0, page_size=20):
+        """
+        One page of (position, entry) pairs matching search_term, newest first
+
+        Scanning starts at cursor and stops once the page is full, so the cost
+        follows the page size rather than the size of the store. Returns the
+        page and the cursor of the next page (None on the last page).
+        """
+        search_term = search_term.lower()
+        page = []
+
+        for position, entry in self.iter_entries(cursor):
+            if len(page) == page_size:
+                return page, position
+            if (not search_term or
+                    search_term in entry["calculation"].lower() or
+                    search_term in entry["result"].lower() or
+                    search_term in entry["timestamp"].lower()):
+                page.append((position, entry))
+
+        return page, None
 
     def clear_history(self):
         """Clear all calculation history"""
-        self.history = []
-        return self.save_history()
+        with self.lock:
+            self.history.clear()
+            if self.log is not None:
+                self.log.clear()
+            return self.save_history()
 
     def search_history(self, search_term):
         """Search history for calculations containing search term"""
         search_term = search_term.lower()
         results = []
 
-        for entry in self.history:
+        for entry in self.get_history():
             if (search_term in entry["calculation"].lower() or 
                 search_term in entry["result"].lower() or
                 search_term in entry["timestamp"].lower()):
@@ -84,7 +300,8 @@ class HistoryManager:
 
     def export_history(self, export_format="txt", filename=None):
         """Export history to file in various formats"""
-        if not self.history:
+        history = self.get_history()
+        if not history:
             return False, "No history to export"
 
         if filename is None:
@@ -96,13 +313,13 @@ class HistoryManager:
                 with open(filename, 'w') as f:
                     f.write("CalcMaster 360 - Calculation History\n")
                     f.write("=" * 50 + "\n\n")
-                    for entry in self.history:
+                    for entry in history:
                         f.write(f"{entry['timestamp']}: {entry['calculation']} = {entry['result']}\n")
 
             elif export_format == "csv":
                 with open(filename, 'w') as f:
                     f.write("Timestamp,Calculation,Result\n")
-                    for entry in self.history:
+                    for entry in history:
                         # Escape commas in values
                         calc = entry['calculation'].replace(',', ';')
                         result = entry['result'].replace(',', ';')
@@ -110,7 +327,7 @@ class HistoryManager:
 
             elif export_format == "json":
                 with open(filename, 'w') as f:
-                    json.dump(self.history, f, indent=2)
+                    json.dump([entry.to_dict() for entry in history], f, indent=2)
 
             else:
                 return False, f"Unsupported export format: {export_format}"
@@ -122,12 +339,13 @@ class HistoryManager:
 
     def get_stats(self):
         """Get statistics about calculation history"""
-        if not self.history:
+        history = self.get_history()
+        if not history:
             return {"total_calculations": 0}
 
         # Count calculations by type
         type_count = {}
-        for entry in self.history:
+        for entry in history:
             calc = entry["calculation"].lower()
 
             if any(op in calc for op in ["+", "-", "*", "/", "basic"]):
@@ -144,10 +362,10 @@ class HistoryManager:
             type_count[calc_type] = type_count.get(calc_type, 0) + 1
 
         return {
-            "total_calculations": len(self.history),
+            "total_calculations": len(history),
             "calculations_by_type": type_count,
-            "first_calculation": self.history[-1]["timestamp"] if self.history else None,
-            "last_calculation": self.history[0]["timestamp"] if self.history else None
+            "first_calculation": history[-1]["timestamp"],
+            "last_calculation": history[0]["timestamp"]
         }
 
 
@@ -179,6 +397,28 @@ if __name__ == "__main__":
     success, message = hm.export_history("txt", "test_export.txt")
     print(f"Export: {message}")
 
+    # Benchmark: memory of dict entries vs compact records
+    import tracemalloc
+    count = 200000
+    calculations = [f"{a} + {b}" for a in range(50) for b in range(20)]
+
+    tracemalloc.start()
+    dict_entries = [{"timestamp": datetime.now().strftime(TIMESTAMP_FORMAT),
+                     "calculation": str(calculations[i % len(calculations)]),
+                     "result": str(i * 0.5)} for i in range(count)]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    del dict_entries
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    records = [HistoryRecord.create(calculations[i % len(calculations)], i * 0.5) for i in range(count)]
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    del records
+    tracemalloc.stop()
+
+    print(f"\nMemory for {count} entries: dicts {dict_bytes / count:.0f} B/entry, "
+          f"records {record_bytes / count:.0f} B/entry ({1 - record_bytes / dict_bytes:.0%} less)")
+
     # Clean up test files
     if os.path.exists("test_history.json"):
         os.remove("test_history.json")
@@ -0,0 +1,162 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import numpy as np
+
+# Fixed-width index record: epoch seconds, data offset, data length
+INDEX_RECORD = struct.Struct("<qQI")
+INDEX_DTYPE = np.dtype([("epoch", "<i8"), ("offset", "<u8"), ("length", "<u4")])
+
+
+class HistoryLog:
+    """
+    Append-only history log with random access
+
+    Entries go to a data segment (one JSON line each) and a fixed-width index
+    (epoch, offset, length). Both are memory-mapped for reading, so the nth
+    entry or a page is an O(1) seek and time ranges are a binary search.
+    Entries are expected in chronological order, which appending guarantees.
+    """
+
+    def __init__(self, basename="data/history_log", record_type=None):
+        self.record_type = record_type
+        self.data_path = basename + ".dat"
+        self.index_path = basename + ".idx"
+        if os.path.dirname(basename):
+            os.makedirs(os.path.dirname(basename), exist_ok=True)
+
+        self.lock = threading.RLock()
+        self._data_map = None
+        self._index_map = None
+        self._open()
+
+    def _open(self):
+        """Open both files for appending and count the indexed entries"""
+        self.data_file = open(self.data_path, 'ab+')
+        self.index_file = open(self.index_path, 'ab+')
+
+        # Ignore a torn index record left by a crash mid-append
+        self.count = os.path.getsize(self.index_path) // INDEX_RECORD.size
+        self._unmap()
+
+    # ------------------------------
+    # Writing
+    # ------------------------------
+    def append(self, record):
+        """Append one record (anything with epoch, calculation, value and extra)"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Append records with one data write and one index write"""
+        if not records:
+            return
+
+        with self.lock:
+            self.data_file.seek(0, os.SEEK_END)
+            offset = self.data_file.tell()
+            payloads = []
+            index = bytearray()
+
+            for record in records:
+                payload = json.dumps({"c": record.calculation, "r": record.value, "x": record.extra},
+                                     separators=(",", ":")).encode("utf-8") + b"\n"
+                index += INDEX_RECORD.pack(record.epoch or 0, offset, len(payload))
+                offset += len(payload)
+                payloads.append(payload)
+
+            # Data first: an index entry never points past the end of the data
+            self.data_file.write(b"".join(payloads))
+            self.data_file.flush()
+            self.index_file.seek(self.count * INDEX_RECORD.size)
+            self.index_file.truncate()
+            self.index_file.write(index)
+            self.index_file.flush()
+            self.count += len(records)
+
+    def clear(self):
+        """Remove every entry"""
+        with self.lock:
+            # Start new files; views into the old mappings stay valid until released
+            self.data_file.close()
+            self.index_file.close()
+            os.remove(self.data_path)
+            os.remove(self.index_path)
+            self._open()
+
+    # ------------------------------
+    # Reading
+    # ------------------------------
+    def __len__(self):
+        return self.count
+
+    def _unmap(self):
+        """Drop the current mappings (closed once no view into them is left)"""
+        self._data_map = self._index_map = None
+        self._mapped_count = -1
+
+    def _ensure_mapped(self):
+        """(Re)map the files after appends grew them"""
+        if self._mapped_count == self.count:
+            return
+        self._unmap()
+        if self.count:
+            self._data_map = mmap.mmap(self.data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index_map = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped_count = self.count
+
+    def _position(self, n):
+        """Normalise a possibly negative entry number"""
+        if n < 0:
+            n += self.count
+        if not 0 <= n < self.count:
+            raise IndexError("History entry out of range")
+        return n
+
+    def get_raw(self, n):
+        """Zero-copy view of the nth entry's JSON bytes (release it before close())"""
+        with self.lock:
+            self._ensure_mapped()
+            _, offset, length = INDEX_RECORD.unpack_from(self._index_map, self._position(n) * INDEX_RECORD.size)
+            return memoryview(self._data_map)[offset:offset + length]
+
+    def get(self, n):
+        """The nth entry (0 is the oldest, -1 the newest)"""
+        with self.lock:
+            self._ensure_mapped()
+            epoch, offset, length = INDEX_RECORD.unpack_from(self._index_map, self._position(n) * INDEX_RECORD.size)
+            payload = json.loads(self._data_map[offset:offset + length])
+
+        fields = (epoch, payload["c"], payload["r"], payload["x"])
+        return self.record_type(*fields) if self.record_type else fields
+
+    def page(self, start, size, newest_first=True):
+        """A page of entries; start counts from the newest entry when newest_first"""
+        if newest_first:
+            positions = range(self.count - 1 - start, max(self.count - 1 - start - size, -1), -1)
+        else:
+            positions = range(start, min(start + size, self.count))
+        return [self.get(n) for n in positions if 0 <= n < self.count]
+
+    def epochs(self):
+        """Epoch column of the index as a read-only NumPy view"""
+        with self.lock:
+            self._ensure_mapped()
+            if not self.count:
+                return np.empty(0, dtype=np.int64)
+            return np.frombuffer(self._index_map, dtype=INDEX_DTYPE, count=self.count)["epoch"]
+
+    def time_range(self, start_epoch=None, end_epoch=None):
+        """Entry numbers [first, last) whose timestamps fall within [start, end]"""
+        epochs = self.epochs()
+        first = 0 if start_epoch is None else int(np.searchsorted(epochs, start_epoch, side="left"))
+        last = self.count if end_epoch is None else int(np.searchsorted(epochs, end_epoch, side="right"))
+        return first, max(first, last)
+
+    def close(self):
+        """Drop the mappings and close the files"""
+        with self.lock:
+            self._unmap()
+            self.data_file.close()
+            self.index_file.close()
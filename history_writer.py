@@ -0,0 +1,226 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "spill")
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """
+    Persist items on a dedicated thread fed by a bounded queue
+
+    Items are grouped: one write_batch(items) call covers up to batch_size
+    items or whatever arrived within flush_interval seconds of the first one.
+    Items are written in the order they were submitted, spilled ones included.
+    """
+
+    def __init__(self, write_batch, max_queue=1000, batch_size=100, flush_interval=0.05,
+                 overflow="block", spill_file=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Overflow policy must be one of {', '.join(OVERFLOW_POLICIES)}")
+        if overflow == "spill" and not spill_file:
+            raise ValueError("The spill policy needs a spill file")
+
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.spill_file = spill_file
+        self.queue = queue.Queue(maxsize=max_queue)
+
+        self.spill_lock = threading.Lock()
+        # Once something spills, later items spill too until the queue drains,
+        # so nothing overtakes the spilled (older) items
+        self.spilling = False
+        self.stats_lock = threading.Lock()
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "dropped": 0,
+                      "spilled": 0, "blocked": 0, "errors": 0, "max_queue_depth": 0}
+        # Items submitted but not yet written (or dropped)
+        self.pending = 0
+        self.pending_done = threading.Condition()
+        self.closed = False
+
+        self.thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    # ------------------------------
+    # Producer side
+    # ------------------------------
+    def submit(self, item):
+        """Queue an item for writing, applying the overflow policy when full"""
+        if self.closed:
+            raise RuntimeError("Writer is closed")
+
+        with self.pending_done:
+            self.pending += 1
+        if self.overflow == "spill":
+            with self.spill_lock:
+                if self.spilling:
+                    self._spill(item)
+                else:
+                    try:
+                        self.queue.put_nowait(item)
+                    except queue.Full:
+                        self.spilling = True
+                        self._spill(item)
+        else:
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self._overflow(item)
+
+        with self.stats_lock:
+            self.stats["enqueued"] += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queue.qsize())
+
+    def _overflow(self, item):
+        """Handle a full queue: block or drop the oldest item"""
+        if self.overflow == "block":
+            with self.stats_lock:
+                self.stats["blocked"] += 1
+            self.queue.put(item)
+
+        elif self.overflow == "drop_oldest":
+            while True:
+                try:
+                    self.queue.get_nowait()
+                    with self.stats_lock:
+                        self.stats["dropped"] += 1
+                    self._settle(1)
+                except queue.Empty:
+                    pass
+                try:
+                    self.queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    continue
+
+    def _spill(self, item):
+        """Append an item to the spill file (the caller holds spill_lock)"""
+        with open(self.spill_file, 'a') as f:
+            # Mapping-like items (history records) spill as plain dicts
+            f.write(json.dumps(item, default=dict) + "\n")
+        with self.stats_lock:
+            self.stats["spilled"] += 1
+
+    # ------------------------------
+    # Writer thread
+    # ------------------------------
+    def _run(self):
+        """Collect batches and hand them to write_batch until stopped"""
+        stopping = False
+
+        while not stopping:
+            try:
+                first = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._write(self._take_spilled())
+                continue
+
+            batch = []
+            if first is _STOP:
+                stopping = True
+            else:
+                batch.append(first)
+
+            # Group commit: fill the batch until it is full or the window closes
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self.queue.get(timeout=max(remaining, 0)) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            self._write(batch + self._take_spilled())
+
+        # Drain whatever is still queued after the stop marker
+        leftovers = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftovers.append(item)
+        self._write(leftovers + self._take_spilled())
+
+    def _take_spilled(self):
+        """
+        Read back and remove items spilled to disk, once the queue has drained
+
+        Spilled items are newer than everything queued before them, so they
+        wait until those are written; new items queue up behind them again.
+        """
+        if not self.spill_file:
+            return []
+
+        with self.spill_lock:
+            if not self.queue.empty():
+                return []
+            self.spilling = False
+            if not os.path.exists(self.spill_file):
+                return []
+            with open(self.spill_file, 'r') as f:
+                items = [json.loads(line) for line in f if line.strip()]
+            os.remove(self.spill_file)
+        return items
+
+    def _write(self, batch):
+        """Write one batch, counting failures instead of killing the thread"""
+        if not batch:
+            return
+        try:
+            self.write_batch(batch)
+            with self.stats_lock:
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+        except Exception as e:
+            print(f"Error: Background write failed: {e}")
+            with self.stats_lock:
+                self.stats["errors"] += 1
+        finally:
+            self._settle(len(batch))
+
+    def _settle(self, count):
+        """Mark items as handled and wake up flush() callers"""
+        with self.pending_done:
+            self.pending -= count
+            if self.pending <= 0:
+                self.pending_done.notify_all()
+
+    # ------------------------------
+    # Control and metrics
+    # ------------------------------
+    def flush(self, timeout=None):
+        """Wait until everything submitted so far has been written"""
+        with self.pending_done:
+            return self.pending_done.wait_for(lambda: self.pending <= 0, timeout)
+
+    def close(self, timeout=None):
+        """Write everything still queued and stop the writer thread"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def metrics(self):
+        """Get queue depth and throughput counters"""
+        with self.stats_lock:
+            metrics = dict(self.stats)
+        metrics["queue_depth"] = self.queue.qsize()
+        metrics["pending"] = self.pending
+        metrics["avg_batch_size"] = metrics["written"] / metrics["batches"] if metrics["batches"] else 0.0
+        return metrics
@@ -0,0 +1,371 @@
+import json
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+import memoize
+from basic_calc import BasicCalculator
+from scientific_calc import ScientificCalculator
+from finance_calc import FinancialCalculator
+from converter import UnitConverter
+from operations import build_registry
+from expression_plan import parse_history_label, unplanned_reason
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+# ------------------------------
+# Workload: history entries -> registry requests
+# ------------------------------
+def parse_calculation(calculation, mode=None):
+    """
+    Turn a recorded calculation into a registry request
+
+    Entries in a format the screens write (see expression_plan.HISTORY_LABELS)
+    map to their operation; any other arithmetic goes to an evaluator.
+
+    Returns:
+        dict: {"operation", "arguments"}, or None if it can't be replayed
+    """
+    calculation = calculation.strip()
+    if not calculation or unplanned_reason(calculation):
+        return None
+
+    parsed = parse_history_label(calculation)
+    if parsed is not None:
+        operation, arguments, _ = parsed
+        return {"operation": operation, "arguments": arguments}
+
+    expression = calculation.split(" = ")[0]
+    if re.fullmatch(r"[\d+\-*/.() ]+", expression):
+        return {"operation": "basic.evaluate", "arguments": {"expression": expression}}
+    if mode in (None, "basic", "scientific") and re.fullmatch(r"[\w+\-*/.() ]+", expression):
+        return {"operation": "scientific.evaluate", "arguments": {"expression": expression}}
+    return None
+
+
+def load_workload(path):
+    """
+    Requests from a history file, in recorded order
+
+    The file is a history.json list of entries, or a list of
+    {"operation", "arguments"} requests (as taken by run_batch).
+
+    Returns:
+        tuple: (requests, number of entries that can't be replayed)
+    """
+    try:
+        with open(path, 'r') as f:
+            entries = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read workload {path}: {e}")
+    if not isinstance(entries, list):
+        raise ValueError("Workload must be a JSON list of history entries or requests")
+
+    requests = []
+    for entry in entries:
+        if "operation" in entry:
+            request = {"operation": entry["operation"], "arguments": entry.get("arguments", {})}
+        else:
+            request = parse_calculation(str(entry.get("calculation", "")), entry.get("mode"))
+        if request is not None:
+            requests.append(request)
+    return requests, len(entries) - len(requests)
+
+
+def _vary(request, rng):
+    """A new distinct request like the given one, with its numbers scaled by 0.5-1.5"""
+    def scale(value):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            # Whole numbers (years, counts, n!) stay whole
+            scaled = value * rng.uniform(0.5, 1.5)
+            return type(value)(round(scaled)) if float(value).is_integer() else round(scaled, 2)
+        if isinstance(value, list):
+            return [scale(item) for item in value]
+        if isinstance(value, str) and request["operation"].endswith(".evaluate"):
+            return re.sub(r"\d+(?:\.\d+)?", lambda m: f"{float(m[0]) * rng.uniform(0.5, 1.5):.4g}", value)
+        return value
+
+    return {"operation": request["operation"],
+            "arguments": {key: scale(value) for key, value in request["arguments"].items()}}
+
+
+def synthetic_workload(requests, size, distinct=None, exponent=1.1, seed=None):
+    """
+    Scale a recorded workload up to size requests with Zipf-distributed repetition
+
+    Recorded requests are ranked by how often they occur; beyond them the
+    pool of distinct requests is filled with variants whose numbers are
+    scaled. Each request is the pool member of rank k with probability
+    proportional to 1 / k**exponent: a few hot requests (cache hits) and a
+    long tail that rarely repeats (misses).
+
+    Args:
+        requests (list): Recorded requests (from load_workload)
+        size (int): Number of requests to generate
+        distinct (int): Size of the pool (default: a tenth of size)
+        exponent (float): Zipf exponent; larger means more repetition
+        seed (int): Seed for a reproducible workload
+    """
+    if not requests:
+        raise ValueError("No replayable requests to scale up")
+    if size < 1:
+        raise ValueError("Workload size must be at least 1")
+    if exponent <= 0:
+        raise ValueError("Zipf exponent must be positive")
+
+    rng = np.random.default_rng(seed)
+    counts = Counter(json.dumps(request, sort_keys=True) for request in requests)
+    pool = [json.loads(text) for text, _ in counts.most_common()]
+    distinct = max(1, distinct or max(len(pool), size // 10))
+    pool = pool[:distinct]
+    base = len(pool)
+    while len(pool) < distinct:
+        pool.append(_vary(pool[len(pool) % base], rng))
+
+    weights = 1.0 / np.arange(1, distinct + 1) ** exponent
+    ranks = rng.choice(distinct, size=size, p=weights / weights.sum())
+    return [pool[rank] for rank in ranks]
+
+
+# ------------------------------
+# Load generation
+# ------------------------------
+class _DiscardHistory:
+    """History for replayed calculations, which shouldn't land in the real history"""
+
+    def add_to_history(self, calculation, result):
+        pass
+
+
+def _target():
+    """Fresh calculators behind an operation registry, as a server process would have"""
+    history = _DiscardHistory()
+    return build_registry(BasicCalculator(history), ScientificCalculator(history),
+                          FinancialCalculator(history), UnitConverter(history))
+
+
+def _run_worker(requests, schedule, start_at, disk_path):
+    """
+    Issue one process's share of the requests
+
+    Each process sends its requests one at a time. With a schedule (open
+    loop) a request goes out at its arrival time, or as soon as the one
+    before it finishes if that is later, and its latency counts from the
+    scheduled arrival, so a backlog shows up as latency instead of being
+    hidden. Without one (closed loop) each request is sent when the last
+    finishes.
+
+    Returns:
+        tuple: (start offsets, latencies, error counts, cache counters)
+    """
+    if disk_path:
+        memoize.configure(disk_path=disk_path)
+    registry = _target()
+
+    starts = np.empty(len(requests))
+    latencies = np.empty(len(requests))
+    errors = Counter()
+
+    # Processes line up on a shared wall-clock start
+    time.sleep(max(0.0, start_at - time.time()))
+    origin = time.perf_counter()
+    for i, request in enumerate(requests):
+        if schedule is None:
+            sent = time.perf_counter()
+        else:
+            sent = origin + schedule[i]
+            wait = sent - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        try:
+            registry.invoke(request["operation"], **request.get("arguments", {}))
+        except (ValueError, TypeError, KeyError, ArithmeticError) as e:
+            errors[f"{request['operation']}: {e}"] += 1
+        latencies[i] = time.perf_counter() - sent
+        starts[i] = sent - origin
+
+    # The disk cache is only asked on memory misses, so it gets its own counters
+    stats = memoize.cache_stats()
+    disk = stats.pop("disk", None)
+    cache = {"hits": sum(entry["hits"] for entry in stats.values()),
+             "misses": sum(entry["misses"] for entry in stats.values()),
+             "disk_hits": disk["hits"] if disk else 0, "disk_misses": disk["misses"] if disk else 0}
+    return starts, latencies, errors, cache
+
+
+def _percentiles(latencies):
+    """Latency percentiles in milliseconds"""
+    values = np.percentile(latencies, PERCENTILES) * 1000 if len(latencies) else [0.0] * len(PERCENTILES)
+    return {f"p{p:g}": float(value) for p, value in zip(PERCENTILES, values)}
+
+
+def summarize(starts, latencies, interval=1.0):
+    """
+    Throughput and latency overall and per interval of the run
+
+    Requests count towards the interval in which they finished.
+    """
+    finished = starts + latencies
+    elapsed = float(finished.max()) if len(finished) else 0.0
+    report = {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": dict(_percentiles(latencies), mean=float(latencies.mean() * 1000) if len(latencies) else 0.0,
+                           max=float(latencies.max() * 1000) if len(latencies) else 0.0),
+    }
+
+    buckets = (finished // interval).astype(int)
+    order = np.argsort(buckets, kind="stable")
+    bounds = np.searchsorted(buckets[order], np.arange(buckets.max() + 2 if len(buckets) else 0))
+    timeline = []
+    for bucket in range(len(bounds) - 1):
+        part = latencies[order[bounds[bucket]:bounds[bucket + 1]]]
+        # The last interval may be cut short by the end of the run
+        span = min(interval, elapsed - bucket * interval) or interval
+        timeline.append(dict({"time": bucket * interval, "requests": len(part), "throughput": len(part) / span},
+                             **_percentiles(part)))
+    report["timeline"] = timeline
+    return report
+
+
+def run_load(requests, mode="closed", rate=None, processes=1, arrivals="poisson", interval=1.0, seed=None,
+             disk_path=None):
+    """
+    Replay requests against the calculators and measure latency and throughput
+
+    Args:
+        requests (list): {"operation", "arguments"} requests, in order
+        mode (str): "closed" (each process sends as fast as it gets answers)
+            or "open" (requests arrive at rate, regardless of answers)
+        rate (float): Total arrivals per second for open loop
+        processes (int): Load-generating processes, each with its own calculators
+        arrivals (str): "poisson" or "uniform" spacing of open-loop arrivals
+        interval (float): Seconds per timeline entry
+        seed (int): Seed for Poisson arrival times
+        disk_path (str): Optional shared SQLite result cache (see memoize.configure)
+
+    Returns:
+        dict: Summary with latency percentiles (ms), throughput and a timeline
+    """
+    if not requests:
+        raise ValueError("No requests to run")
+    if mode not in ("open", "closed"):
+        raise ValueError("Mode must be 'open' or 'closed'")
+    if processes < 1:
+        raise ValueError("Processes must be at least 1")
+    if interval <= 0:
+        raise ValueError("Interval must be positive")
+
+    schedule = None
+    if mode == "open":
+        if not rate or rate <= 0:
+            raise ValueError("Open-loop mode needs a positive rate")
+        if arrivals == "poisson":
+            gaps = np.random.default_rng(seed).exponential(1.0 / rate, len(requests))
+        elif arrivals == "uniform":
+            gaps = np.full(len(requests), 1.0 / rate)
+        else:
+            raise ValueError("Arrivals must be 'poisson' or 'uniform'")
+        schedule = np.cumsum(gaps) - gaps[0]
+
+    # Process p sends requests p, p + processes, ... so the global arrival order is kept
+    shares = [(requests[p::processes], None if schedule is None else schedule[p::processes])
+              for p in range(min(processes, len(requests)))]
+    if len(shares) == 1:
+        parts = [_run_worker(*shares[0], time.time(), disk_path)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(shares)) as pool:
+            # Leave time for every process to start and build its calculators
+            start_at = time.time() + 1.0 + 0.1 * len(shares)
+            futures = [pool.submit(_run_worker, part, times, start_at, disk_path) for part, times in shares]
+            parts = [future.result() for future in futures]
+
+    starts = np.concatenate([part[0] for part in parts])
+    latencies = np.concatenate([part[1] for part in parts])
+    errors = sum((part[2] for part in parts), Counter())
+    cache = {key: sum(part[3][key] for part in parts) for key in parts[0][3]}
+    lookups = cache["hits"] + cache["misses"]
+    disk_lookups = cache["disk_hits"] + cache["disk_misses"]
+
+    report = summarize(starts, latencies, interval)
+    report.update({
+        "mode": mode,
+        "processes": len(shares),
+        "target_rate": rate if mode == "open" else None,
+        "errors": sum(errors.values()),
+        "error_messages": dict(errors.most_common(5)),
+        "cache_hit_rate": cache["hits"] / lookups if lookups else 0.0,
+        "disk_hit_rate": cache["disk_hits"] / disk_lookups if disk_lookups else None,
+    })
+    return report
+
+
+def format_report(report):
+    """Report as text: totals, latency percentiles and the timeline"""
+    latency = report["latency_ms"]
+    target = f", target {report['target_rate']:,.0f}/s" if report["target_rate"] else ""
+    disk = ""
+    if report.get("disk_hit_rate") is not None:
+        disk = f"   Disk cache hit rate: {report['disk_hit_rate']:.1%}"
+    lines = [
+        f"{report['mode'].capitalize()} loop, {report['processes']} process(es): {report['requests']} requests "
+        f"in {report['seconds']:.2f}s = {report['throughput']:,.0f}/s{target}",
+        f"Errors: {report['errors']}   Cache hit rate: {report['cache_hit_rate']:.1%}{disk}",
+        "Latency (ms): " + "  ".join(f"{name} {value:.3f}" for name, value in latency.items()),
+        "",
+        f"{'time (s)':>9} {'requests':>9} {'per sec':>10} {'p50 ms':>9} {'p99 ms':>9}",
+    ]
+    for entry in report["timeline"]:
+        lines.append(f"{entry['time']:>9g} {entry['requests']:>9} {entry['throughput']:>10,.0f} "
+                     f"{entry['p50']:>9.3f} {entry['p99']:>9.3f}")
+    for message, count in report["error_messages"].items():
+        lines.append(f"{count} x {message}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Headless entry point: python loadtest.py history.json --synthetic 100000 --mode open --rate 5000 ..."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay calculation history against the calculators as a load test")
+    parser.add_argument("workload", nargs="?", default="data/history.json",
+                        help="history.json file, or a JSON list of {operation, arguments} requests")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="scale the workload up to N requests")
+    parser.add_argument("--distinct", type=int, help="distinct requests in the synthetic workload")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of synthetic repetition")
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed",
+                        help="closed: as fast as answers come back; open: fixed arrival rate")
+    parser.add_argument("--rate", type=float, help="open loop: total requests per second")
+    parser.add_argument("--arrivals", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--processes", type=int, default=1, help="load-generating processes")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds per timeline row")
+    parser.add_argument("--seed", type=int, help="seed for the synthetic workload and arrivals")
+    parser.add_argument("--disk-cache", help="shared SQLite result cache to use in every process")
+    parser.add_argument("--json", help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        requests, skipped = load_workload(args.workload)
+        if args.synthetic:
+            requests = synthetic_workload(requests, args.synthetic, args.distinct, args.zipf, args.seed)
+        report = run_load(requests, args.mode, args.rate, args.processes, args.arrivals, args.interval,
+                          args.seed, args.disk_cache)
+    except ValueError as e:
+        parser.exit(1, f"Error: {e}\n")
+
+    if skipped:
+        print(f"Skipped {skipped} history entries that can't be replayed")
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import numpy as np
+
+# Monthly rates below this are treated as interest-free
+ZERO_RATE = 1e-12
+
+
+def _annuity_factor(monthly_rate, months):
+    """Present value of 1 paid every month: (1 - (1 + r)^-n) / r, with r -> 0 handled"""
+    safe_rate = np.where(np.abs(monthly_rate) < ZERO_RATE, ZERO_RATE, monthly_rate)
+    factor = -np.expm1(-months * np.log1p(safe_rate)) / safe_rate
+    return np.where(np.abs(monthly_rate) < ZERO_RATE, months, factor)
+
+
+def _annuity_factor_derivative(monthly_rate, months):
+    """Derivative of the annuity factor with respect to the monthly rate"""
+    safe_rate = np.where(np.abs(monthly_rate) < ZERO_RATE, ZERO_RATE, monthly_rate)
+    discount = np.exp(-months * np.log1p(safe_rate))
+    factor = -np.expm1(-months * np.log1p(safe_rate)) / safe_rate
+    derivative = (months * discount / (1 + safe_rate) - factor) / safe_rate
+    return np.where(np.abs(monthly_rate) < ZERO_RATE, -months * (months + 1) / 2, derivative)
+
+
+def _result(values):
+    """Return plain floats for scalar inputs and arrays otherwise"""
+    return float(values) if np.ndim(values) == 0 else values
+
+
+def principal_from_emi(emi, rate, time):
+    """
+    Largest loan a given EMI can repay (inverse of the EMI formula)
+
+    Args:
+        emi (float or array): Monthly installment
+        rate (float or array): Annual interest rate (%)
+        time (float or array): Loan tenure (years)
+
+    Returns:
+        float or ndarray: Affordable principal
+    """
+    emi = np.asarray(emi, dtype=float)
+    monthly_rate = np.asarray(rate, dtype=float) / (12 * 100)
+    months = np.asarray(time, dtype=float) * 12
+
+    return _result(emi * _annuity_factor(monthly_rate, months))
+
+
+def tenure_from_emi(principal, rate, emi):
+    """
+    Years needed to repay a loan with a given EMI
+
+    Returns NaN where the EMI does not even cover the monthly interest.
+    """
+    principal = np.asarray(principal, dtype=float)
+    monthly_rate = np.asarray(rate, dtype=float) / (12 * 100)
+    emi = np.asarray(emi, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        interest_free = principal / emi
+        # n = -ln(1 - P*r/EMI) / ln(1 + r)
+        months = -np.log1p(-principal * monthly_rate / emi) / np.log1p(monthly_rate)
+
+    months = np.where(np.abs(monthly_rate) < ZERO_RATE, interest_free, months)
+    months = np.where((emi > 0) & (emi > principal * monthly_rate), months, np.nan)
+
+    return _result(months / 12)
+
+
+def rate_from_emi(principal, emi, time, tolerance=1e-12, max_iterations=50):
+    """
+    Implied annual interest rate (%) of loans, solved with a vectorized Newton iteration
+
+    Args:
+        principal (float or array): Loan amounts
+        emi (float or array): Monthly installments
+        time (float or array): Loan tenures (years)
+
+    Returns:
+        tuple: (annual rates in %, NaN where EMI × months < principal;
+                diagnostics dict with "iterations", "converged" and "residual")
+    """
+    principal, emi, months = np.broadcast_arrays(np.asarray(principal, dtype=float),
+                                                 np.asarray(emi, dtype=float),
+                                                 np.asarray(time, dtype=float) * 12)
+    shape = principal.shape
+    principal, emi, months = principal.ravel(), emi.ravel(), months.ravel()
+
+    # A positive rate exists only when total repayment exceeds the principal
+    feasible = (principal > 0) & (emi > 0) & (emi * months >= principal)
+    monthly_rate = np.where(feasible, 2 * (emi * months - principal) / (principal * (months + 1)), np.nan)
+
+    active = feasible & (emi * months > principal)
+    iterations = 0
+
+    while active.any() and iterations < max_iterations:
+        iterations += 1
+        r = monthly_rate[active]
+        residual = emi[active] * _annuity_factor(r, months[active]) - principal[active]
+        slope = emi[active] * _annuity_factor_derivative(r, months[active])
+
+        updated = r - residual / slope
+        # Keep iterates positive: the annuity factor is monotone, so halving is safe
+        updated = np.where(updated > 0, updated, r / 2)
+        monthly_rate[active] = updated
+
+        done = np.abs(updated - r) <= tolerance * np.maximum(1.0, updated)
+        active[np.flatnonzero(active)[done]] = False
+
+    residual = np.where(feasible, emi * _annuity_factor(np.nan_to_num(monthly_rate), months) - principal, np.nan)
+    diagnostics = {
+        "iterations": iterations,
+        "converged": (feasible & ~active).reshape(shape),
+        "residual": residual.reshape(shape),
+    }
+
+    return _result((monthly_rate * 12 * 100).reshape(shape)), diagnostics
+
+
+if __name__ == "__main__":
+    import time as timer
+
+    print(f"Principal for EMI 10,000 @ 8.5% for 5 years: {principal_from_emi(10000, 8.5, 5):,.2f}")
+    print(f"Tenure for 500,000 @ 8.5% with EMI 10,000: {tenure_from_emi(500000, 8.5, 10000):.2f} years")
+    rate, info = rate_from_emi(500000, 10258.27, 5)
+    print(f"Implied rate: {rate:.4f}% after {info['iterations']} iterations")
+
+    rng = np.random.default_rng(0)
+    n = 1000000
+    principals = rng.uniform(1e5, 1e7, n)
+    rates = rng.uniform(5, 20, n)
+    years = rng.integers(1, 31, n)
+    months = years * 12
+    monthly = rates / 1200
+    emis = principals * monthly / -np.expm1(-months * np.log1p(monthly))
+
+    start = timer.perf_counter()
+    solved, info = rate_from_emi(principals, emis, years)
+    elapsed = timer.perf_counter() - start
+    print(f"Solved {n} loans in {elapsed:.2f}s, {info['iterations']} iterations, "
+          f"max error {np.max(np.abs(solved - rates)):.2e}%")
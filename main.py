@@ -1,7 +1,7 @@
 # main.py - Entry point for CalcMaster 360
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Import our custom modules
 from basic_calc import BasicCalculator
@@ -10,16 +10,54 @@ from finance_calc import FinancialCalculator
 from converter import UnitConverter
 from history import HistoryManager
 from favorites import FavoritesManager
-from utils import clear_screen, get_numeric_input, get_menu_choice, display_error
+from pager import Pager
+from expression_plan import build_namespaces
+from sweep import vector_namespaces, parse_values, sweep
+from sheet import Sheet
+from matrix_calc import MatrixCalculator
+from stats_calc import StatisticsCalculator
+from operations import Menu, build_registry
+from utils import clear_screen, get_menu_choice, display_error
 
 class CalcMaster360:
     def __init__(self):
-        self.history_manager = HistoryManager()
+        # History is persisted on a writer thread so calculations never wait on disk
+        self.history_manager = HistoryManager(background=True, log_file="data/history_log")
         self.favorites_manager = FavoritesManager()
         self.basic_calc = BasicCalculator(self.history_manager)
         self.scientific_calc = ScientificCalculator(self.history_manager)
         self.finance_calc = FinancialCalculator(self.history_manager)
         self.converter = UnitConverter(self.history_manager)
+        self.matrix_calc = MatrixCalculator(self.history_manager)
+        self.stats_calc = StatisticsCalculator(self.history_manager)
+        # Every calculation by name, for "Run Operation" and headless callers
+        self.operations = build_registry(self.basic_calc, self.scientific_calc, self.finance_calc,
+                                         self.converter, self.matrix_calc, self.stats_calc)
+        # Favorites run as precompiled plans against these namespaces
+        self.plan_namespaces = build_namespaces(self.finance_calc, self.operations, self.scientific_calc)
+        self.sweep_namespaces = vector_namespaces(self.finance_calc, self.scientific_calc)
+        self.sheet = None  # Created on first use of spreadsheet mode
+        self.main_menu = Menu("🚀 CALCMASTER 360 🚀", [
+            ("Basic Calculator", self.run_basic_mode),
+            ("Scientific Calculator", self.run_scientific_mode),
+            ("Financial Calculator", self.run_financial_mode),
+            ("Unit Converter", self.run_conversion_mode),
+            ("View Calculation History", self.view_history),
+            ("Favorites", self.manage_favorites),
+            ("Toggle Dark/Light Mode", self.toggle_dark_mode),
+            ("Help", self.show_help),
+            ("Spreadsheet Mode", self.run_spreadsheet_mode),
+            ("Matrix Calculator", self.run_matrix_mode),
+            ("Statistics", self.run_statistics_mode),
+            ("Run Operation by Name", self.run_operation),
+            ("Exit", self.exit),
+        ])
+        self.favorites_menu = Menu("FAVORITES", [
+            ("View Favorites", self.view_favorites),
+            ("Add Current Calculation to Favorites", self.add_to_favorites),
+            ("Remove from Favorites", self.remove_from_favorites),
+            ("Back to Main Menu", None),
+        ])
 
         # Initialize with light mode by default
         self.dark_mode = False
@@ -32,19 +70,7 @@ class CalcMaster360:
 
     def display_main_menu(self):
         """Display the main menu options"""
-        print("\n" + "="*50)
-        print("          🚀 CALCMASTER 360 🚀")
-        print("="*50)
-        print("1.  Basic Calculator")
-        print("2.  Scientific Calculator")
-        print("3.  Financial Calculator")
-        print("4.  Unit Converter")
-        print("5.  View Calculation History")
-        print("6.  Favorites")
-        print("7.  Toggle Dark/Light Mode")
-        print("8.  Help")
-        print("9.  Exit")
-        print("="*50)
+        self.main_menu.display()
 
     def show_help(self):
         """Display help information"""
@@ -61,6 +87,10 @@ class CalcMaster360:
         print("- Converter: Unit conversions for length, weight, etc.")
         print("- History: View your past calculations")
         print("- Favorites: Save frequently used calculations")
+        print("- Spreadsheet: Cells that reference each other and update automatically")
+        print("- Matrix: Inverse, determinant, linear systems, eigenvalues, SVD")
+        print("- Statistics: Mean, spread, percentiles and histograms of large data files")
+        print("- Run Operation: Any calculation by name, e.g. finance.emi or convert.length")
         print("\nNAVIGATION:")
         print("- Use numbers to select menu options")
         print("- Follow prompts for inputs")
@@ -84,30 +114,170 @@ class CalcMaster360:
         """Run the unit conversion mode"""
         self.converter.run()
 
-    def view_history(self):
-        """View calculation history"""
+    def run_matrix_mode(self):
+        """Run the matrix calculator mode"""
+        self.matrix_calc.run()
+
+    def run_statistics_mode(self):
+        """Run the statistics mode"""
+        self.stats_calc.run()
+
+    def run_operation(self):
+        """Pick any registered operation by name and run it"""
         clear_screen()
-        print("\n" + "="*50)
-        print("          CALCULATION HISTORY")
-        print("="*50)
+        print("\n--- Run Operation by Name ---")
+        for category in self.operations.categories():
+            names = [name.split(".", 1)[1] for name in self.operations.names(category)]
+            print(f"{category}: {', '.join(names)}")
+
+        name = input("\nEnter operation (e.g. finance.emi): ").strip()
+        if not name:
+            return
+        try:
+            operation = self.operations.get(name)
+            if operation.description:
+                print(operation.description)
+            arguments = self.operations.ask_arguments(name)
+            result = self.operations.invoke(name, **arguments)
+            print(f"\nResult: {result}")
+            expression = f"{name}({', '.join(f'{key}={value}' for key, value in arguments.items())})"
+            self.history_manager.add_to_history(expression, result)
+        except (ValueError, ArithmeticError) as e:
+            display_error(str(e))
+        input("\nPress Enter to continue...")
 
-        history = self.history_manager.get_history()
+    def exit(self):
+        """Close the history and leave the application"""
+        print("\nThank you for using CalcMaster 360! Goodbye! 👋")
+        self.history_manager.close()
+        sys.exit(0)
+
+    def browse(self, title, pager, render, commands=None, find_date=None, selectable=True):
+        """
+        Page through entries one page at a time
+
+        Only the current page is fetched and printed. Returns a selected
+        (position, item) pair, a key from commands, or None to go back.
+        """
+        commands = commands or {}
+
+        while True:
+            clear_screen()
+            print("\n" + "="*50)
+            print(f"          {title}")
+            print("="*50)
 
-        if not history:
+            if pager.search_term:
+                print(f"Search: '{pager.search_term}'\n")
+            if not pager.items:
+                print("No matching entries.")
+            for position, item in pager.items:
+                print(f"{position + 1}. {render(item)}")
+
+            print(f"\nPage {pager.page_number}{'' if pager.has_next else ' (last)'}")
+            print("n/p: next/previous page   /text: search   +text: refine search   -: undo last character")
+            if find_date:
+                print("d YYYY-MM-DD: jump to date")
+            for key, label in commands.items():
+                print(f"{key}: {label}")
+            print(f"{'number: select   ' if selectable else ''}Enter: back")
+
+            command = input("> ").strip()
+
+            if not command:
+                return None
+            elif command in commands:
+                return command
+            elif command == "n":
+                pager.next()
+            elif command == "p":
+                pager.prev()
+            elif command.startswith("/"):
+                pager.search(command[1:])
+            elif command.startswith("+"):
+                # Search as you type: each fragment narrows the current search
+                pager.search(pager.search_term + command[1:])
+            elif command == "-":
+                pager.search(pager.search_term[:-1])
+            elif find_date and command.startswith("d "):
+                try:
+                    day = datetime.strptime(command[2:].strip(), "%Y-%m-%d")
+                except ValueError:
+                    display_error("Dates must look like 2024-01-31")
+                    input("Press Enter to continue...")
+                    continue
+                pager.reset(find_date(day))
+            elif selectable and command.isdigit():
+                selected = [pair for pair in pager.items if pair[0] + 1 == int(command)]
+                if selected:
+                    return selected[0]
+                display_error("Choose a number shown on this page")
+                input("Press Enter to continue...")
+            else:
+                display_error("Unknown command")
+                input("Press Enter to continue...")
+
+    def find_history_date(self, day):
+        """Cursor of the newest entry made on or before the given day"""
+        end_of_day = day + timedelta(days=1) - timedelta(seconds=1)
+        first, _ = self.history_manager.find_time_range(end=end_of_day)
+        return first
+
+    def run_spreadsheet_mode(self):
+        """Edit a sheet of cells that reference each other"""
+        if self.sheet is None:
+            self.sheet = Sheet(self.plan_namespaces["finance"])
+
+        while True:
+            clear_screen()
+            print("\n" + "="*50)
+            print("          SPREADSHEET MODE")
+            print("="*50)
+            for name, cell in self.sheet.cells.items():
+                formula = "" if cell.is_input else f"  [= {cell.formula}]"
+                print(f"{name} = {self.sheet.display(name)}{formula}")
+            if not self.sheet.cells:
+                print("The sheet is empty.")
+
+            print("\nCell edits: A = 1000; B = A * 1.18; C = emi(B, r, t)")
+            print("Separate edits with ';' to apply them together.")
+            print("del NAME: delete a cell   Enter: back")
+            command = input("> ").strip()
+
+            if not command:
+                return
+
+            try:
+                if command.startswith("del "):
+                    self.sheet.delete_cell(command[4:].strip())
+                    continue
+
+                edits = {}
+                for edit in command.split(";"):
+                    name, equals, formula = edit.partition("=")
+                    if not equals or not formula.strip():
+                        raise ValueError(f"Edits look like NAME = formula, not '{edit.strip()}'")
+                    edits[name.strip()] = formula.strip()
+                self.sheet.set_cells(edits)
+            except ValueError as e:
+                display_error(str(e))
+                input("Press Enter to continue...")
+
+    def view_history(self):
+        """View calculation history"""
+        if not self.history_manager.get_entry_count():
+            clear_screen()
             print("No calculations in history yet.")
             input("\nPress Enter to return to main menu...")
             return
 
-        for i, entry in enumerate(history, 1):
-            print(f"{i}. {entry['timestamp']} - {entry['calculation']} = {entry['result']}")
+        pager = Pager(self.history_manager.search_page, page_size=10)
+        choice = self.browse("CALCULATION HISTORY", pager,
+                             lambda entry: f"{entry['timestamp']} - {entry['calculation']} = {entry['result']}",
+                             commands={"c": "Clear History"}, find_date=self.find_history_date,
+                             selectable=False)
 
-        print("\nOptions:")
-        print("1. Clear History")
-        print("2. Back to Main Menu")
-
-        choice = get_menu_choice(2)
-
-        if choice == 1:
+        if choice == "c":
             self.history_manager.clear_history()
             print("History cleared!")
             input("Press Enter to continue...")
@@ -116,70 +286,91 @@ class CalcMaster360:
         """Manage favorite calculations"""
         while True:
             clear_screen()
-            print("\n" + "="*50)
-            print("               FAVORITES")
-            print("="*50)
-            print("1. View Favorites")
-            print("2. Add Current Calculation to Favorites")
-            print("3. Remove from Favorites")
-            print("4. Back to Main Menu")
-
-            choice = get_menu_choice(4)
-
-            if choice == 1:
-                self.view_favorites()
-            elif choice == 2:
-                self.add_to_favorites()
-            elif choice == 3:
-                self.remove_from_favorites()
-            elif choice == 4:
+            self.favorites_menu.display()
+            if not self.favorites_menu.dispatch(get_menu_choice(len(self.favorites_menu.entries))):
                 break
 
     def view_favorites(self):
         """View favorite calculations"""
-        favorites = self.favorites_manager.get_favorites()
-
-        if not favorites:
+        if not self.favorites_manager.favorites:
             print("No favorites saved yet.")
             input("\nPress Enter to continue...")
             return
 
-        print("\nYour Favorite Calculations:")
-        for i, fav in enumerate(favorites, 1):
-            print(f"{i}. {fav['name']}: {fav['expression']}")
-
-        print("\nSelect a favorite to use or 0 to go back:")
-        choice = get_menu_choice(len(favorites), allow_zero=True)
+        pager = Pager(self.favorites_manager.search_page, page_size=10)
+        selected = self.browse("YOUR FAVORITE CALCULATIONS", pager,
+                               lambda fav: f"{fav['name']}: {fav['expression']}")
 
-        if choice == 0:
+        if selected is None:
             return
 
-        selected_fav = favorites[choice-1]
+        index, selected_fav = selected
         expression = selected_fav['expression']
 
-        # Use the appropriate calculator based on the expression type
-        if any(op in expression for op in ['sin', 'cos', 'tan', 'log', 'ln']):
-            result = self.scientific_calc.evaluate_expression(expression)
-        elif any(op in expression for op in ['EMI', 'interest', 'currency']):
-            # This would need more sophisticated detection
-            result = self.finance_calc.evaluate_expression(expression)
-        else:
-            result = self.basic_calc.evaluate_expression(expression)
+        # The plan already knows its engine and holds the compiled expression
+        try:
+            plan = self.favorites_manager.get_plan(index)
+            if plan.parameters:
+                self.run_parameterized_favorite(plan)
+                return
+            result = plan.evaluate(self.plan_namespaces)
+        except (ValueError, ArithmeticError, TypeError) as e:
+            display_error(f"Could not run favorite: {e}")
+            input("\nPress Enter to continue...")
+            return
 
+        self.history_manager.add_to_history(expression, result)
         print(f"\nResult: {result}")
         input("\nPress Enter to continue...")
 
+    def run_parameterized_favorite(self, plan):
+        """Ask for parameter values and run one calculation or a whole sweep"""
+        print(f"\n{plan.expression}")
+        print("Enter a value, a list (1, 2, 3) or a range (start:stop:step) for each parameter")
+        values = {name: parse_values(input(f"{name}: ")) for name in plan.parameters}
+
+        if all(len(v) == 1 for v in values.values()):
+            arguments = {name: float(v[0]) for name, v in values.items()}
+            result = plan.evaluate(self.plan_namespaces, arguments)
+            bindings = ", ".join(f"{name}={value:g}" for name, value in arguments.items())
+            self.history_manager.add_to_history(f"{plan.expression} with {bindings}", result)
+            print(f"\nResult: {result}")
+            input("\nPress Enter to continue...")
+            return
+
+        table = sweep(plan, self.sweep_namespaces, values)
+        stats = table.summary()
+        print(f"\n{stats['count']} results: min {stats['min']:.4f}, max {stats['max']:.4f}, mean {stats['mean']:.4f}")
+
+        print("\n" + "  ".join(f"{name:>12}" for name in table.names + ["result"]))
+        for row in zip(*(column.tolist() for column in table.columns(0, min(10, len(table))))):
+            print("  ".join(f"{value:>12.4f}" for value in row))
+        if len(table) > 10:
+            print("...")
+
+        print("\n1. Export to CSV")
+        print("2. Export to JSON")
+        print("3. Done")
+        choice = get_menu_choice(3)
+
+        if choice in (1, 2):
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            if choice == 1:
+                filename = table.to_csv(f"calc_sweep_{timestamp}.csv")
+            else:
+                filename = table.to_json(f"calc_sweep_{timestamp}.json")
+            print(f"Sweep exported to {filename}")
+            input("\nPress Enter to continue...")
+
     def add_to_favorites(self):
         """Add a calculation to favorites"""
         # Get the last calculation from history
-        history = self.history_manager.get_history()
-
-        if not history:
+        if not self.history_manager.get_entry_count():
             print("No recent calculations to add to favorites.")
             input("\nPress Enter to continue...")
             return
 
-        last_calc = history[-1]
+        last_calc = self.history_manager.get_entry(0)
         calculation = f"{last_calc['calculation']} = {last_calc['result']}"
 
         print(f"Recent calculation: {calculation}")
@@ -196,24 +387,19 @@ class CalcMaster360:
 
     def remove_from_favorites(self):
         """Remove a calculation from favorites"""
-        favorites = self.favorites_manager.get_favorites()
-
-        if not favorites:
+        if not self.favorites_manager.favorites:
             print("No favorites to remove.")
             input("\nPress Enter to continue...")
             return
 
-        print("\nSelect a favorite to remove:")
-        for i, fav in enumerate(favorites, 1):
-            print(f"{i}. {fav['name']}: {fav['expression']}")
-
-        print("0. Cancel")
-        choice = get_menu_choice(len(favorites), allow_zero=True)
+        pager = Pager(self.favorites_manager.search_page, page_size=10)
+        selected = self.browse("SELECT A FAVORITE TO REMOVE", pager,
+                               lambda fav: f"{fav['name']}: {fav['expression']}")
 
-        if choice == 0:
+        if selected is None:
             return
 
-        removed = self.favorites_manager.remove_favorite(choice-1)
+        removed = self.favorites_manager.remove_favorite(selected[0])
         print(f"Removed: {removed['name']}")
         input("\nPress Enter to continue...")
 
@@ -226,28 +412,7 @@ class CalcMaster360:
             self.display_main_menu()
 
             try:
-                choice = get_menu_choice(9)
-
-                if choice == 1:
-                    self.run_basic_mode()
-                elif choice == 2:
-                    self.run_scientific_mode()
-                elif choice == 3:
-                    self.run_financial_mode()
-                elif choice == 4:
-                    self.run_conversion_mode()
-                elif choice == 5:
-                    self.view_history()
-                elif choice == 6:
-                    self.manage_favorites()
-                elif choice == 7:
-                    self.toggle_dark_mode()
-                elif choice == 8:
-                    self.show_help()
-                elif choice == 9:
-                    print("\nThank you for using CalcMaster 360! Goodbye! 👋")
-                    sys.exit(0)
-
+                self.main_menu.dispatch(get_menu_choice(len(self.main_menu.entries)))
             except KeyboardInterrupt:
                 print("\n\nOperation cancelled. Returning to main menu...")
                 input("Press Enter to continue...")
@@ -0,0 +1,385 @@
+import ast
+import hashlib
+import os
+import numpy as np
+
+from utils import display_error
+from memoize import ResultCache, caches, cached_call
+from operations import Menu, Parameter
+
+# Rows of a CSV matrix converted per chunk when building its .npy copy
+CSV_CHUNK_ROWS = 10000
+
+
+def parse_matrix(text):
+    """Parse '[[1, 2], [3, 4]]' or '1 2; 3 4' into a 2-D float array"""
+    text = text.strip()
+    if not text:
+        raise ValueError("Matrix is empty")
+
+    try:
+        if text.startswith("["):
+            rows = ast.literal_eval(text)
+        else:
+            rows = [[float(value) for value in row.replace(",", " ").split()] for row in text.split(";")]
+        matrix = np.array(rows, dtype=float)
+    except (ValueError, SyntaxError, TypeError):
+        raise ValueError("Matrices look like [[1, 2], [3, 4]] or 1 2; 3 4 with equal-length rows")
+
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    if matrix.ndim != 2:
+        raise ValueError("Only 2-D matrices are supported")
+    return matrix
+
+
+def _csv_to_npy(csv_path, npy_path):
+    """
+    Convert a numeric CSV file to .npy in chunks, never holding it all in memory
+
+    The copy is built in a temporary file and only moved into place once
+    every row has parsed, so a bad CSV never leaves a half-written copy.
+    """
+    with open(csv_path, 'r') as f:
+        first = f.readline()
+        try:
+            columns = len(np.array(first.replace(",", " ").split(), dtype=float))
+            header = False
+        except ValueError:
+            header = True
+            columns = len(first.split(","))
+        rows = sum(1 for line in f if line.strip()) + (0 if header else 1)
+
+    temporary = f"{npy_path}.{os.getpid()}.tmp"
+    try:
+        output = np.lib.format.open_memmap(temporary, mode="w+", dtype=float, shape=(rows, columns))
+        with open(csv_path, 'r') as f:
+            if header:
+                f.readline()
+            row = 0
+            while row < rows:
+                chunk = np.loadtxt(f, delimiter=",", ndmin=2, max_rows=CSV_CHUNK_ROWS)
+                if not len(chunk):
+                    break
+                if chunk.shape[1] != columns:
+                    raise ValueError(f"Every row must have {columns} values")
+                output[row:row + len(chunk)] = chunk
+                row += len(chunk)
+        output.flush()
+        del output
+        if row != rows:
+            raise ValueError(f"Expected {rows} rows, read {row}")
+        os.replace(temporary, npy_path)
+    except BaseException as e:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        if isinstance(e, ValueError):
+            raise ValueError(f"Cannot read {csv_path} as a comma-separated matrix: {e}")
+        raise
+
+
+def _source_stamp(path):
+    """Size and modification time identifying the version of a file"""
+    status = os.stat(path)
+    return f"{status.st_size} {status.st_mtime_ns}"
+
+
+def load_matrix(path):
+    """
+    Memory-map a matrix from a .npy file, or from a CSV file via a .npy copy
+
+    The CSV copy is written next to the file and rebuilt whenever the CSV's
+    size or modification time differs from the ones it was built from.
+    """
+    if not os.path.exists(path):
+        raise ValueError(f"File not found: {path}")
+
+    if path.lower().endswith(".csv"):
+        npy_path = path + ".npy"
+        stamp_path = npy_path + ".source"
+        stamp = _source_stamp(path)
+        try:
+            with open(stamp_path, 'r') as f:
+                current = os.path.exists(npy_path) and f.read().strip() == stamp
+        except OSError:
+            current = False
+        if not current:
+            _csv_to_npy(path, npy_path)
+            with open(stamp_path, 'w') as f:
+                f.write(stamp)
+        path = npy_path
+
+    matrix = np.load(path, mmap_mode="r")
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2:
+        raise ValueError("Only 2-D matrices are supported")
+    return matrix
+
+
+def content_hash(matrix):
+    """Hash of a matrix's shape, dtype and values (identifies it in the cache)"""
+    matrix = np.ascontiguousarray(matrix)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{matrix.shape}{matrix.dtype.str}".encode())
+    digest.update(memoryview(matrix).cast("B"))
+    return digest.hexdigest()
+
+
+def _read_only(result):
+    """Freeze cached arrays so callers can't change what later calls get back"""
+    for value in result if isinstance(result, tuple) else (result,):
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    return result
+
+
+class MatrixCalculator:
+    def __init__(self, history_manager):
+        self.history_manager = history_manager
+        # Named matrices and their content hashes
+        self.matrices = {}
+        self.hashes = {}
+        # Decompositions keyed by (operation, content hash); shows up in cache_stats()
+        self.cache = caches["MatrixCalculator.decompositions"] = ResultCache("MatrixCalculator.decompositions")
+
+    # ------------------------------
+    # Matrices
+    # ------------------------------
+    def store(self, name, matrix):
+        """Keep a matrix under a name, hashing it once"""
+        if not name.isidentifier():
+            raise ValueError(f"Invalid matrix name: {name}")
+        self.matrices[name] = matrix
+        self.hashes[name] = content_hash(matrix)
+        return matrix
+
+    def get(self, name):
+        if name not in self.matrices:
+            raise ValueError(f"No matrix named {name}")
+        return self.matrices[name]
+
+    def _matrix(self, text):
+        """A stored matrix by name, or a matrix literal"""
+        text = text.strip()
+        return self.get(text) if text.isidentifier() else parse_matrix(text)
+
+    def _key(self, matrix):
+        """Content hash of a matrix, reusing the stored hash for named matrices"""
+        for name, stored in self.matrices.items():
+            if stored is matrix:
+                return self.hashes[name]
+        return content_hash(matrix)
+
+    def _cached(self, operation, compute, *matrices):
+        """Return a cached result for these matrix contents, computing it once"""
+        key = (operation,) + tuple(self._key(matrix) for matrix in matrices)
+        return _read_only(cached_call(self.cache, key, lambda: compute(*matrices)))
+
+    @staticmethod
+    def _square(matrix):
+        if matrix.shape[0] != matrix.shape[1]:
+            raise ValueError(f"Matrix must be square, not {matrix.shape[0]}x{matrix.shape[1]}")
+
+    # ------------------------------
+    # Operations
+    # ------------------------------
+    def multiply(self, a, b):
+        """Matrix product a @ b"""
+        if a.shape[1] != b.shape[0]:
+            raise ValueError(f"Cannot multiply {a.shape[0]}x{a.shape[1]} by {b.shape[0]}x{b.shape[1]}")
+        return np.matmul(a, b)
+
+    def inverse(self, a):
+        """Matrix inverse"""
+        self._square(a)
+        try:
+            return self._cached("inverse", np.linalg.inv, a)
+        except np.linalg.LinAlgError:
+            raise ValueError("Matrix is singular and has no inverse")
+
+    def determinant(self, a):
+        """Determinant (via a log-determinant, so large matrices don't overflow early)"""
+        self._square(a)
+        sign, log_det = self._cached("slogdet", np.linalg.slogdet, a)
+        return float(sign * np.exp(log_det))
+
+    def solve(self, a, b):
+        """Solve a @ x = b"""
+        self._square(a)
+        if a.shape[0] != b.shape[0]:
+            raise ValueError("Right-hand side must have as many rows as the matrix")
+        try:
+            return self._cached("solve", np.linalg.solve, a, b)
+        except np.linalg.LinAlgError:
+            raise ValueError("Matrix is singular; the system has no unique solution")
+
+    def eigen(self, a):
+        """Eigenvalues and eigenvectors (symmetric matrices use the faster, real eigh)"""
+        self._square(a)
+        if np.allclose(a, a.T):
+            return self._cached("eigh", np.linalg.eigh, a)
+        return self._cached("eig", np.linalg.eig, a)
+
+    def svd(self, a):
+        """Thin singular value decomposition: a = U @ diag(S) @ Vt"""
+        return self._cached("svd", lambda m: tuple(np.linalg.svd(m, full_matrices=False)), a)
+
+    # ------------------------------
+    # User Interface (CLI)
+    # ------------------------------
+    def run(self):
+        """Run the matrix calculator interface"""
+        Menu("MATRIX CALCULATOR", [
+            ("Enter Matrix", self.enter_matrix_interface),
+            ("Load Matrix from File (.npy or .csv)", self.load_matrix_interface),
+            ("Multiply", lambda: self.operation_interface("multiply")),
+            ("Inverse", lambda: self.operation_interface("inverse")),
+            ("Determinant", lambda: self.operation_interface("determinant")),
+            ("Solve Linear System (A x = b)", lambda: self.operation_interface("solve")),
+            ("Eigenvalues and Eigenvectors", lambda: self.operation_interface("eigen")),
+            ("Singular Value Decomposition", lambda: self.operation_interface("svd")),
+            ("List Matrices", self.list_matrices),
+            ("Back to Main Menu", None),
+        ]).run()
+
+    def register_operations(self, registry):
+        """Add the matrix operations to an OperationRegistry (results as nested lists)"""
+        a = Parameter("a", str, description="matrix name or literal, e.g. [[1, 2], [3, 4]]")
+        b = Parameter("b", str, description="second matrix name or literal")
+        name = Parameter("matrix_name", str, description="matrix name")
+
+        registry.register("matrix.store",
+                          lambda matrix_name, matrix: self.store(matrix_name, parse_matrix(matrix)).tolist(),
+                          [name, Parameter("matrix", str, description="matrix literal, e.g. 1 2; 3 4")],
+                          "Keep a matrix under a name")
+        registry.register("matrix.load",
+                          lambda matrix_name, path: list(self.store(matrix_name, load_matrix(path)).shape),
+                          [name, Parameter("path", str, description=".npy or .csv file")],
+                          "Load a matrix from a file under a name; returns its shape")
+        registry.register("matrix.multiply",
+                          lambda a, b: self.multiply(self._matrix(a), self._matrix(b)).tolist(), [a, b],
+                          "Matrix product a @ b")
+        registry.register("matrix.inverse", lambda a: self.inverse(self._matrix(a)).tolist(), [a], "Matrix inverse")
+        registry.register("matrix.determinant", lambda a: self.determinant(self._matrix(a)), [a], "Determinant")
+        registry.register("matrix.solve", lambda a, b: self.solve(self._matrix(a), self._matrix(b)).tolist(),
+                          [a, Parameter("b", str, description="right-hand side name or literal")],
+                          "Solve a @ x = b")
+        registry.register("matrix.eig", lambda a: tuple(part.tolist() for part in self.eigen(self._matrix(a))),
+                          [a], "Eigenvalues and eigenvectors (as columns)")
+        registry.register("matrix.svd", lambda a: tuple(part.tolist() for part in self.svd(self._matrix(a))),
+                          [a], "Thin singular value decomposition (U, S, Vt)")
+
+    def show(self, label, matrix):
+        print(f"{label} ({matrix.shape[0]}x{matrix.shape[1]}):" if np.ndim(matrix) == 2 else f"{label}:")
+        print(np.array2string(np.asarray(matrix), precision=6, suppress_small=True, threshold=100))
+
+    def enter_matrix_interface(self):
+        """Type in a matrix literal"""
+        print("\n--- Enter Matrix ---")
+        print("Examples: [[1, 2], [3, 4]]  or  1 2; 3 4")
+        try:
+            name = input("Matrix name (e.g. A): ").strip()
+            matrix = self.store(name, parse_matrix(input("Matrix: ")))
+            self.show(name, matrix)
+        except ValueError as e:
+            display_error(str(e))
+
+    def load_matrix_interface(self):
+        """Memory-map a matrix from a file"""
+        print("\n--- Load Matrix ---")
+        try:
+            name = input("Matrix name (e.g. A): ").strip()
+            path = input("File path (.npy or .csv): ").strip()
+            matrix = self.store(name, load_matrix(path))
+            print(f"Loaded {name}: {matrix.shape[0]}x{matrix.shape[1]} (memory-mapped)")
+        except (ValueError, IOError) as e:
+            display_error(str(e))
+
+    def list_matrices(self):
+        """Show the stored matrices"""
+        if not self.matrices:
+            print("\nNo matrices yet.")
+            return
+        for name, matrix in self.matrices.items():
+            print(f"{name}: {matrix.shape[0]}x{matrix.shape[1]}")
+
+    def offer_save(self, result):
+        """Optionally keep a result matrix for later operations"""
+        name = input("Save result as (Enter to skip): ").strip()
+        if name:
+            self.store(name, np.array(result))
+            print(f"Saved as {name}")
+
+    def operation_interface(self, operation):
+        """Run one operation on named matrices"""
+        try:
+            a_name = input("Matrix name: ").strip()
+            a = self.get(a_name)
+
+            if operation in ("multiply", "solve"):
+                b_name = input("Second matrix name (right-hand side for solve): ").strip()
+                b = self.get(b_name)
+
+            if operation == "multiply":
+                result = self.multiply(a, b)
+                self.show(f"{a_name} × {b_name}", result)
+                expression, summary = f"Matrix: {a_name} × {b_name}", f"{result.shape[0]}x{result.shape[1]} matrix"
+                self.offer_save(result)
+
+            elif operation == "inverse":
+                result = self.inverse(a)
+                self.show(f"inverse({a_name})", result)
+                expression, summary = f"Matrix: inverse({a_name})", f"{result.shape[0]}x{result.shape[1]} matrix"
+                self.offer_save(result)
+
+            elif operation == "determinant":
+                summary = self.determinant(a)
+                print(f"\ndet({a_name}) = {summary}")
+                expression = f"Matrix: det({a_name})"
+
+            elif operation == "solve":
+                result = self.solve(a, b)
+                self.show(f"x for {a_name} x = {b_name}", result)
+                expression, summary = f"Matrix: solve({a_name}, {b_name})", np.round(result, 6).ravel().tolist()[:10]
+                self.offer_save(result)
+
+            elif operation == "eigen":
+                values, vectors = self.eigen(a)
+                self.show(f"Eigenvalues of {a_name}", values)
+                self.show("Eigenvectors (columns)", vectors)
+                expression, summary = f"Matrix: eig({a_name})", np.round(values, 6).tolist()[:10]
+
+            else:
+                u, s, vt = self.svd(a)
+                self.show(f"Singular values of {a_name}", s)
+                expression, summary = f"Matrix: svd({a_name})", np.round(s, 6).tolist()[:10]
+
+            self.history_manager.add_to_history(expression, summary)
+
+        except ValueError as e:
+            display_error(str(e))
+
+
+if __name__ == "__main__":
+    import time
+    from history import HistoryManager
+
+    calc = MatrixCalculator(HistoryManager("test_matrix_history.json"))
+    a = calc.store("A", parse_matrix("4 1; 2 3"))
+    print(f"det(A) = {calc.determinant(a)}, eigenvalues = {calc.eigen(a)[0]}")
+    print(f"solve(A, [1, 2]) = {calc.solve(a, parse_matrix('1; 2'))}")
+
+    rng = np.random.default_rng(0)
+    np.save("test_matrix.npy", rng.standard_normal((800, 800)))
+    big = calc.store("M", load_matrix("test_matrix.npy"))
+
+    for attempt in ("first", "cached"):
+        start = time.perf_counter()
+        calc.svd(big)
+        print(f"SVD of 800x800 ({attempt}): {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"Cache: {calc.cache.stats()}")
+
+    for filename in ("test_matrix.npy", "test_matrix_history.json"):
+        if os.path.exists(filename):
+            os.remove(filename)
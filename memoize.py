@@ -0,0 +1,171 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+# Shared settings for every memoized function
+settings = {
+    "enabled": True,
+    "policy": "lru",   # "lru" or "ttl"
+    "maxsize": 1024,
+    "ttl": 300.0,      # seconds, used by the "ttl" policy
+}
+
+# Function name -> ResultCache
+caches = {}
+# Shared on-disk cache behind the in-memory ones (see configure(disk_path=...))
+disk = None
+
+
+class ResultCache:
+    def __init__(self, name):
+        self.name = name
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Look up a result, refreshing its LRU position; MISSING if absent or expired"""
+        with self.lock:
+            entry = self.entries.get(key, MISSING)
+            if entry is not MISSING:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+
+            self.misses += 1
+            return MISSING
+
+    def put(self, key, value):
+        """Store a result, evicting the least recently used entries past maxsize"""
+        expires = time.monotonic() + settings["ttl"] if settings["policy"] == "ttl" else None
+
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings["maxsize"]:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Get hit/miss counters for this function"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.entries),
+        }
+
+
+def _fill(cache, key, compute):
+    """Get a result missing from memory from the disk cache (if used), else compute it"""
+    result = MISSING
+    shared = disk
+    if shared is not None:
+        disk_key = shared.key(cache.name, *key)
+        result = shared.get(disk_key)
+    if result is MISSING:
+        result = compute()
+        if shared is not None:
+            shared.put(disk_key, result)
+    cache.put(key, result)
+    return result
+
+
+def cached_call(cache, key, compute):
+    """Result for key from a ResultCache, the disk cache or, failing both, compute()"""
+    result = cache.get(key)
+    if result is MISSING:
+        result = _fill(cache, key, compute)
+    return result
+
+
+def memoize(depends_on=()):
+    """
+    Cache results of a pure calculator method
+
+    Args:
+        depends_on (tuple): Instance attributes the result also depends on
+            (e.g. "angle_mode" for trigonometric functions)
+    """
+    def decorator(func):
+        cache = caches[func.__qualname__] = ResultCache(func.__qualname__)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not settings["enabled"]:
+                return func(self, *args, **kwargs)
+
+            # Types are part of the key: factorial(5) and factorial(5.0) differ
+            key = (args, tuple(map(type, args)), tuple(sorted(kwargs.items())),
+                   tuple(getattr(self, attr) for attr in depends_on))
+            try:
+                result = cache.get(key)
+            except TypeError:
+                # Unhashable arguments (lists, arrays) are never cached
+                return func(self, *args, **kwargs)
+
+            if result is MISSING:
+                result = _fill(cache, key, lambda: func(self, *args, **kwargs))
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def configure(enabled=None, policy=None, maxsize=None, ttl=None, disk_path=None, disk_max_bytes=None):
+    """
+    Change the memoization settings for every cached function
+
+    disk_path names a SQLite file that keeps results across runs and is
+    shared with other processes using the same file ("" turns it off).
+    """
+    global disk
+    if policy is not None and policy not in ("lru", "ttl"):
+        raise ValueError("Cache policy must be 'lru' or 'ttl'")
+    if maxsize is not None and maxsize < 0:
+        raise ValueError("Cache size cannot be negative")
+
+    for name, value in (("enabled", enabled), ("policy", policy), ("maxsize", maxsize), ("ttl", ttl)):
+        if value is not None:
+            settings[name] = value
+
+    if disk_path is not None:
+        from disk_cache import DiskCache
+        if disk is not None:
+            disk.close()
+        disk = DiskCache(disk_path) if disk_path else None
+    if disk_max_bytes is not None and disk is not None:
+        disk.max_bytes = disk_max_bytes
+
+    # Changing the policy or size invalidates what is already stored
+    clear_caches()
+
+
+def clear_caches():
+    """Clear every memoized function's cache"""
+    for cache in caches.values():
+        cache.clear()
+
+
+def cache_stats():
+    """Get hit-rate statistics per memoized function (and for the disk cache, if used)"""
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    if disk is not None:
+        stats["disk"] = disk.stats()
+    return stats
@@ -0,0 +1,124 @@
+import numpy as np
+
+RETURN_MODELS = ("normal", "lognormal")
+
+
+def period_return_sampler(model, mean, volatility):
+    """Build a function that turns standard normal draws into per-period growth factors"""
+    if model == "normal":
+        # Simple returns are normal; a path can lose at most everything
+        def sampler(z):
+            return np.maximum(1.0 + mean + volatility * z, 0.0)
+    elif model == "lognormal":
+        # Match the arithmetic mean and volatility of the simple return
+        sigma = np.sqrt(np.log1p((volatility / (1.0 + mean)) ** 2))
+        mu = np.log1p(mean) - sigma ** 2 / 2
+
+        def sampler(z):
+            return np.exp(mu + sigma * z)
+    else:
+        raise ValueError(f"Unknown return model: {model}. Use one of {', '.join(RETURN_MODELS)}")
+
+    return sampler
+
+
+def simulate_investment(principal, rate, time, volatility, compounding_frequency=1, contribution=0.0,
+                        paths=10000, model="lognormal", target=None, percentiles=(5, 25, 50, 75, 95),
+                        seed=None, chunk_size=100000, band_paths=10000):
+    """
+    Simulate investment growth over random return paths
+
+    Args:
+        principal (float): Starting amount
+        rate (float): Expected annual return (%)
+        time (float): Horizon in years
+        volatility (float): Annual volatility of returns (%)
+        compounding_frequency (int): Periods per year
+        contribution (float): Amount added at the end of every period
+        paths (int): Number of simulated paths
+        model (str): "normal" or "lognormal" per-period returns
+        target (float): Optional goal amount
+        percentiles (tuple): Percentiles reported for final values and bands
+        seed (int): Seed for reproducible results (for a given chunk_size)
+        chunk_size (int): Paths simulated at once; bounds working memory
+        band_paths (int): Paths kept in full to draw the percentile bands
+
+    Returns:
+        dict: Summary statistics, percentile bands and target probabilities
+    """
+    if paths <= 0 or chunk_size <= 0:
+        raise ValueError("Number of paths and chunk size must be positive")
+    if volatility < 0:
+        raise ValueError("Volatility cannot be negative")
+
+    periods = int(round(time * compounding_frequency))
+    if periods <= 0:
+        raise ValueError("Time period must cover at least one compounding period")
+
+    mean = rate / (100 * compounding_frequency)
+    sd = volatility / (100 * np.sqrt(compounding_frequency))
+    sampler = period_return_sampler(model, mean, sd)
+    rng = np.random.default_rng(seed)
+
+    # Final values are kept for every path; full trajectories only for the band sample
+    finals = np.empty(paths)
+    band_rows = min(band_paths, paths)
+    trajectories = np.empty((band_rows, periods + 1))
+    target_hits = 0
+
+    for start in range(0, paths, chunk_size):
+        n = min(chunk_size, paths - start)
+        values = np.full(n, float(principal))
+        peak = values.copy() if target is not None else None
+        sample = max(0, min(n, band_rows - start))
+        trajectories[start:start + sample, 0] = values[:sample]
+
+        for t in range(1, periods + 1):
+            values *= sampler(rng.standard_normal(n))
+            if contribution:
+                values += contribution
+            if sample:
+                trajectories[start:start + sample, t] = values[:sample]
+            if peak is not None:
+                np.maximum(peak, values, out=peak)
+
+        finals[start:start + n] = values
+        if peak is not None:
+            target_hits += int(np.count_nonzero(peak >= target))
+
+    final_percentiles = np.percentile(finals, percentiles)
+    band_values = np.percentile(trajectories, percentiles, axis=0)
+
+    results = {
+        "paths": paths,
+        "periods": periods,
+        "model": model,
+        "mean": float(finals.mean()),
+        "std": float(finals.std()),
+        "min": float(finals.min()),
+        "max": float(finals.max()),
+        "percentiles": {p: float(v) for p, v in zip(percentiles, final_percentiles)},
+        "bands": {p: band for p, band in zip(percentiles, band_values)},
+    }
+
+    if target is not None:
+        results["target"] = target
+        results["prob_target"] = float(np.count_nonzero(finals >= target)) / paths
+        results["prob_target_hit"] = target_hits / paths
+
+    return results
+
+
+if __name__ == "__main__":
+    import time as timer
+
+    start = timer.perf_counter()
+    results = simulate_investment(100000, 10, 20, 15, compounding_frequency=12, contribution=500,
+                                  paths=1000000, target=1000000, seed=42)
+    elapsed = timer.perf_counter() - start
+
+    print(f"Simulated {results['paths']} paths x {results['periods']} periods in {elapsed:.2f}s")
+    for p, value in results["percentiles"].items():
+        print(f"P{p}: {value:,.2f}")
+    print(f"Chance of ending above target: {results['prob_target']:.1%}")
+    print(f"Chance of reaching target at any point: {results['prob_target_hit']:.1%}")
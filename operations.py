@@ -0,0 +1,205 @@
+from utils import display_error, get_menu_choice, get_numeric_input
+
+REQUIRED = object()
+
+
+class Parameter:
+    """One argument of an operation: name, type, default and a prompt"""
+    __slots__ = ("name", "kind", "default", "description")
+
+    def __init__(self, name, kind=float, default=REQUIRED, description=""):
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.description = description or name.replace("_", " ")
+
+    @property
+    def required(self):
+        return self.default is REQUIRED
+
+    def coerce(self, value):
+        """Convert an argument (e.g. text from a request) to the parameter's type"""
+        if value is None and not self.required:
+            return value
+        try:
+            if self.kind is int and isinstance(value, float):
+                if not value.is_integer():
+                    raise ValueError
+                return int(value)
+            if self.kind is list:
+                if isinstance(value, str):
+                    return [float(part) for part in value.replace(",", " ").split()]
+                return list(value)
+            if self.kind is bool and isinstance(value, str):
+                return value.strip().lower() in ("1", "true", "yes", "y")
+            return value if isinstance(value, self.kind) else self.kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{self.name} must be {self.kind.__name__}, not {value!r}")
+
+    def describe(self):
+        schema = {"name": self.name, "type": self.kind.__name__, "description": self.description}
+        if not self.required:
+            schema["default"] = self.default
+        return schema
+
+
+class Operation:
+    """A named, callable calculation with an argument schema"""
+    __slots__ = ("name", "function", "parameters", "description", "category")
+
+    def __init__(self, name, function, parameters=(), description="", category=None):
+        self.name = name
+        self.function = function
+        self.parameters = tuple(parameters)
+        self.description = description
+        self.category = category or name.split(".", 1)[0]
+
+    def bind(self, arguments):
+        """Check and convert arguments into the positional values for the function"""
+        unknown = [name for name in arguments if name not in {p.name for p in self.parameters}]
+        if unknown:
+            raise ValueError(f"{self.name} has no argument '{unknown[0]}'")
+
+        values = []
+        for parameter in self.parameters:
+            if parameter.name in arguments:
+                values.append(parameter.coerce(arguments[parameter.name]))
+            elif parameter.required:
+                raise ValueError(f"Missing argument '{parameter.name}' for {self.name}")
+            else:
+                values.append(parameter.default)
+        return values
+
+    def __call__(self, **arguments):
+        return self.function(*self.bind(arguments))
+
+    def describe(self):
+        return {"name": self.name, "category": self.category, "description": self.description,
+                "parameters": [parameter.describe() for parameter in self.parameters]}
+
+
+class OperationRegistry:
+    """
+    Every programmatic calculation by name, for the CLI, batch jobs and servers
+
+    Calculators add their operations with register_operations(registry);
+    invoke() looks an operation up in a dict and validates its arguments
+    against the schema, so nothing goes through input().
+    """
+
+    def __init__(self):
+        self.operations = {}
+
+    def register(self, name, function, parameters=(), description="", category=None):
+        if name in self.operations:
+            raise ValueError(f"Operation already registered: {name}")
+        operation = self.operations[name] = Operation(name, function, parameters, description, category)
+        return operation
+
+    def get(self, name):
+        operation = self.operations.get(name)
+        if operation is None:
+            raise ValueError(f"Unknown operation: {name}")
+        return operation
+
+    def invoke(self, name, **arguments):
+        """Run an operation with keyword arguments (e.g. invoke("finance.emi", principal=1e5, rate=8.5, time=20))"""
+        return self.get(name)(**arguments)
+
+    def run_batch(self, requests):
+        """
+        Run {"operation": name, "arguments": {...}} requests in order
+
+        Failures don't stop the batch; each result is {"operation", "result"}
+        or {"operation", "error"}.
+        """
+        results = []
+        for request in requests:
+            name = request.get("operation")
+            try:
+                results.append({"operation": name, "result": self.invoke(name, **request.get("arguments", {}))})
+            except (ValueError, TypeError, ArithmeticError) as e:
+                results.append({"operation": name, "error": str(e)})
+        return results
+
+    def names(self, category=None):
+        return [name for name, operation in self.operations.items()
+                if category is None or operation.category == category]
+
+    def categories(self):
+        return list(dict.fromkeys(operation.category for operation in self.operations.values()))
+
+    def describe(self, category=None):
+        """Schemas of the registered operations (for help screens and APIs)"""
+        return [self.operations[name].describe() for name in self.names(category)]
+
+    def ask_arguments(self, name):
+        """Ask for an operation's arguments interactively"""
+        operation = self.get(name)
+        arguments = {}
+        for parameter in operation.parameters:
+            label = parameter.description + ("" if parameter.required else f" (default {parameter.default})")
+            if parameter.kind in (float, int):
+                default = None if parameter.required else parameter.default
+                value = get_numeric_input(f"Enter {label}: ", default=default)
+            else:
+                value = input(f"Enter {label}: ").strip()
+                if not value and not parameter.required:
+                    continue
+            arguments[parameter.name] = value
+        return arguments
+
+
+def build_registry(basic_calc=None, scientific_calc=None, finance_calc=None, converter=None,
+                   matrix_calc=None, stats_calc=None):
+    """Registry holding the operations of whichever calculators are given"""
+    registry = OperationRegistry()
+    for calculator in (basic_calc, scientific_calc, finance_calc, converter, matrix_calc, stats_calc):
+        if calculator is not None:
+            calculator.register_operations(registry)
+    return registry
+
+
+class Menu:
+    """
+    A numbered menu backed by a dispatch table instead of an if/elif chain
+
+    Entries are (label, handler) pairs; a handler of None leaves the menu.
+    """
+
+    def __init__(self, title, entries, width=50):
+        self.title = title
+        self.entries = list(entries)
+        self.width = width
+
+    def display(self, header=None):
+        print("\n" + "="*self.width)
+        print(self.title.center(self.width).rstrip())
+        print("="*self.width)
+        if header:
+            print(header)
+        pad = len(str(len(self.entries))) + 1
+        for number, (label, _) in enumerate(self.entries, 1):
+            print(f"{str(number) + '.':<{pad}} {label}")
+        print("="*self.width)
+
+    def dispatch(self, choice):
+        """Run the handler for a menu number; False when the entry leaves the menu"""
+        handler = self.entries[choice - 1][1]
+        if handler is None:
+            return False
+        handler()
+        return True
+
+    def run(self, header=None):
+        """Show the menu and dispatch choices until the user leaves it"""
+        while True:
+            self.display(header() if header else None)
+            try:
+                if not self.dispatch(get_menu_choice(len(self.entries))):
+                    break
+            except KeyboardInterrupt:
+                print("\nOperation cancelled.")
+                break
+            except Exception as e:
+                display_error(str(e))
@@ -0,0 +1,84 @@
+class Pager:
+    """
+    Cursor-based pagination over a page source
+
+    fetch(search_term, cursor, page_size) returns (items, next_cursor) with
+    next_cursor None on the last page. Only the current page is ever held;
+    the cursors of earlier pages are kept so "previous" needs no rescan.
+    """
+
+    def __init__(self, fetch, page_size=10):
+        if page_size < 1:
+            raise ValueError("Page size must be at least 1")
+        self.fetch = fetch
+        self.page_size = page_size
+        self.search_term = ""
+        self.reset()
+
+    def reset(self, cursor=0):
+        """Go to the page starting at cursor and forget earlier pages"""
+        self.cursor = cursor
+        self.previous = []
+        self._load()
+
+    def _load(self):
+        """Fetch the page at the current cursor"""
+        self.items, self.next_cursor = self.fetch(self.search_term, self.cursor, self.page_size)
+
+    @property
+    def page_number(self):
+        """1-based number of the current page"""
+        return len(self.previous) + 1
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return bool(self.previous)
+
+    def next(self):
+        """Move to the next page; False on the last page"""
+        if not self.has_next:
+            return False
+        self.previous.append(self.cursor)
+        self.cursor = self.next_cursor
+        self._load()
+        return True
+
+    def prev(self):
+        """Move to the previous page; False on the first page"""
+        if not self.has_prev:
+            return False
+        self.cursor = self.previous.pop()
+        self._load()
+        return True
+
+    def search(self, search_term):
+        """Filter by a new search term and go back to the first page"""
+        self.search_term = search_term
+        self.reset()
+
+
+if __name__ == "__main__":
+    # Page through 1000 numbers looking only at one page at a time
+    numbers = [f"item {i}" for i in range(1000)]
+
+    def fetch(search_term, cursor, page_size):
+        page = []
+        for index in range(cursor, len(numbers)):
+            if len(page) == page_size:
+                return page, index
+            if search_term in numbers[index]:
+                page.append((index, numbers[index]))
+        return page, None
+
+    pager = Pager(fetch, page_size=5)
+    pager.next()
+    print(f"Page {pager.page_number}: {pager.items}")
+    pager.search("99")
+    print(f"Matches for '99': {pager.items}")
+    pager.next()
+    pager.prev()
+    print(f"Back on page {pager.page_number}, has next: {pager.has_next}")
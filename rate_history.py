@@ -0,0 +1,164 @@
+import json
+import os
+from bisect import bisect_right
+from datetime import datetime
+import numpy as np
+
+
+def to_epoch_seconds(when):
+    """Convert a datetime, date string or datetime64 to integer seconds"""
+    if when is None:
+        when = datetime.now()
+    if isinstance(when, (int, np.integer)):
+        return int(when)
+    return int(np.datetime64(when, "s").astype(np.int64))
+
+
+class RateHistory:
+    def __init__(self, filename="data/rate_history.jsonl"):
+        self.filename = filename
+        self.times = {}    # currency -> sorted list of epoch seconds
+        self.rates = {}    # currency -> rates aligned with self.times
+        self._arrays = {}  # currency -> (times, rates) NumPy arrays for bulk lookups
+        self.load_history()
+
+    def load_history(self):
+        """Load every recorded rate from the append-only log"""
+        try:
+            if os.path.dirname(self.filename):
+                os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+
+            if not os.path.exists(self.filename):
+                return
+
+            with open(self.filename, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._insert(record["currency"], to_epoch_seconds(record["timestamp"]), record["rate"])
+
+        except (json.JSONDecodeError, KeyError, IOError) as e:
+            print(f"Warning: Could not load rate history: {e}")
+
+    def _insert(self, currency, seconds, rate):
+        """Insert a rate keeping the per-currency timestamps sorted"""
+        times = self.times.setdefault(currency, [])
+        rates = self.rates.setdefault(currency, [])
+
+        if not times or seconds >= times[-1]:
+            times.append(seconds)
+            rates.append(rate)
+        else:
+            # Back-dated entry: keep both lists aligned
+            position = bisect_right(times, seconds)
+            times.insert(position, seconds)
+            rates.insert(position, rate)
+
+        self._arrays.pop(currency, None)
+
+    def record(self, currency, rate, timestamp=None):
+        """Append a rate update to the log"""
+        if timestamp is None:
+            timestamp = datetime.now()
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.strftime("%Y-%m-%d %H:%M:%S")
+
+        self._insert(currency, to_epoch_seconds(timestamp), rate)
+
+        try:
+            with open(self.filename, 'a') as f:
+                f.write(json.dumps({"timestamp": timestamp, "currency": currency, "rate": rate}) + "\n")
+            return True
+        except IOError as e:
+            print(f"Error: Could not save rate history: {e}")
+            return False
+
+    def record_snapshot(self, rates, timestamp=None):
+        """Record a full set of rates taken at the same moment"""
+        for currency, rate in rates.items():
+            self.record(currency, rate, timestamp)
+
+    def is_empty(self):
+        """Check whether any rate has been recorded"""
+        return not self.times
+
+    def get_currencies(self):
+        """Get the currencies that have recorded rates"""
+        return sorted(self.times.keys())
+
+    def rate_as_of(self, currency, when=None):
+        """Get the rate in effect at a moment (latest update at or before it)"""
+        if currency not in self.times:
+            raise ValueError(f"No rate history for {currency}")
+
+        position = bisect_right(self.times[currency], to_epoch_seconds(when))
+        if position == 0:
+            raise ValueError(f"No {currency} rate recorded on or before {when}")
+
+        return self.rates[currency][position - 1]
+
+    def get_timeline(self, currency):
+        """Get (timestamp, rate) pairs for a currency, oldest first"""
+        return [(str(np.datetime64(t, "s")).replace("T", " "), r)
+                for t, r in zip(self.times.get(currency, []), self.rates.get(currency, []))]
+
+    def _currency_arrays(self, currency):
+        """Get cached NumPy copies of a currency's timeline"""
+        arrays = self._arrays.get(currency)
+        if arrays is None:
+            if currency not in self.times:
+                raise ValueError(f"No rate history for {currency}")
+            arrays = (np.array(self.times[currency], dtype=np.int64), np.array(self.rates[currency], dtype=float))
+            self._arrays[currency] = arrays
+        return arrays
+
+    def rates_as_of(self, currencies, dates):
+        """Vectorized as-of lookup of rates for arrays of currencies and dates"""
+        currencies = np.asarray(currencies)
+        seconds = np.asarray(dates, dtype="datetime64[s]").astype(np.int64)
+        currencies, seconds = np.broadcast_arrays(currencies, seconds)
+        result = np.empty(seconds.shape, dtype=float)
+
+        # One binary search per row, batched per currency with searchsorted
+        for currency in np.unique(currencies).tolist():
+            mask = currencies == currency
+            times, rates = self._currency_arrays(currency)
+            positions = np.searchsorted(times, seconds[mask], side="right") - 1
+            if (positions < 0).any():
+                raise ValueError(f"No {currency} rate recorded before some ledger dates")
+            result[mask] = rates[positions]
+
+        return result
+
+    def convert_ledger(self, dates, amounts, currencies, to_currency="USD"):
+        """Convert a ledger of (date, amount, currency) rows using the rates as of each date"""
+        dates = np.asarray(dates, dtype="datetime64[s]")
+        amounts = np.asarray(amounts, dtype=float)
+
+        # Rates are quoted per base currency unit, so route through the base
+        from_rates = self.rates_as_of(currencies, dates)
+        to_rates = self.rates_as_of(to_currency, dates)
+
+        return amounts / from_rates * to_rates
+
+
+if __name__ == "__main__":
+    # Test the RateHistory
+    rh = RateHistory("test_rate_history.jsonl")
+
+    rh.record_snapshot({"USD": 1.0, "EUR": 0.90, "INR": 82.0}, "2024-01-01 00:00:00")
+    rh.record("EUR", 0.92, "2024-02-01 00:00:00")
+    rh.record("INR", 83.2, "2024-02-15 00:00:00")
+
+    print(f"EUR as of 2024-01-15: {rh.rate_as_of('EUR', '2024-01-15')}")
+    print(f"EUR as of 2024-03-01: {rh.rate_as_of('EUR', '2024-03-01')}")
+
+    ledger = rh.convert_ledger(["2024-01-10", "2024-02-20", "2024-02-20"],
+                               [100.0, 100.0, 8320.0], ["EUR", "EUR", "INR"])
+    print(f"Ledger in USD: {ledger}")
+
+    # Clean up test files
+    if os.path.exists("test_rate_history.jsonl"):
+        os.remove("test_rate_history.jsonl")
+
+    print("Test completed successfully!")
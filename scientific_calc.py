@@ -1,6 +1,12 @@
 
 import math
+import numpy as np
 from utils import get_numeric_input, display_error, get_menu_choice
+from memoize import memoize
+import trig
+import calculus
+import plot
+from operations import Menu, Parameter
 
 class ScientificCalculator:
     def __init__(self, history_manager):
@@ -12,48 +18,119 @@ class ScientificCalculator:
         self.angle_mode = "radians" if self.angle_mode == "degrees" else "degrees"
         return self.angle_mode
 
+    def set_angle_mode(self, mode):
+        """Set the angle mode ("degrees" or "radians")"""
+        if mode not in ("degrees", "radians"):
+            raise ValueError("Angle mode must be 'degrees' or 'radians'")
+        self.angle_mode = mode
+        return mode
+
     def convert_angle(self, angle):
         """Convert angle based on current mode"""
         if self.angle_mode == "degrees":
             return math.radians(angle)  # Convert to radians for math functions
         return angle
 
+    def in_angle_mode(self, function, value, mode=None):
+        """Call a trig method in the given angle mode (None: the current one)"""
+        if mode is None:
+            return function(value)
+        previous = self.angle_mode
+        self.set_angle_mode(mode)
+        try:
+            return function(value)
+        finally:
+            self.angle_mode = previous
+
+    def _special_angle(self, table, angle):
+        """Exact value for special angles (multiples of 15°), or None"""
+        return trig.special_value(table, angle, self.angle_mode == "degrees")
+
+    def _inverse_result(self, special, value, result_rad):
+        """Convert an inverse trig result to the angle mode, exact at special values"""
+        step = special.get(value)
+        if step is not None:
+            return float(step * trig.STEP_DEGREES) if self.angle_mode == "degrees" else step * trig.STEP_RADIANS
+        return math.degrees(result_rad) if self.angle_mode == "degrees" else result_rad
+
+    @memoize(depends_on=("angle_mode",))
     def sine(self, angle):
         """Calculate sine of an angle"""
+        exact = self._special_angle(trig.SIN_TABLE, angle)
+        if exact is not None:
+            return exact
         angle_rad = self.convert_angle(angle)
         return math.sin(angle_rad)
 
+    @memoize(depends_on=("angle_mode",))
     def cosine(self, angle):
         """Calculate cosine of an angle"""
+        exact = self._special_angle(trig.COS_TABLE, angle)
+        if exact is not None:
+            return exact
         angle_rad = self.convert_angle(angle)
         return math.cos(angle_rad)
 
+    @memoize(depends_on=("angle_mode",))
     def tangent(self, angle):
         """Calculate tangent of an angle"""
+        exact = self._special_angle(trig.TAN_TABLE, angle)
+        if exact is not None:
+            if math.isnan(exact):
+                raise ValueError("Tangent is undefined at odd multiples of 90° (π/2)")
+            return exact
         angle_rad = self.convert_angle(angle)
         return math.tan(angle_rad)
 
+    @memoize(depends_on=("angle_mode",))
     def arcsine(self, value):
         """Calculate inverse sine (arcsine)"""
         if value < -1 or value > 1:
             raise ValueError("Value must be between -1 and 1 for inverse trigonometric functions")
         
-        result_rad = math.asin(value)
-        return math.degrees(result_rad) if self.angle_mode == "degrees" else result_rad
+        return self._inverse_result(trig.INVERSE_SINE, value, math.asin(value))
 
+    @memoize(depends_on=("angle_mode",))
     def arccosine(self, value):
         """Calculate inverse cosine (arccosine)"""
         if value < -1 or value > 1:
             raise ValueError("Value must be between -1 and 1 for inverse trigonometric functions")
         
-        result_rad = math.acos(value)
-        return math.degrees(result_rad) if self.angle_mode == "degrees" else result_rad
+        return self._inverse_result(trig.INVERSE_COSINE, value, math.acos(value))
 
+    @memoize(depends_on=("angle_mode",))
     def arctangent(self, value):
         """Calculate inverse tangent (arctangent)"""
-        result_rad = math.atan(value)
-        return math.degrees(result_rad) if self.angle_mode == "degrees" else result_rad
+        return self._inverse_result(trig.INVERSE_TANGENT, value, math.atan(value))
+
+    # ------------------------------
+    # Array Trigonometry
+    # ------------------------------
+    def sine_array(self, angles, masked=False):
+        """Sine of every angle in an array (angle mode applied once)"""
+        return trig.sin(angles, self.angle_mode == "degrees", masked)
+
+    def cosine_array(self, angles, masked=False):
+        """Cosine of every angle in an array"""
+        return trig.cos(angles, self.angle_mode == "degrees", masked)
 
+    def tangent_array(self, angles, masked=False):
+        """Tangent of every angle in an array, NaN (or masked) at the poles"""
+        return trig.tan(angles, self.angle_mode == "degrees", masked)
+
+    def arcsine_array(self, values, masked=False):
+        """Inverse sine of every value, NaN (or masked) outside [-1, 1]"""
+        return trig.arcsin(values, self.angle_mode == "degrees", masked)
+
+    def arccosine_array(self, values, masked=False):
+        """Inverse cosine of every value, NaN (or masked) outside [-1, 1]"""
+        return trig.arccos(values, self.angle_mode == "degrees", masked)
+
+    def arctangent_array(self, values, masked=False):
+        """Inverse tangent of every value"""
+        return trig.arctan(values, self.angle_mode == "degrees", masked)
+
+    @memoize()
     def logarithm(self, value, base=10):
         """Calculate logarithm with specified base"""
         if value <= 0:
@@ -63,20 +140,24 @@ class ScientificCalculator:
         
         return math.log(value, base)
 
+    @memoize()
     def natural_log(self, value):
         """Calculate natural logarithm (base e)"""
         if value <= 0:
             raise ValueError("Natural logarithm is only defined for positive numbers")
         return math.log(value)
 
+    @memoize()
     def exponential(self, value):
         """Calculate e raised to the power of value"""
         return math.exp(value)
 
+    @memoize()
     def power(self, base, exponent):
         """Calculate base raised to the power of exponent"""
         return math.pow(base, exponent)
 
+    @memoize()
     def factorial(self, n):
         """Calculate factorial of a number"""
         if n < 0:
@@ -122,54 +203,67 @@ class ScientificCalculator:
 
     def run(self):
         """Run the scientific calculator interface"""
-        while True:
-            print("\n" + "="*50)
-            print("        SCIENTIFIC CALCULATOR")
-            print("="*50)
-            print(f"Angle Mode: {self.angle_mode.upper()}")
-            print("1.  Trigonometric Functions")
-            print("2.  Inverse Trigonometric Functions")
-            print("3.  Logarithms")
-            print("4.  Exponential Functions")
-            print("5.  Power Function")
-            print("6.  Factorial")
-            print("7.  Absolute Value")
-            print("8.  Toggle Angle Mode (Degrees/Radians)")
-            print("9.  Evaluate Expression")
-            print("10. Back to Main Menu")
-            print("="*50)
-
-            try:
-                choice = get_menu_choice(10)
-
-                if choice == 1:
-                    self.trigonometric_functions()
-                elif choice == 2:
-                    self.inverse_trigonometric_functions()
-                elif choice == 3:
-                    self.logarithm_functions()
-                elif choice == 4:
-                    self.exponential_functions()
-                elif choice == 5:
-                    self.power_function()
-                elif choice == 6:
-                    self.factorial_function()
-                elif choice == 7:
-                    self.absolute_value_function()
-                elif choice == 8:
-                    self.toggle_angle_mode()
-                    print(f"Angle mode changed to: {self.angle_mode.upper()}")
-                    input("Press Enter to continue...")
-                elif choice == 9:
-                    self.evaluate_scientific_expression()
-                elif choice == 10:
-                    break
-
-            except KeyboardInterrupt:
-                print("\nOperation cancelled.")
-                break
-            except Exception as e:
-                display_error(str(e))
+        Menu("SCIENTIFIC CALCULATOR", [
+            ("Trigonometric Functions", self.trigonometric_functions),
+            ("Inverse Trigonometric Functions", self.inverse_trigonometric_functions),
+            ("Logarithms", self.logarithm_functions),
+            ("Exponential Functions", self.exponential_functions),
+            ("Power Function", self.power_function),
+            ("Factorial", self.factorial_function),
+            ("Absolute Value", self.absolute_value_function),
+            ("Toggle Angle Mode (Degrees/Radians)", self.toggle_angle_mode_interface),
+            ("Evaluate Expression", self.evaluate_scientific_expression),
+            ("Calculus (Derivatives, Integrals, Roots, ODEs)", self.calculus_functions),
+            ("Plot Function", self.plot_function),
+            ("Back to Main Menu", None),
+        ]).run(header=lambda: f"Angle Mode: {self.angle_mode.upper()}")
+
+    def register_operations(self, registry):
+        """Add the scientific and calculus operations to an OperationRegistry"""
+        mode = Parameter("mode", str, default=None,
+                         description="degrees or radians (default: the current angle mode)")
+        angle = [Parameter("angle", description="angle (in mode)"), mode]
+        ratio = [Parameter("value"), mode]
+        for name, function in (("sin", self.sine), ("cos", self.cosine), ("tan", self.tangent)):
+            registry.register(f"scientific.{name}", lambda angle, mode, function=function:
+                              self.in_angle_mode(function, angle, mode), angle, f"{name} of an angle")
+        for name, function in (("asin", self.arcsine), ("acos", self.arccosine), ("atan", self.arctangent)):
+            registry.register(f"scientific.{name}", lambda value, mode, function=function:
+                              self.in_angle_mode(function, value, mode), ratio, f"{name}, as an angle in mode")
+
+        registry.register("scientific.log", self.logarithm,
+                          [Parameter("value"), Parameter("base", default=10)], "Logarithm (base 10 by default)")
+        registry.register("scientific.ln", self.natural_log, [Parameter("value")], "Natural logarithm")
+        registry.register("scientific.exp", self.exponential, [Parameter("value")], "e raised to value")
+        registry.register("scientific.power", self.power,
+                          [Parameter("base"), Parameter("exponent")], "base raised to exponent")
+        registry.register("scientific.factorial", self.factorial, [Parameter("n", int)], "n!")
+        registry.register("scientific.abs", self.absolute_value, [Parameter("value")], "Absolute value")
+        registry.register("scientific.evaluate", self.evaluate_expression,
+                          [Parameter("expression", str)], "Evaluate a scientific expression")
+        registry.register("scientific.set_angle_mode", self.set_angle_mode,
+                          [Parameter("mode", str, description="degrees or radians")], "Set the angle mode")
+
+        function = Parameter("f", str, description="f(x)")
+        registry.register("calculus.derivative", lambda f, x, order: calculus.derivative(f, x, order)[0],
+                          [function, Parameter("x"), Parameter("order", int, default=1)], "f'(x) or f''(x)")
+        registry.register("calculus.integrate", lambda f, a, b: calculus.integrate(f, a, b)[0],
+                          [function, Parameter("a", description="lower limit"),
+                           Parameter("b", description="upper limit")], "Definite integral of f from a to b")
+        registry.register("calculus.roots", lambda f, a, b: calculus.find_roots(f, a, b)[0],
+                          [function, Parameter("a", description="interval start"),
+                           Parameter("b", description="interval end")], "Roots of f(x) = 0 in [a, b]")
+        registry.register("calculus.ode", lambda f, t0, y0, t1: float(calculus.solve_ode(f, t0, y0, t1)[1][-1]),
+                          [Parameter("f", str, description="dy/dt = f(t, y)"),
+                           Parameter("t0", description="start time"), Parameter("y0", description="y(t0)"),
+                           Parameter("t1", description="end time")],
+                          "y(t1) for dy/dt = f(t, y)")
+
+    def toggle_angle_mode_interface(self):
+        """Switch between degrees and radians from the menu"""
+        self.toggle_angle_mode()
+        print(f"Angle mode changed to: {self.angle_mode.upper()}")
+        input("Press Enter to continue...")
 
     def trigonometric_functions(self):
         """Handle trigonometric function calculations"""
@@ -192,7 +286,8 @@ class ScientificCalculator:
                 result = self.tangent(angle)
                 func_name = "tan"
 
-            expression = f"{func_name}({angle})"
+            unit = "°" if self.angle_mode == "degrees" else " rad"
+            expression = f"{func_name}({angle}{unit})"
             print(f"Result: {expression} = {result}")
             self.history_manager.add_to_history(expression, result)
 
@@ -347,6 +442,94 @@ class ScientificCalculator:
         except ValueError as e:
             display_error(str(e))
 
+    def calculus_functions(self):
+        """Numerical calculus on user expressions"""
+        print("\n--- Calculus ---")
+        print("1. Derivative f'(x) or f''(x)")
+        print("2. Definite Integral")
+        print("3. Find Roots (f(x) = 0)")
+        print("4. Solve ODE (dy/dt = f(t, y))")
+        print("Functions use x (or t and y) with sin, cos, tan, log, ln, exp, sqrt, pi, e; angles in radians")
+
+        try:
+            choice = get_menu_choice(4)
+
+            if choice == 4:
+                expression = input("Enter dy/dt in terms of t and y: ").strip()
+                t0 = get_numeric_input("Enter start time t0: ")
+                y0 = get_numeric_input("Enter initial value y(t0): ")
+                t1 = get_numeric_input("Enter end time: ")
+                times, values, stats = calculus.solve_ode(expression, t0, y0, t1)
+                result = float(values[-1])
+                print(f"\ny({t1}) = {result}")
+                print(f"Steps: {stats['steps']} ({stats['rejected']} rejected), "
+                      f"evaluations: {stats['evaluations']}, error estimate: {stats['error']:.2e}")
+                self.history_manager.add_to_history(f"ODE: y' = {expression}, y({t0}) = {y0}, y({t1})", result)
+                return
+
+            expression = input("Enter f(x): ").strip()
+
+            if choice == 1:
+                x = get_numeric_input("Enter x: ")
+                order = int(get_numeric_input("Enter order (1 or 2): ", default=1))
+                result, stats = calculus.derivative(expression, x, order)
+                label = f"d{'²' if order == 2 else ''}/dx{'²' if order == 2 else ''} {expression} at x={x}"
+                print(f"\n{label} = {result}")
+                print(f"Evaluations: {stats['evaluations']}, error estimate: {stats['error']:.2e}")
+
+            elif choice == 2:
+                a = get_numeric_input("Enter lower limit: ")
+                b = get_numeric_input("Enter upper limit: ")
+                result, stats = calculus.integrate(expression, a, b)
+                label = f"∫ {expression} dx from {a} to {b}"
+                print(f"\n{label} = {result}")
+                print(f"Evaluations: {stats['evaluations']} in {stats['intervals']} intervals, "
+                      f"error estimate: {stats['error']:.2e}" + ("" if stats["converged"] else " (did not converge)"))
+
+            else:
+                a = get_numeric_input("Enter interval start: ")
+                b = get_numeric_input("Enter interval end: ")
+                roots, stats = calculus.find_roots(expression, a, b)
+                if not roots:
+                    print("\nNo roots found in that interval.")
+                    return
+                print(f"\nRoots: {', '.join(f'{root:.12g}' for root in roots)}")
+                print(f"Evaluations: {stats['evaluations']}")
+                label = f"Roots of {expression} in [{a}, {b}]"
+                result = roots[0]
+
+            self.history_manager.add_to_history(label, result)
+
+        except ValueError as e:
+            display_error(str(e))
+
+    def plot_function(self):
+        """Plot a user expression in the terminal"""
+        print("\n--- Plot Function ---")
+        print("Use x with sin, cos, tan, log, ln, exp, sqrt, pi, e; angles in radians")
+
+        try:
+            expression = input("Enter f(x): ").strip()
+            a = get_numeric_input("Enter x from: ")
+            b = get_numeric_input("Enter x to: ")
+            x, y, stats = plot.sample(expression, a, b)
+            if not np.isfinite(y).any():
+                raise ValueError(f"{expression} has no real values between {a} and {b}")
+
+            print()
+            print(plot.ascii_plot(x, y, y_limits=stats["y_limits"]))
+            print(f"{stats['points']} samples (uniform sampling would need {stats['uniform_points']})")
+
+            filename = input("Save samples as .npy (Enter to skip): ").strip()
+            if filename:
+                np.save(filename, np.column_stack([x, y]))
+                print(f"Saved {stats['points']} (x, y) pairs to {filename}")
+
+            self.history_manager.add_to_history(f"Plot: {expression} for x in [{a}, {b}]", f"{stats['points']} samples")
+
+        except (ValueError, IOError) as e:
+            display_error(str(e))
+
 
 if __name__ == "__main__":
     # For testing without the full app
@@ -0,0 +1,225 @@
+import ast
+import csv
+import keyword
+import re
+import numpy as np
+
+from expression_plan import check_expression, build_namespaces
+from sweep import vector_namespaces
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_]\w*$")
+# f(a, b) = expression
+_FUNCTION_DEFINITION = re.compile(r"^([A-Za-z_]\w*)\s*\(([^()]*)\)\s*=(?!=)(.+)$")
+
+
+def _is_identifier(name):
+    """A name scripts can define: an identifier that isn't a Python keyword"""
+    return bool(_IDENTIFIER.match(name)) and not keyword.iskeyword(name)
+
+
+def split_statements(source):
+    """Statements of a script: one per line or separated by ';', '#' starts a comment"""
+    statements = []
+    for line in source.splitlines():
+        line = line.split("#", 1)[0]
+        statements.extend(part.strip() for part in line.split(";") if part.strip())
+    return statements
+
+
+def _parse_expression(text):
+    """Parse and check one expression"""
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression '{text.strip()}': {e.msg}")
+    functions, names = check_expression(tree)
+    return tree, functions, names
+
+
+class Script:
+    """
+    A multi-statement calculation compiled once into a single function
+
+    Statements are assignments (x = ...), user functions (f(a, b) = ...)
+    and bare expressions, whose value becomes `ans`. The script body is
+    compiled into one Python function, so every variable is a local slot
+    rather than a dict entry; names read before they are assigned are the
+    script's inputs.
+    """
+
+    def __init__(self, source, namespace=None, vector_namespace=None):
+        self.source = source
+        self.namespace = namespace or build_namespaces()["scientific"]
+        self.vector_namespace = vector_namespace or vector_namespaces()["scientific"]
+
+        self.inputs = []
+        self.variables = []
+        self.functions = {}
+        self._compile(split_statements(source))
+        self._compiled = {}
+
+    # ------------------------------
+    # Compilation
+    # ------------------------------
+    def _check_names(self, functions, names, local_names, in_function=False):
+        """Resolve names against builtins, user functions and local slots"""
+        for name in functions:
+            if name not in self.namespace and name not in self.functions:
+                raise ValueError(f"Unknown function: {name}")
+
+        for name in names:
+            if name in self.namespace or name in local_names:
+                continue
+            if name in self.functions:
+                raise ValueError(f"Function '{name}' used without arguments")
+            if in_function:
+                raise ValueError(f"Unknown name '{name}' in function body")
+            # Read before assignment: an input of the script
+            self.inputs.append(name)
+            local_names.add(name)
+
+    def _compile(self, statements):
+        """Generate and compile the Python source for the script"""
+        if not statements:
+            raise ValueError("Script is empty")
+
+        definitions = []
+        body = []
+        local_names = {"ans"}
+
+        for statement in statements:
+            definition = _FUNCTION_DEFINITION.match(statement)
+            if definition:
+                name, parameters, expression = definition.groups()
+                parameters = [p.strip() for p in parameters.split(",") if p.strip()]
+                if not _is_identifier(name):
+                    raise ValueError(f"Invalid function name '{name}'")
+                if name in self.namespace or name in local_names or name in self.functions:
+                    raise ValueError(f"Cannot redefine '{name}'")
+                if not all(_is_identifier(p) for p in parameters) or len(set(parameters)) != len(parameters):
+                    raise ValueError(f"Invalid parameters for function '{name}'")
+
+                tree, functions, names = _parse_expression(expression)
+                self._check_names(functions, names, set(parameters), in_function=True)
+                self.functions[name] = tuple(parameters)
+                definitions.append(f"def {name}({', '.join(parameters)}):\n"
+                                   f"    return {ast.unparse(tree)}")
+                continue
+
+            target, expression = None, statement
+            if "=" in statement:
+                left, _, right = statement.partition("=")
+                if _is_identifier(left.strip()) and not right.startswith("="):
+                    target, expression = left.strip(), right
+
+            tree, functions, names = _parse_expression(expression)
+            self._check_names(functions, names, local_names)
+
+            if target is None:
+                target = "ans"
+            elif target in self.namespace or target in self.functions:
+                raise ValueError(f"Cannot assign to '{target}'")
+            body.append(f"    {target} = {ast.unparse(tree)}")
+
+            local_names.add(target)
+            if target not in self.variables:
+                self.variables.append(target)
+
+        if "ans" not in self.variables:
+            self.variables.append("ans")
+
+        arguments = ", ".join(self.inputs + ["ans=0"])
+        source = "\n".join(definitions + [f"def __script({arguments}):"] + body +
+                           [f"    return ({', '.join(self.variables)},)"])
+        try:
+            self.code = compile(source, "<script>", "exec")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid script: {e.msg}")
+
+    def _function(self, vectorized):
+        """The compiled script function bound to the scalar or vector namespace"""
+        function = self._compiled.get(vectorized)
+        if function is None:
+            scope = dict(self.vector_namespace if vectorized else self.namespace)
+            exec(self.code, scope)
+            function = self._compiled[vectorized] = scope["__script"]
+        return function
+
+    # ------------------------------
+    # Running
+    # ------------------------------
+    def _arguments(self, values):
+        missing = [name for name in self.inputs if name not in values]
+        if missing:
+            raise ValueError(f"Missing values for: {', '.join(missing)}")
+        return [values[name] for name in self.inputs]
+
+    def run(self, values=None, ans=0):
+        """Run once; returns every variable (and ans) by name"""
+        results = self._function(False)(*self._arguments(values or {}), ans=ans)
+        return dict(zip(self.variables, results))
+
+    def run_table(self, columns, ans=0):
+        """
+        Run over a table of inputs (name -> column of values)
+
+        The whole table goes through the script at once as NumPy arrays;
+        scripts that can't take arrays fall back to one run per row.
+        """
+        columns = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+        arguments = [np.atleast_1d(column) for column in self._arguments(columns)]
+        rows = max((len(column) for column in arguments), default=1)
+
+        try:
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                results = self._function(True)(*arguments, ans=ans)
+            return {name: np.broadcast_to(np.asarray(value, dtype=float), (rows,))
+                    for name, value in zip(self.variables, results)}
+        except (TypeError, ValueError):
+            pass
+
+        scalar = self._function(False)
+        table = [scalar(*(float(column[i % len(column)]) for column in arguments), ans=ans)
+                 for i in range(rows)]
+        return {name: np.array([row[slot] for row in table], dtype=float)
+                for slot, name in enumerate(self.variables)}
+
+
+def read_table(filename):
+    """Read a CSV file with a header row into name -> column of floats"""
+    with open(filename, 'r', newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        rows = [row for row in reader if row]
+
+    if not header:
+        raise ValueError("Table file is empty")
+    try:
+        data = np.array(rows, dtype=float).reshape(len(rows), len(header))
+    except ValueError:
+        raise ValueError("Table values must all be numbers, one per column")
+    return {name: data[:, i] for i, name in enumerate(header)}
+
+
+def write_table(filename, columns):
+    """Write name -> column of values to a CSV file"""
+    names = list(columns)
+    with open(filename, 'w') as f:
+        f.write(",".join(names) + "\n")
+        np.savetxt(f, np.column_stack([columns[name] for name in names]), delimiter=",", fmt="%.10g")
+    return filename
+
+
+if __name__ == "__main__":
+    script = Script("""
+        # Loan affordability
+        monthly(r) = r / 1200
+        payment = P * monthly(rate) / (1 - (1 + monthly(rate)) ** -(years * 12))
+        payment * years * 12 - P
+        ans / P * 100
+    """)
+    print(f"Inputs: {script.inputs}, variables: {script.variables}")
+    print(script.run({"P": 100000, "rate": 8.5, "years": 20}))
+
+    table = script.run_table({"P": np.linspace(50000, 500000, 1000000), "rate": 8.5, "years": 20})
+    print(f"Payments for 1,000,000 loans: {table['payment'][[0, -1]]}")
@@ -0,0 +1,126 @@
+import threading
+import uuid
+from datetime import datetime
+
+from basic_calc import BasicCalculator
+from scientific_calc import ScientificCalculator
+from matrix_calc import MatrixCalculator
+from stats_calc import StatisticsCalculator
+from operations import build_registry
+
+
+class CalculatorSession:
+    """Per-session calculators: own memory and angle mode, shared history"""
+
+    def __init__(self, session_id, history_manager, shared_calculators=None):
+        self.session_id = session_id
+        self.created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.history_manager = history_manager
+
+        # Stateful calculators are created per session
+        self.basic_calc = BasicCalculator(history_manager)
+        self.scientific_calc = ScientificCalculator(history_manager)
+        self.matrix_calc = MatrixCalculator(history_manager)
+        self.stats_calc = StatisticsCalculator(history_manager)
+
+        # Stateless (or globally configured) calculators are shared
+        shared_calculators = shared_calculators or {}
+        self.finance_calc = shared_calculators.get("finance_calc")
+        self.converter = shared_calculators.get("converter")
+        # Operations bound to this session's calculators (memory, angle mode, matrices)
+        self.operations = build_registry(self.basic_calc, self.scientific_calc, self.finance_calc,
+                                         self.converter, self.matrix_calc, self.stats_calc)
+
+    @property
+    def memory(self):
+        """This session's calculator memory"""
+        return self.basic_calc.memory
+
+    @property
+    def angle_mode(self):
+        """This session's angle mode"""
+        return self.scientific_calc.angle_mode
+
+    def set_angle_mode(self, mode):
+        """Set this session's angle mode without touching other sessions"""
+        return self.scientific_calc.set_angle_mode(mode)
+
+    def invoke(self, name, **arguments):
+        """Run a registered operation in this session (e.g. invoke("scientific.sin", x=30))"""
+        return self.operations.invoke(name, **arguments)
+
+
+class SessionManager:
+    """Thread-safe registry of calculator sessions for multi-threaded servers"""
+
+    def __init__(self, history_manager, finance_calc=None, converter=None):
+        self.history_manager = history_manager
+        self.shared_calculators = {"finance_calc": finance_calc, "converter": converter}
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def create_session(self, session_id=None):
+        """Create a new session (random id if none is given)"""
+        session_id = session_id or uuid.uuid4().hex
+        session = CalculatorSession(session_id, self.history_manager, self.shared_calculators)
+
+        with self.lock:
+            if session_id in self.sessions:
+                raise ValueError(f"Session already exists: {session_id}")
+            self.sessions[session_id] = session
+        return session
+
+    def get_session(self, session_id, create=True):
+        """Get a session by id, creating it on first use"""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None and create:
+                session = CalculatorSession(session_id, self.history_manager, self.shared_calculators)
+                self.sessions[session_id] = session
+
+        if session is None:
+            raise ValueError(f"Session not found: {session_id}")
+        return session
+
+    def close_session(self, session_id):
+        """Remove a session; returns the closed session or None"""
+        with self.lock:
+            return self.sessions.pop(session_id, None)
+
+    def current(self):
+        """Session bound to the calling thread (one per worker thread)"""
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = self.create_session()
+        return session
+
+    def get_session_ids(self):
+        """Get the ids of all open sessions"""
+        with self.lock:
+            return list(self.sessions.keys())
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+    from history import HistoryManager
+
+    hm = HistoryManager("test_session_history.json")
+    manager = SessionManager(hm)
+
+    def worker(n):
+        session = manager.get_session(f"user-{n % 4}")
+        session.set_angle_mode("degrees" if n % 2 == 0 else "radians")
+        session.basic_calc.memory_add(1)
+        return session.scientific_calc.sine(30)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(worker, range(200)))
+
+    print(f"Results by mode: {sorted(set(results))}")
+    print(f"Memory per session: {[manager.get_session(f'user-{i}').memory for i in range(4)]}")
+    print(f"History entries: {len(hm.get_history())}")
+
+    import os
+    if os.path.exists("test_session_history.json"):
+        os.remove("test_session_history.json")
@@ -0,0 +1,438 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from utils import display_error, get_numeric_input
+from operations import Menu, Parameter
+
+# Rows parsed per chunk when streaming a file
+CHUNK_ROWS = 100000
+DEFAULT_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+class RunningStats:
+    """
+    Count, mean, variance, min and max in constant memory
+
+    Chunks are folded in with Welford's update in its pairwise form
+    (Chan et al.), which is also how two partial results are merged.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _combine(self, count, mean, m2, low, high):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def update(self, values):
+        """Add a chunk of values"""
+        if len(values):
+            mean = float(values.mean())
+            self._combine(len(values), mean, float(((values - mean) ** 2).sum()),
+                          float(values.min()), float(values.max()))
+
+    def merge(self, other):
+        """Add the values summarized by another RunningStats"""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (n - 1)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+
+class TDigest:
+    """
+    Approximate quantiles from a bounded set of weighted centroids
+
+    Values are merged into centroids whose size follows the arcsine scale
+    function, so centroids are tiny near the tails (accurate extreme
+    percentiles) and larger around the median. Two digests merge by
+    pooling their centroids, which makes chunked and parallel runs exact
+    in how they combine.
+    """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        quantiles = (cumulative - weights / 2) / cumulative[-1]
+
+        # Every centroid covers at most one unit of the scale function
+        scale = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * quantiles - 1, -1, 1))
+        bins = np.floor(scale)
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def update(self, values):
+        """Add a chunk of values"""
+        if len(values):
+            self._compress(np.r_[self.means, values], np.r_[self.weights, np.ones(len(values))])
+
+    def merge(self, other):
+        """Add the values summarized by another digest"""
+        if len(other.means):
+            self._compress(np.r_[self.means, other.means], np.r_[self.weights, other.weights])
+        return self
+
+    def _positions(self):
+        """Cumulative weight at each centroid's center"""
+        return np.cumsum(self.weights) - self.weights / 2
+
+    def quantile(self, q, low, high):
+        """Value at quantile(s) q in [0, 1], given the exact min and max"""
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan)
+        total = self.weights.sum()
+        return np.interp(np.asarray(q) * total, np.r_[0, self._positions(), total],
+                         np.r_[low, self.means, high])
+
+    def cdf(self, x, low, high):
+        """Fraction of values at or below x"""
+        if not len(self.means):
+            return np.zeros(np.shape(x))
+        total = self.weights.sum()
+        return np.interp(x, np.r_[low, self.means, high], np.r_[0, self._positions(), total]) / total
+
+
+class ColumnStats:
+    """
+    Streaming summary of one column: moments, quantiles and a histogram
+
+    Histograms are exact when a value range is given up front; otherwise
+    they are estimated from the digest once the data has been seen.
+    """
+
+    def __init__(self, compression=200, bins=20, value_range=None):
+        self.moments = RunningStats()
+        self.digest = TDigest(compression)
+        self.missing = 0
+        self.edges = np.linspace(value_range[0], value_range[1], bins + 1) if value_range else None
+        self.counts = np.zeros(bins, dtype=np.int64) if value_range else None
+        self.outside = 0
+
+    def update(self, values):
+        """Add a chunk of values; NaNs (blank or non-numeric cells) count as missing"""
+        values = np.asarray(values, dtype=float).ravel()
+        present = ~np.isnan(values)
+        self.missing += int(len(values) - present.sum())
+        values = values[present]
+
+        self.moments.update(values)
+        self.digest.update(values)
+        if self.edges is not None:
+            self.counts += np.histogram(values, self.edges)[0]
+            self.outside += int(((values < self.edges[0]) | (values > self.edges[-1])).sum())
+
+    def merge(self, other):
+        """Add the values summarized by another ColumnStats"""
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        self.missing += other.missing
+        if self.edges is not None:
+            self.counts += other.counts
+            self.outside += other.outside
+        return self
+
+    def quantiles(self, percentiles=DEFAULT_PERCENTILES):
+        """Approximate percentiles (0-100) as {percentile: value}"""
+        values = self.digest.quantile(np.asarray(percentiles) / 100, self.moments.min, self.moments.max)
+        return {p: float(v) for p, v in zip(percentiles, values)}
+
+    def histogram(self, bins=20):
+        """(edges, counts): exact for a fixed range, else estimated between min and max"""
+        if self.edges is not None:
+            return self.edges, self.counts
+        if not self.moments.count:
+            return np.zeros(bins + 1), np.zeros(bins, dtype=np.int64)
+        edges = np.linspace(self.moments.min, self.moments.max, bins + 1)
+        cdf = self.digest.cdf(edges, self.moments.min, self.moments.max)
+        cdf[0], cdf[-1] = 0.0, 1.0
+        return edges, np.diff(np.round(cdf * self.moments.count)).astype(np.int64)
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        moments = self.moments
+        return {"count": moments.count, "missing": self.missing, "mean": moments.mean,
+                "std": moments.std, "min": moments.min, "max": moments.max,
+                "percentiles": self.quantiles(percentiles)}
+
+
+# ------------------------------
+# Streaming files
+# ------------------------------
+def read_columns(path):
+    """Column names of a .npy or .csv file, and whether the CSV has a header row"""
+    if not os.path.exists(path):
+        raise ValueError(f"File not found: {path}")
+
+    if path.lower().endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+        count = data.shape[1] if data.ndim == 2 else 1
+        return [f"column{i + 1}" for i in range(count)], False
+
+    with open(path, 'r') as f:
+        names = [name.strip() for name in f.readline().split(",")]
+    try:
+        np.array(names, dtype=float)
+        return [f"column{i + 1}" for i in range(len(names))], False
+    except ValueError:
+        return names, True
+
+
+def _parse_lines(lines, usecols):
+    """Parse CSV lines into a 2-D float array; bad or blank cells become NaN"""
+    try:
+        return np.loadtxt(lines, delimiter=",", usecols=usecols, ndmin=2)
+    except ValueError:
+        return np.genfromtxt(lines, delimiter=",", usecols=usecols, ndmin=2)
+
+
+def _csv_chunks(path, start, end, usecols, chunk_rows):
+    """Yield parsed chunks of the lines that begin in the byte range [start, end)"""
+    with open(path, 'rb') as f:
+        f.seek(max(start - 1, 0))
+        if start > 0:
+            # Finish the line that straddles start; it belongs to the previous range
+            f.readline()
+        position = f.tell()
+
+        while position < end:
+            lines = []
+            while len(lines) < chunk_rows and position < end:
+                line = f.readline()
+                if not line:
+                    position = end
+                    break
+                position += len(line)
+                if line.strip():
+                    lines.append(line.decode())
+            if lines:
+                yield _parse_lines(lines, usecols)
+
+
+def _npy_chunks(path, start, end, usecols, chunk_rows):
+    data = np.load(path, mmap_mode="r")
+    if data.ndim == 1:
+        data = data.reshape(-1, 1)
+    for row in range(start, end, chunk_rows):
+        yield np.asarray(data[row:min(row + chunk_rows, end), usecols], dtype=float)
+
+
+def _describe_part(path, start, end, usecols, options):
+    """Summarize one part of a file (runs in a worker process for parallel runs)"""
+    chunk_rows = options.pop("chunk_rows")
+    reader = _npy_chunks if path.lower().endswith(".npy") else _csv_chunks
+    columns = [ColumnStats(**options) for _ in usecols]
+    rows = 0
+    for chunk in reader(path, start, end, usecols, chunk_rows):
+        rows += len(chunk)
+        for i, stats in enumerate(columns):
+            stats.update(chunk[:, i])
+    return columns, rows
+
+
+def _split(path, has_header, parts):
+    """Split a file into (start, end) ranges: rows for .npy, bytes for CSV"""
+    if path.lower().endswith(".npy"):
+        total = len(np.load(path, mmap_mode="r"))
+        first = 0
+    else:
+        total = os.path.getsize(path)
+        first = 0
+        if has_header:
+            with open(path, 'rb') as f:
+                first = len(f.readline())
+    bounds = np.linspace(first, total, parts + 1).astype(np.int64)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def describe_file(path, columns=None, workers=1, chunk_rows=CHUNK_ROWS, compression=200,
+                  bins=20, value_range=None):
+    """
+    Stream a CSV or .npy file and summarize its columns in constant memory
+
+    Args:
+        path (str): .csv (optional header row) or .npy file
+        columns (list): Column names to summarize (default: all)
+        workers (int): Processes that each summarize one part of the file;
+            their partial results are merged at the end
+        chunk_rows (int): Rows held in memory at a time (per worker)
+        compression (int): t-digest size; higher is more accurate
+        bins (int): Histogram bins
+        value_range (tuple): (low, high) for exact histograms
+
+    Returns:
+        tuple: ({column name: ColumnStats}, stats dict)
+    """
+    names, has_header = read_columns(path)
+    if columns:
+        unknown = [name for name in columns if name not in names]
+        if unknown:
+            raise ValueError(f"Unknown column: {unknown[0]}. Columns are: {', '.join(names)}")
+    else:
+        columns = names
+    usecols = [names.index(name) for name in columns]
+    if workers < 1:
+        raise ValueError("Workers must be at least 1")
+
+    start = time.perf_counter()
+    options = {"chunk_rows": int(chunk_rows), "compression": compression, "bins": bins,
+               "value_range": value_range}
+    ranges = _split(path, has_header, workers)
+
+    if workers == 1 or len(ranges) < 2:
+        parts = [_describe_part(path, a, b, usecols, dict(options)) for a, b in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_describe_part, path, a, b, usecols, dict(options)) for a, b in ranges]
+            parts = [future.result() for future in futures]
+
+    results = [ColumnStats(compression, bins, value_range) for _ in columns]
+    rows = 0
+    for part, part_rows in parts:
+        rows += part_rows
+        for result, stats in zip(results, part):
+            result.merge(stats)
+
+    elapsed = time.perf_counter() - start
+    stats = {"rows": rows, "workers": workers, "seconds": elapsed,
+             "rows_per_second": rows / elapsed if elapsed else 0.0}
+    return dict(zip(columns, results)), stats
+
+
+class StatisticsCalculator:
+    def __init__(self, history_manager):
+        self.history_manager = history_manager
+
+    # ------------------------------
+    # User Interface (CLI)
+    # ------------------------------
+    def run(self):
+        """Run the statistics calculator interface"""
+        Menu("STATISTICS", [
+            ("Describe Numbers", self.describe_numbers_interface),
+            ("Describe File Columns (.csv or .npy)", self.describe_file_interface),
+            ("Back to Main Menu", None),
+        ]).run()
+
+    def register_operations(self, registry):
+        """Add the statistics operations to an OperationRegistry"""
+        registry.register("stats.describe", self.describe_values,
+                          [Parameter("values", list)], "Count, mean, std, min, max and percentiles")
+        registry.register("stats.describe_file", self.describe_columns,
+                          [Parameter("path", str, description=".csv or .npy file"),
+                           Parameter("columns", str, default="", description="column names, comma separated"),
+                           Parameter("workers", int, default=1, description="worker processes")],
+                          "Summary of each column of a file, streamed in constant memory")
+
+    def describe_values(self, values):
+        """Summary of a list of numbers"""
+        stats = ColumnStats()
+        stats.update(np.asarray(values, dtype=float))
+        return stats.summary()
+
+    def describe_columns(self, path, columns="", workers=1):
+        """Summary of each (comma separated) column of a file, or of all columns"""
+        columns = [name.strip() for name in columns.split(",") if name.strip()]
+        results, _ = describe_file(path, columns, workers)
+        return {name: column.summary() for name, column in results.items()}
+
+    def show(self, name, stats, bins=10):
+        summary = stats.summary()
+        print(f"\n{name}: {summary['count']} values ({summary['missing']} missing)")
+        if not summary["count"]:
+            return
+        print(f"  mean {summary['mean']:.6g}   std {summary['std']:.6g}   "
+              f"min {summary['min']:.6g}   max {summary['max']:.6g}")
+        print("  " + "   ".join(f"p{p} {v:.6g}" for p, v in summary["percentiles"].items()))
+
+        edges, counts = stats.histogram(bins)
+        widest = max(int(counts.max()), 1)
+        for low, high, count in zip(edges[:-1], edges[1:], counts):
+            print(f"  {low:>12.6g} - {high:<12.6g} {'#' * round(30 * count / widest)} {count}")
+
+    def log(self, expression, stats):
+        summary = stats.summary()
+        self.history_manager.add_to_history(
+            expression, f"n={summary['count']}, mean={summary['mean']:.6g}, std={summary['std']:.6g}")
+
+    def describe_numbers_interface(self):
+        """Summarize typed values"""
+        print("\n--- Describe Numbers ---")
+        text = input("Values (comma or space separated): ")
+        try:
+            values = np.array(text.replace(",", " ").split(), dtype=float)
+        except ValueError:
+            display_error("Please enter numbers only")
+            return
+        if not len(values):
+            display_error("No values entered")
+            return
+
+        stats = ColumnStats()
+        stats.update(values)
+        self.show("Values", stats)
+        self.log(f"Statistics of {len(values)} values", stats)
+
+    def describe_file_interface(self):
+        """Stream a file and summarize its columns"""
+        print("\n--- Describe File Columns ---")
+        try:
+            path = input("File path: ").strip()
+            names, _ = read_columns(path)
+            print(f"Columns: {', '.join(names)}")
+            columns = [name.strip() for name in input("Columns (Enter for all): ").split(",") if name.strip()]
+            workers = int(get_numeric_input(f"Worker processes (1-{os.cpu_count()}, default 1): ", 1))
+
+            results, stats = describe_file(path, columns, workers=workers)
+            print(f"\nRead {stats['rows']} rows in {stats['seconds']:.2f}s "
+                  f"({stats['rows_per_second']:,.0f} rows/sec)")
+            for name, column in results.items():
+                self.show(name, column)
+                self.log(f"Statistics of {os.path.basename(path)}:{name}", column)
+        except (ValueError, IOError) as e:
+            display_error(str(e))
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    data = np.column_stack([rng.normal(50, 10, 1000000), rng.exponential(2.0, 1000000)])
+    with open("test_stats.csv", 'w') as f:
+        f.write("reading,delay\n")
+        np.savetxt(f, data, delimiter=",", fmt="%.6f")
+
+    for workers in (1, 2):
+        results, stats = describe_file("test_stats.csv", workers=workers)
+        print(f"{workers} worker(s): {stats['rows']} rows at {stats['rows_per_second']:,.0f} rows/sec")
+
+    for i, (name, column) in enumerate(results.items()):
+        estimated = column.quantiles((1, 50, 99))
+        exact = np.percentile(data[:, i], (1, 50, 99))
+        print(f"{name}: mean {column.moments.mean:.4f} (exact {data[:, i].mean():.4f}), "
+              f"p1/p50/p99 {[round(v, 3) for v in estimated.values()]} (exact {exact.round(3).tolist()})")
+
+    os.remove("test_stats.csv")
@@ -0,0 +1,180 @@
+import json
+import numpy as np
+
+from expression_plan import build_namespaces
+
+
+def _emi(principal, rate, time):
+    """Vectorized EMI (same formula as FinancialCalculator.emi_calculator)"""
+    monthly_rate = np.asarray(rate, dtype=float) / (12 * 100)
+    months = np.asarray(time, dtype=float) * 12
+    growth = (1 + monthly_rate) ** months
+    with np.errstate(divide="ignore", invalid="ignore"):
+        emi = principal * monthly_rate * growth / (growth - 1)
+    return np.where(monthly_rate == 0, principal / months, emi)
+
+
+def vector_namespaces(finance_calc=None, scientific_calc=None):
+    """Plan namespaces whose functions accept and broadcast NumPy arrays"""
+    namespaces = build_namespaces(finance_calc, scientific_calc=scientific_calc)
+    ufuncs = {"sqrt": np.sqrt, "log": np.log10, "ln": np.log, "exp": np.exp}
+    if scientific_calc is None:
+        # Otherwise the calculator's array trig (in its angle mode) is already there
+        ufuncs.update(sin=np.sin, cos=np.cos, tan=np.tan)
+
+    for namespace in namespaces.values():
+        namespace.update({name: ufunc for name, ufunc in ufuncs.items() if name in namespace})
+
+    namespaces["finance"].update({
+        "emi": _emi,
+        "simple_interest": lambda principal, rate, time: principal + principal * rate * time / 100,
+        "compound_interest": lambda principal, rate, time, compounding=1:
+            principal * (1 + rate / (100 * compounding)) ** (compounding * time),
+        "gst": lambda amount, rate: amount + amount * rate / 100,
+    })
+    if finance_calc is not None:
+        namespaces["finance"]["convert"] = finance_calc.convert_many
+    return namespaces
+
+
+def parse_values(text):
+    """Parse '5', '1, 2, 3' or an inclusive range 'start:stop:step' into an array"""
+    text = text.strip()
+    try:
+        if ":" in text:
+            start, stop, step = (float(part) for part in text.split(":"))
+            if step == 0 or (stop - start) / step < 0:
+                raise ValueError("Range step must move from start towards stop")
+            return np.arange(start, stop + step / 2, step)
+        return np.array([float(part) for part in text.split(",") if part.strip()])
+    except ValueError as e:
+        raise ValueError(f"Invalid values '{text}': {e}")
+
+
+class SweepResult:
+    """
+    Results of evaluating a plan over many parameter values
+
+    In "grid" mode every parameter is an axis and result has one dimension
+    per parameter; in "rows" mode parameters are equal-length columns.
+    """
+
+    def __init__(self, expression, names, values, result, mode):
+        self.expression = expression
+        self.names = names
+        self.values = values
+        self.result = result
+        self.mode = mode
+
+    def __len__(self):
+        return self.result.size
+
+    def columns(self, start, stop):
+        """Parameter columns and results for flat positions [start, stop)"""
+        positions = np.arange(start, stop)
+        if self.mode == "grid":
+            indices = np.unravel_index(positions, self.result.shape)
+            columns = [values[index] for values, index in zip(self.values, indices)]
+        else:
+            columns = [values[positions] for values in self.values]
+        return columns + [self.result.ravel()[start:stop]]
+
+    def chunks(self, chunk_size=100000):
+        """Yield (parameter columns + result) in chunks without building every row"""
+        for start in range(0, len(self), chunk_size):
+            yield self.columns(start, min(start + chunk_size, len(self)))
+
+    def summary(self):
+        """Min, max and mean of the results (NaNs ignored)"""
+        return {"count": len(self), "min": float(np.nanmin(self.result)),
+                "max": float(np.nanmax(self.result)), "mean": float(np.nanmean(self.result))}
+
+    def to_csv(self, filename, chunk_size=100000):
+        """Stream the sweep to CSV, one row per parameter combination"""
+        with open(filename, 'w') as f:
+            f.write(",".join(self.names + ["result"]) + "\n")
+            for columns in self.chunks(chunk_size):
+                np.savetxt(f, np.column_stack(columns), delimiter=",", fmt="%.10g")
+        return filename
+
+    def to_json(self, filename, chunk_size=100000):
+        """Stream the sweep to a JSON array of {parameter: value, "result": value} rows"""
+        keys = self.names + ["result"]
+        with open(filename, 'w') as f:
+            f.write("[")
+            separator = "\n"
+            for columns in self.chunks(chunk_size):
+                rows = zip(*(column.tolist() for column in columns))
+                f.write(separator + ",\n".join(json.dumps(dict(zip(keys, row))) for row in rows))
+                separator = ",\n"
+            f.write("\n]\n")
+        return filename
+
+
+def sweep(plan, namespaces, parameter_values, mode="grid"):
+    """
+    Evaluate a parameterized plan over many values in one vectorized call
+
+    Args:
+        plan (ExpressionPlan): Compiled favorite with parameters
+        namespaces (dict): Engine namespaces from vector_namespaces()
+        parameter_values (dict): Parameter name -> value or sequence of values
+        mode (str): "grid" for every combination (e.g. rate x term tables),
+            "rows" to pair up equal-length value lists
+    """
+    if not plan.parameters:
+        raise ValueError("This favorite has no parameters to sweep")
+    if mode not in ("grid", "rows"):
+        raise ValueError("Sweep mode must be 'grid' or 'rows'")
+
+    missing = [name for name in plan.parameters if name not in parameter_values]
+    if missing:
+        raise ValueError(f"Missing values for: {', '.join(missing)}")
+
+    names = list(plan.parameters)
+    values = [np.atleast_1d(np.asarray(parameter_values[name], dtype=float)) for name in names]
+
+    if mode == "grid":
+        # One axis per parameter so broadcasting builds the whole grid
+        shape = tuple(len(v) for v in values)
+        arguments = {name: v.reshape([-1 if axis == i else 1 for axis in range(len(names))])
+                     for i, (name, v) in enumerate(zip(names, values))}
+    else:
+        lengths = {len(v) for v in values} - {1}
+        if len(lengths) > 1:
+            raise ValueError("Row sweeps need value lists of equal length")
+        shape = (lengths.pop() if lengths else 1,)
+        values = [np.broadcast_to(v, shape) for v in values]
+        arguments = dict(zip(names, values))
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        result = plan.evaluate(namespaces, arguments)
+    result = np.broadcast_to(np.asarray(result, dtype=float), shape)
+
+    return SweepResult(plan.expression, names, values, result, mode)
+
+
+if __name__ == "__main__":
+    import os
+    import time
+    from expression_plan import compile_plan
+
+    namespaces = vector_namespaces()
+    plan = compile_plan("emi(P, rate, T)")
+
+    start = time.perf_counter()
+    table = sweep(plan, namespaces, {"P": 100000, "rate": np.linspace(5, 15, 1000), "T": np.linspace(1, 30, 1000)})
+    print(f"1000 x 1000 EMI grid in {time.perf_counter() - start:.3f}s: {table.summary()}")
+
+    principal_sweep = sweep(compile_plan("emi(P, 8.5, T)"), namespaces,
+                            {"P": parse_values("100000:500000:100000"), "T": 20})
+    print(f"EMIs: {principal_sweep.result.ravel().round(2)}")
+
+    principal_sweep.to_csv("test_sweep.csv")
+    principal_sweep.to_json("test_sweep.json")
+    with open("test_sweep.csv") as f:
+        print(f.read())
+
+    for filename in ("test_sweep.csv", "test_sweep.json"):
+        if os.path.exists(filename):
+            os.remove(filename)
@@ -0,0 +1,163 @@
+import math
+import numpy as np
+
+# Special angles are the multiples of 15° (π/12 rad); 24 of them per turn
+STEP_DEGREES = 15
+STEPS_PER_TURN = 24
+STEP_RADIANS = math.pi / 12
+# Radian angles within RADIAN_TOLERANCE steps of a multiple of π/12 are
+# special, up to MAX_RADIAN_STEPS steps (beyond that the spacing of floats
+# nears the tolerance, and every angle would look special)
+RADIAN_TOLERANCE = 1e-12
+MAX_RADIAN_STEPS = 2 ** 12
+# Beyond 2**52 steps the step count itself is no longer exact
+MAX_DEGREE_STEPS = 2 ** 52
+
+_SQRT2 = math.sqrt(2)
+_SQRT3 = math.sqrt(3)
+_SQRT6 = math.sqrt(6)
+
+# Exact sines for 0°, 15°, ..., 90°; the rest of the circle follows by symmetry
+_QUARTER_SINES = [0.0, (_SQRT6 - _SQRT2) / 4, 0.5, _SQRT2 / 2, _SQRT3 / 2, (_SQRT6 + _SQRT2) / 4, 1.0]
+_QUARTER_TANGENTS = [0.0, 2 - _SQRT3, _SQRT3 / 3, 1.0, _SQRT3, 2 + _SQRT3, math.nan]
+
+
+def _build_tables():
+    """Precompute sin, cos and tan for every multiple of 15° in one turn"""
+    sines = []
+    tangents = []
+    for step in range(STEPS_PER_TURN):
+        quadrant, offset = divmod(step, 6)
+        if quadrant % 2 == 0:
+            sine, tangent = _QUARTER_SINES[offset], _QUARTER_TANGENTS[offset]
+        else:
+            sine = _QUARTER_SINES[6 - offset]
+            tangent = -_QUARTER_TANGENTS[6 - offset] if offset else math.nan
+        sines.append(-sine if quadrant >= 2 else sine)
+        tangents.append(tangent)
+
+    sines = np.array(sines)
+    cosines = np.roll(sines, -6)  # cos(x) = sin(x + 90°)
+    return sines, cosines, np.array(tangents)
+
+
+SIN_TABLE, COS_TABLE, TAN_TABLE = _build_tables()
+
+# Inputs of the inverse functions that have exact special-angle results
+INVERSE_SINE = {0.0: 0, 0.5: 2, _SQRT2 / 2: 3, _SQRT3 / 2: 4, 1.0: 6,
+                -0.5: -2, -_SQRT2 / 2: -3, -_SQRT3 / 2: -4, -1.0: -6}
+# acos(x) = 90° - asin(x)
+INVERSE_COSINE = {value: 6 - step for value, step in INVERSE_SINE.items()}
+INVERSE_TANGENT = {0.0: 0, 2 - _SQRT3: 1, _SQRT3 / 3: 2, 1.0: 3, _SQRT3: 4, 2 + _SQRT3: 5,
+                   -(2 - _SQRT3): -1, -_SQRT3 / 3: -2, -1.0: -3, -_SQRT3: -4, -(2 + _SQRT3): -5}
+
+
+def _special_steps(angles, degrees):
+    """Mask of special angles and their index into the 24-step tables"""
+    steps = angles / STEP_DEGREES if degrees else angles / STEP_RADIANS
+    nearest = np.round(steps)
+    with np.errstate(invalid="ignore"):
+        if degrees:
+            # fmod is exact, so this holds only for true multiples of 15°
+            mask = (np.fmod(angles, STEP_DEGREES) == 0) & (np.abs(nearest) <= MAX_DEGREE_STEPS)
+        else:
+            mask = (np.abs(steps - nearest) <= RADIAN_TOLERANCE) & (np.abs(nearest) <= MAX_RADIAN_STEPS)
+    index = np.mod(np.where(mask, nearest, 0), STEPS_PER_TURN).astype(np.intp)
+    return mask, index
+
+
+def _finish(result, masked):
+    """Return NaN-marked results as a plain or masked array (floats for scalars)"""
+    if masked:
+        return np.ma.masked_invalid(result)
+    return float(result) if result.ndim == 0 else result
+
+
+def _forward(angles, degrees, function, table, masked):
+    """Apply a trig ufunc with a single unit conversion and exact special angles"""
+    angles = np.asarray(angles, dtype=float)
+    radians = np.deg2rad(angles) if degrees else angles
+    with np.errstate(invalid="ignore"):
+        result = np.asarray(function(radians), dtype=float)
+
+    mask, index = _special_steps(angles, degrees)
+    np.copyto(result, table[index], where=mask)
+    return _finish(result, masked)
+
+
+def _inverse(values, degrees, function, special, masked):
+    """Apply an inverse trig ufunc, NaN outside its domain, exact at special values"""
+    values = np.asarray(values, dtype=float)
+    with np.errstate(invalid="ignore"):
+        result = np.asarray(function(values), dtype=float)
+
+    # Exact special values via a sorted lookup table
+    keys = np.array(sorted(special))
+    steps = np.array([special[key] for key in keys])
+    position = np.clip(np.searchsorted(keys, values), 0, len(keys) - 1)
+    mask = keys[position] == values
+    np.copyto(result, steps[position] * STEP_RADIANS, where=mask)
+
+    if degrees:
+        # rad2deg gives a NumPy scalar for 0-d input; copyto needs an array
+        result = np.asarray(np.rad2deg(result))
+        np.copyto(result, steps[position] * float(STEP_DEGREES), where=mask)
+    return _finish(result, masked)
+
+
+def sin(angles, degrees=True, masked=False):
+    """Vectorized sine"""
+    return _forward(angles, degrees, np.sin, SIN_TABLE, masked)
+
+
+def cos(angles, degrees=True, masked=False):
+    """Vectorized cosine"""
+    return _forward(angles, degrees, np.cos, COS_TABLE, masked)
+
+
+def tan(angles, degrees=True, masked=False):
+    """Vectorized tangent, NaN at the poles (90° + k·180°)"""
+    return _forward(angles, degrees, np.tan, TAN_TABLE, masked)
+
+
+def arcsin(values, degrees=True, masked=False):
+    """Vectorized inverse sine, NaN outside [-1, 1]"""
+    return _inverse(values, degrees, np.arcsin, INVERSE_SINE, masked)
+
+
+def arccos(values, degrees=True, masked=False):
+    """Vectorized inverse cosine, NaN outside [-1, 1]"""
+    return _inverse(values, degrees, np.arccos, INVERSE_COSINE, masked)
+
+
+def arctan(values, degrees=True, masked=False):
+    """Vectorized inverse tangent"""
+    return _inverse(values, degrees, np.arctan, INVERSE_TANGENT, masked)
+
+
+def special_value(table, angle, degrees=True):
+    """Exact table value for a scalar special angle, or None"""
+    if not math.isfinite(angle):
+        return None
+    if degrees:
+        nearest = round(angle / STEP_DEGREES)
+        if math.fmod(angle, STEP_DEGREES) != 0 or abs(nearest) > MAX_DEGREE_STEPS:
+            return None
+    else:
+        steps = angle / STEP_RADIANS
+        nearest = round(steps)
+        if abs(steps - nearest) > RADIAN_TOLERANCE or abs(nearest) > MAX_RADIAN_STEPS:
+            return None
+    return float(table[nearest % STEPS_PER_TURN])
+
+
+if __name__ == "__main__":
+    angles = np.array([0, 30, 45, 90, 180, 1e20])
+    print(f"sin({angles.tolist()}°) = {sin(angles)}")
+    print(f"tan([45, 90]°) = {tan(np.array([45.0, 90.0]))}")
+    print(f"arcsin([0.5, 1, 2]) = {arcsin(np.array([0.5, 1.0, 2.0]))}°")
+
+    # Scalars come back as plain floats
+    print(f"sin(30°) = {sin(30)}, sin(π/6) = {sin(math.pi / 6, degrees=False)}")
+    print(f"arcsin(0.5) = {arcsin(0.5)}°, arccos(0.5) = {arccos(0.5)}°, arctan(0.5) = {arctan(0.5)}°")
+    print(f"arcsin(0.5) = {arcsin(0.5, degrees=False)} rad, arcsin(2) masked = {arcsin(2.0, masked=True)}")
@@ -0,0 +1,313 @@
+import re
+from fractions import Fraction
+
+# Base dimensions, in the order used by dimension vectors
+BASE_DIMENSIONS = ("length", "mass", "time", "temperature", "current", "amount", "luminosity")
+
+# SI prefixes: full name and symbol share the same scale
+SI_PREFIXES = {
+    "yotta": ("Y", 1e24), "zetta": ("Z", 1e21), "exa": ("E", 1e18),
+    "peta": ("P", 1e15), "tera": ("T", 1e12), "giga": ("G", 1e9),
+    "mega": ("M", 1e6), "kilo": ("k", 1e3), "hecto": ("h", 1e2),
+    "deca": ("da", 1e1), "deci": ("d", 1e-1), "centi": ("c", 1e-2),
+    "milli": ("m", 1e-3), "micro": ("µ", 1e-6), "nano": ("n", 1e-9),
+    "pico": ("p", 1e-12), "femto": ("f", 1e-15), "atto": ("a", 1e-18),
+}
+
+def exact(number):
+    """Turn a decimal literal into an exact Fraction so cached factors don't drift"""
+    return Fraction(repr(number)) if isinstance(number, float) else Fraction(number)
+
+
+SUPERSCRIPTS = str.maketrans("⁰¹²³⁴⁵⁶⁷⁸⁹⁻", "0123456789-")
+
+TOKEN_PATTERN = re.compile(r"\s*(?:(\*\*|[*·/^()])|(-?\d+(?:\.\d+)?)|([A-Za-z_°µΩ]+))")
+
+
+class Unit:
+    """A parsed unit: scale to base units, dimension vector and zero offset"""
+    __slots__ = ("scale", "dims", "offset")
+
+    def __init__(self, scale, dims, offset=0):
+        self.scale = scale
+        self.dims = dims
+        self.offset = offset
+
+    def __mul__(self, other):
+        return Unit(self.scale * other.scale, tuple(a + b for a, b in zip(self.dims, other.dims)))
+
+    def __truediv__(self, other):
+        return Unit(self.scale / other.scale, tuple(a - b for a, b in zip(self.dims, other.dims)))
+
+    def __pow__(self, exponent):
+        return Unit(self.scale ** exponent, tuple(d * exponent for d in self.dims))
+
+    def is_dimensionless(self):
+        """Check whether the unit has no dimensions"""
+        return not any(self.dims)
+
+
+DIMENSIONLESS = Unit(Fraction(1), (0,) * len(BASE_DIMENSIONS))
+
+
+class UnitRegistry:
+    def __init__(self):
+        self.units = {}          # name or symbol -> Unit
+        self.prefixable = set()  # names/symbols that accept SI prefixes
+        self.symbols = set()     # symbols take symbol prefixes ("km") and no plurals
+        self._resolved = {}      # plural and prefixed names resolved on demand
+        self._parsed = {}        # interned unit expressions -> Unit
+        self._conversions = {}   # (from_expr, to_expr) -> (factor, shift)
+        self.load_defaults()
+
+    # ------------------------------
+    # Definitions
+    # ------------------------------
+    def define_base(self, name, dimension, symbol=None, prefixable=True):
+        """Define a base unit for one of the base dimensions"""
+        if dimension not in BASE_DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}")
+
+        dims = tuple(1 if d == dimension else 0 for d in BASE_DIMENSIONS)
+        self._register(name, symbol, Unit(Fraction(1), dims), prefixable)
+
+    def define(self, name, scale, expression="1", symbol=None, offset=0, prefixable=False):
+        """Define a unit as scale × expression (e.g. define("inch", 0.0254, "m"))"""
+        unit = self.parse(expression)
+        self._register(name, symbol, Unit(exact(scale) * unit.scale, unit.dims, exact(offset)), prefixable)
+
+    def _register(self, name, symbol, unit, prefixable):
+        """Store a unit under its name and symbol, dropping stale caches"""
+        for key in filter(None, (name, symbol)):
+            self.units[key] = unit
+            if prefixable:
+                self.prefixable.add(key)
+        if symbol:
+            self.symbols.add(symbol)
+
+        self._resolved.clear()
+        self._parsed.clear()
+        self._conversions.clear()
+
+    def load_defaults(self):
+        """Load SI base units, derived units and the common everyday units"""
+        self.define_base("meter", "length", "m")
+        self.define_base("second", "time", "s")
+        self.define_base("kelvin", "temperature", "K")
+        self.define_base("ampere", "current", "A")
+        self.define_base("mole", "amount", "mol")
+        self.define_base("candela", "luminosity", "cd")
+
+        # The kilogram is the SI base, but prefixes attach to the gram
+        self.define_base("kilogram", "mass", "kg", prefixable=False)
+        self.define("gram", 0.001, "kg", "g", prefixable=True)
+        self.define("ton", 1000.0, "kg", "t")
+
+        # Derived SI units
+        self.define("hertz", 1.0, "1/s", "Hz", prefixable=True)
+        self.define("newton", 1.0, "kg*m/s^2", "N", prefixable=True)
+        self.define("pascal", 1.0, "N/m^2", "Pa", prefixable=True)
+        self.define("joule", 1.0, "N*m", "J", prefixable=True)
+        self.define("watt", 1.0, "J/s", "W", prefixable=True)
+        self.define("coulomb", 1.0, "A*s", "C", prefixable=True)
+        self.define("volt", 1.0, "W/A", "V", prefixable=True)
+        self.define("ohm", 1.0, "V/A", "Ω", prefixable=True)
+        self.define("liter", 0.001, "m^3", "L", prefixable=True)
+        self.define("l", 0.001, "m^3")
+
+        # Temperature scales with a zero offset (value in K = (x + offset) * scale)
+        self.define("celsius", 1.0, "K", "degC", offset=273.15)
+        self.define("°C", 1.0, "K", offset=273.15)
+        self.define("fahrenheit", Fraction(5, 9), "K", "degF", offset=459.67)
+        self.define("°F", Fraction(5, 9), "K", offset=459.67)
+
+        # Time
+        self.define("minute", 60.0, "s", "min")
+        self.define("hour", 3600.0, "s", "h")
+        self.define("day", 86400.0, "s", "d")
+        self.define("week", 604800.0, "s")
+
+        # Length, weight, volume and area (same factors as the unit converter menus)
+        self.define("inch", 0.0254, "m", "in")
+        self.define("foot", 0.3048, "m", "ft")
+        self.define("yard", 0.9144, "m", "yd")
+        self.define("mile", 1609.34, "m", "mi")
+        self.define("pound", 0.453592, "kg", "lb")
+        self.define("ounce", 0.0283495, "kg", "oz")
+        self.define("gallon", 3.78541, "L", "gal")
+        self.define("quart", 0.946353, "L", "qt")
+        self.define("pint", 0.473176, "L", "pt")
+        self.define("cup", 0.236588, "L")
+        self.define("fluid_ounce", 0.0295735, "L", "floz")
+        self.define("square_meter", 1.0, "m^2")
+        self.define("square_kilometer", 1.0, "km^2")
+        self.define("square_centimeter", 1.0, "cm^2")
+        self.define("square_mile", 2589988.11, "m^2")
+        self.define("square_foot", 0.092903, "m^2")
+        self.define("square_inch", 0.00064516, "m^2")
+        self.define("acre", 4046.86, "m^2")
+        self.define("hectare", 10000.0, "m^2", "ha")
+
+    # ------------------------------
+    # Parsing
+    # ------------------------------
+    def lookup(self, name):
+        """Resolve a single unit name, symbol, plural or prefixed unit"""
+        unit = self.units.get(name) or self._resolved.get(name)
+        if unit is not None:
+            return unit
+
+        unit = self._resolve_prefixed(name)
+
+        # Plurals of full names ("meters", "kilometers"), never of symbols ("ms")
+        for suffix in ("s", "es"):
+            if unit is not None:
+                break
+            singular = name[:-len(suffix)]
+            if name.endswith(suffix) and singular not in self.symbols:
+                unit = self.units.get(singular) or self._resolve_prefixed(singular)
+
+        if unit is None:
+            raise ValueError(f"Unknown unit: {name}")
+
+        self._resolved[name] = unit
+        return unit
+
+    def _resolve_prefixed(self, name):
+        """Resolve "kilometer" or "km"; full prefixes go with names, symbols with symbols"""
+        for prefix, (symbol, factor) in SI_PREFIXES.items():
+            for head, is_symbol in ((prefix, False), (symbol, True)):
+                rest = name[len(head):]
+                if name.startswith(head) and rest in self.prefixable and (rest in self.symbols) == is_symbol:
+                    base = self.units[rest]
+                    return Unit(base.scale * exact(factor), base.dims)
+        return None
+
+    def parse(self, expression):
+        """Parse a unit expression such as "km/h", "N·m" or "kg/m³" (interned)"""
+        unit = self._parsed.get(expression)
+        if unit is not None:
+            return unit
+
+        tokens = self._tokenize(expression.translate(SUPERSCRIPTS))
+        unit, position = self._parse_product(tokens, 0)
+        if position != len(tokens):
+            raise ValueError(f"Invalid unit expression: {expression}")
+
+        self._parsed[expression] = unit
+        return unit
+
+    def _tokenize(self, text):
+        """Split a unit expression into operator, number and name tokens"""
+        # Superscript exponents ("m3" after translation) and implicit products ("N m")
+        text = re.sub(r"(?<=[A-Za-z_°µΩ])(-?\d+)\b", r"^\1", text.strip())
+        tokens = []
+        position = 0
+
+        while position < len(text):
+            match = TOKEN_PATTERN.match(text, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Invalid unit expression: {text}")
+            operator, number, name = match.groups()
+            if operator == "**":
+                operator = "^"
+            tokens.append(("op", operator) if operator else ("num", float(number)) if number else ("name", name))
+            position = match.end()
+
+        return tokens
+
+    def _parse_product(self, tokens, position):
+        """product := power (('*' | '·' | '/' | juxtaposition) power)*"""
+        unit, position = self._parse_power(tokens, position)
+
+        while position < len(tokens):
+            kind, value = tokens[position]
+            if kind == "op" and value in ("*", "·", "/"):
+                right, position = self._parse_power(tokens, position + 1)
+                unit = unit / right if value == "/" else unit * right
+            elif kind == "name" or (kind == "op" and value == "("):
+                right, position = self._parse_power(tokens, position)
+                unit = unit * right
+            else:
+                break
+
+        return unit, position
+
+    def _parse_power(self, tokens, position):
+        """power := atom ('^' number)?"""
+        unit, position = self._parse_atom(tokens, position)
+
+        if position < len(tokens) and tokens[position] == ("op", "^"):
+            if position + 1 >= len(tokens) or tokens[position + 1][0] != "num":
+                raise ValueError("Exponent must be a number")
+            exponent = tokens[position + 1][1]
+            unit = unit ** (int(exponent) if exponent.is_integer() else exponent)
+            position += 2
+
+        return unit, position
+
+    def _parse_atom(self, tokens, position):
+        """atom := name | number | '(' product ')'"""
+        if position >= len(tokens):
+            raise ValueError("Unexpected end of unit expression")
+
+        kind, value = tokens[position]
+        if kind == "name":
+            return self.lookup(value), position + 1
+        if kind == "num":
+            return Unit(exact(value), DIMENSIONLESS.dims), position + 1
+        if value == "(":
+            unit, position = self._parse_product(tokens, position + 1)
+            if position >= len(tokens) or tokens[position] != ("op", ")"):
+                raise ValueError("Missing closing parenthesis in unit expression")
+            return unit, position + 1
+
+        raise ValueError(f"Unexpected '{value}' in unit expression")
+
+    # ------------------------------
+    # Conversion
+    # ------------------------------
+    def dimensions(self, expression):
+        """Get the dimension vector of a unit expression as a dict"""
+        unit = self.parse(expression)
+        return {name: power for name, power in zip(BASE_DIMENSIONS, unit.dims) if power}
+
+    def is_compatible(self, from_expr, to_expr):
+        """Check whether two unit expressions share the same dimensions"""
+        return self.parse(from_expr).dims == self.parse(to_expr).dims
+
+    def conversion(self, from_expr, to_expr):
+        """Get the cached (factor, shift) so that result = value * factor + shift"""
+        key = (from_expr, to_expr)
+        cached = self._conversions.get(key)
+        if cached is not None:
+            return cached
+
+        source = self.parse(from_expr)
+        target = self.parse(to_expr)
+        if source.dims != target.dims:
+            raise ValueError(f"Cannot convert {from_expr} to {to_expr}: incompatible dimensions")
+
+        # Offsets only apply to bare temperature scales; compound units use differences
+        factor = source.scale / target.scale
+        shift = source.offset * factor - target.offset
+
+        cached = self._conversions[key] = (float(factor), float(shift))
+        return cached
+
+    def convert(self, value, from_expr, to_expr):
+        """Convert a value (or NumPy array) between two compatible unit expressions"""
+        factor, shift = self.conversion(from_expr, to_expr)
+        if shift:
+            return value * factor + shift
+        return value * factor
+
+
+if __name__ == "__main__":
+    registry = UnitRegistry()
+
+    print(f"100 km/h = {registry.convert(100, 'km/h', 'm/s')} m/s")
+    print(f"1 kWh = {registry.convert(1, 'kW*h', 'J')} J")
+    print(f"1 g/cm³ = {registry.convert(1, 'g/cm³', 'kg/m³')} kg/m³")
+    print(f"25 °C = {registry.convert(25, 'celsius', 'fahrenheit')} °F")
+    print(f"N·m dimensions: {registry.dimensions('N·m')}")